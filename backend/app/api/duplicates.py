@@ -0,0 +1,89 @@
+from fastapi import APIRouter, HTTPException
+from typing import Dict, Any, Iterator, Tuple
+from itertools import chain
+import asyncio
+import logging
+from ..core.config import settings
+from ..services.duplicates import application_keys, database_records
+from ..services.metrics import metrics
+from ..services.registry import services
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+_rebuild_lock = asyncio.Lock()
+
+async def check_duplicates(personal_data: Dict[str, Any], business_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Stored applications this one repeats: same EIN, bank account, phone or email, or similar name and address
+
+    Returns status clear / likely_duplicate, or unavailable when detection
+    is off, the stored applications are still loading, or it fails;
+    submission never fails on it.
+    """
+    if not settings.DUPLICATE_DETECTION_ENABLED:
+        return {"status": "unavailable", "matches": [], "error": "duplicate detection disabled"}
+    try:
+        index = services.get("duplicate_index")
+        if not index.loaded:
+            metrics.increment("duplicate_checks.loading")
+            return {"status": "unavailable", "matches": [], "error": "duplicate index is still loading"}
+        keys = application_keys(personal_data, business_data)
+        result = await asyncio.to_thread(index.check, keys, settings.DUPLICATE_MAX_MATCHES)
+    except Exception as e:
+        logger.error(f"Duplicate check failed: {str(e)}")
+        metrics.increment("duplicate_check_errors")
+        return {"status": "unavailable", "matches": [], "error": str(e)}
+    metrics.increment(f"duplicate_checks.{result['status']}")
+    return result
+
+async def index_application(application_id: str, status: str, personal_data: Dict[str, Any], business_data: Dict[str, Any]):
+    """Add a submitted application to the duplicate index"""
+    if not settings.DUPLICATE_DETECTION_ENABLED:
+        return
+    try:
+        index = services.get("duplicate_index")
+        await asyncio.to_thread(index.add, application_id, status, application_keys(personal_data, business_data))
+    except Exception as e:
+        logger.error(f"Indexing {application_id} for duplicate detection failed: {str(e)}")
+
+def _stored_applications() -> Iterator[Tuple[str, str, Dict[str, Any], Dict[str, Any]]]:
+    """Database rows, streamed, then the in-memory applications"""
+    from .merchants_new import applications_store
+
+    try:
+        rows = database_records(services.get("sync_database"), settings.DUPLICATE_REBUILD_BATCH_SIZE)
+        # Fail here, not halfway through the rebuild, when the database is unreachable
+        first = next(rows, None)
+        database_rows = chain([first], rows) if first else iter(())
+    except Exception as e:
+        logger.warning(f"Rebuilding the duplicate index without the database: {str(e)}")
+        database_rows = iter(())
+    memory_rows = (
+        (application_id, application.get("status", ""), application.get("personal_data"), application.get("business_data"))
+        for application_id, application in list(applications_store.items())
+    )
+    return chain(database_rows, memory_rows)
+
+@router.post("/duplicates/rebuild")
+async def rebuild_duplicate_index():
+    """Rebuild the duplicate index from every stored application"""
+    if not settings.DUPLICATE_DETECTION_ENABLED:
+        raise HTTPException(status_code=409, detail="Duplicate detection is disabled")
+    if _rebuild_lock.locked():
+        raise HTTPException(status_code=409, detail="A rebuild is already running")
+    async with _rebuild_lock:
+        index = services.get("duplicate_index")
+        report = await asyncio.to_thread(lambda: index.rebuild(_stored_applications()))
+    metrics.observe("duplicate_index_rebuild_seconds", report["seconds"])
+    return {"status": "success", **report}
+
+@router.get("/duplicates/status")
+async def duplicate_index_status():
+    if not settings.DUPLICATE_DETECTION_ENABLED:
+        # Building the index here would start loading every stored application
+        return {"enabled": False, "index": None}
+    try:
+        index = services.get("duplicate_index").status()
+    except Exception as e:
+        index = {"error": str(e)}
+    return {"enabled": settings.DUPLICATE_DETECTION_ENABLED, "index": index}
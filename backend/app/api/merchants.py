@@ -1,5 +1,6 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
 from fastapi.responses import JSONResponse
+import asyncio
 import os
 import shutil
 from datetime import datetime
@@ -7,7 +8,10 @@ from typing import List
 import uuid
 from typing import Dict, Any
 from ..core.config import settings
-from ..services.document_ai import DocumentAIService  # ✅ ADD THIS
+from ..services.registry import services
+from ..services.uploads import UploadTooLargeError, stream_upload_to_disk
+from ..services.document_processing import analyze_stored_document, build_ai_processing_response
+from ..services.jobs import JobQueueFullError, job_manager
 from ..models.merchant import MerchantApplication
 from pydantic import BaseModel
 from ..database import get_database
@@ -56,137 +60,78 @@ def validate_file(file: UploadFile) -> bool:
         print(f"Validation error: {e}")
         return False
 
+async def store_upload(file: UploadFile, document_type: str) -> Dict[str, Any]:
+    """Validate an upload and stream it into the document type directory"""
+    # Validate file
+    if not validate_file(file):
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Invalid file. Allowed extensions: {list(ALLOWED_EXTENSIONS)}"
+        )
+    
+    # Generate unique filename
+    file_id = str(uuid.uuid4())
+    file_ext = os.path.splitext(file.filename)[1].lower()
+    new_filename = f"{file_id}{file_ext}"
+    
+    # Create document type directory
+    doc_dir = os.path.join(settings.UPLOAD_DIR, document_type)
+    os.makedirs(doc_dir, exist_ok=True)
+    
+    # Stream to disk, rejecting as soon as the size limit is crossed
+    file_path = os.path.join(doc_dir, new_filename)
+    try:
+        stored_upload = await stream_upload_to_disk(file, file_path)
+    except UploadTooLargeError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File too large. Max: {settings.MAX_FILE_SIZE}"
+        )
+    
+    print(f"📁 File saved to: {file_path}")
+    
+    return {
+        "file_id": file_id,
+        "original_filename": file.filename,
+        "saved_filename": new_filename,
+        "document_type": document_type,
+        "file_path": file_path,
+        "file_size": stored_upload.size,
+        "sha256": stored_upload.sha256,
+        "upload_timestamp": datetime.now().isoformat()
+    }
+
+def build_analysis_input(upload_data: Dict[str, Any], content_type: str) -> Dict[str, Any]:
+    """Arguments for analyze_stored_document from a stored upload"""
+    return {
+        "file_path": upload_data["file_path"],
+        "file_size": upload_data["file_size"],
+        "file_ext": os.path.splitext(upload_data["saved_filename"])[1],
+        "content_type": content_type,
+        "document_type": upload_data["document_type"],
+        "sha256": upload_data["sha256"]
+    }
+
 @router.post("/upload-and-process")  
 async def upload_and_process_document(
     file: UploadFile = File(...),
-    document_type: str = "business_license"
+    document_type: str = Form("business_license")
 ):
     """Upload and process document with Google AI - MULTI-MODAL VERSION"""
     try:
         print(f"🚀 Processing file: {file.filename}, type: {file.content_type}")
         
-        # Validate file
-        if not validate_file(file):
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Invalid file. Allowed extensions: {list(ALLOWED_EXTENSIONS)}"
-            )
-        
-        # Read file content
-        file_content = await file.read()
-        file_size = len(file_content)
-        
-        if file_size > settings.MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File too large. Size: {file_size}, Max: {settings.MAX_FILE_SIZE}"
-            )
-        
-        # Generate unique filename
-        file_id = str(uuid.uuid4())
-        file_ext = os.path.splitext(file.filename)[1].lower()
-        new_filename = f"{file_id}{file_ext}"
-        
-        # Create document type directory
-        doc_dir = os.path.join(settings.UPLOAD_DIR, document_type)
-        os.makedirs(doc_dir, exist_ok=True)
-        
-        # Save file
-        file_path = os.path.join(doc_dir, new_filename)
-        with open(file_path, "wb") as buffer:
-            buffer.write(file_content)
-        
-        print(f"📁 File saved to: {file_path}")
+        upload_data = await store_upload(file, document_type)
         
         # ✅ NEW: Use Multi-Modal AI Fusion
-        ai_results = {}
-        if file_ext == '.pdf' or file_ext in ['.jpg', '.jpeg', '.png']:
-            try:
-                from ..services.google_ai import google_ai_services
-                
-                print(f"🤖 Starting multi-modal AI fusion analysis...")
-                
-                # Call the multi-modal fusion
-                ai_results = await google_ai_services.multi_modal_fusion_analysis(
-                    file_content, 
-                    file.content_type or "application/pdf"
-                )
-                
-                print(f"✅ Multi-modal fusion completed!")
-                print(f"   - Document AI confidence: {ai_results.get('document_ai', {}).get('confidence', 0):.2f}")
-                print(f"   - Vision AI score: {ai_results.get('vision_ai', {}).get('authenticity_score', 0):.2f}")
-                print(f"   - Fusion confidence: {ai_results.get('fusion', {}).get('fusion_confidence', 0):.2f}")
-                
-            except Exception as ai_error:
-                print(f"⚠️ AI processing error: {ai_error}")
-                # Fallback to basic response
-                ai_results = {
-                    "status": "ai_processing_failed",
-                    "error": str(ai_error),
-                    "message": "File uploaded but AI processing encountered an issue",
-                    "fusion": {"fusion_confidence": 0.0}
-                }
-        else:
-            ai_results = {
-                "status": "skipped",
-                "message": "AI processing only available for PDF and image files",
-                "file_type": file_ext
-            }
-        
-        # ✅ NEW: Format response to match what frontend expects
-        # Extract key data for frontend compatibility
-        confidence_score = 0.0
-        form_fields = {}
-        full_text = ""
-        
-        if "fusion" in ai_results and ai_results.get("status") != "ai_processing_failed":
-            # Get fusion confidence
-            confidence_score = ai_results.get("fusion", {}).get("fusion_confidence", 0.0)
-            
-            # Get extracted data from Document AI
-            doc_ai_data = ai_results.get("document_ai", {})
-            form_fields = doc_ai_data.get("form_fields", [])
-            full_text = doc_ai_data.get("text", "")
-            
-            # Convert form_fields list to dict for frontend
-            if isinstance(form_fields, list):
-                form_fields_dict = {}
-                for field in form_fields:
-                    if isinstance(field, dict):
-                        name = field.get("name", "")
-                        value = field.get("value", "")
-                        if name and value:
-                            form_fields_dict[name] = value
-                form_fields = form_fields_dict
+        ai_results = await analyze_stored_document(**build_analysis_input(upload_data, file.content_type))
         
         # Return comprehensive response with fusion data
         return {
             "status": "success",
             "message": "File uploaded and processed with multi-modal AI fusion",
-            "upload_data": {
-                "file_id": file_id,
-                "original_filename": file.filename,
-                "saved_filename": new_filename,
-                "document_type": document_type,
-                "file_path": file_path,
-                "file_size": file_size,
-                "upload_timestamp": datetime.now().isoformat()
-            },
-            "ai_processing": {
-                "status": ai_results.get("status", "success"),
-                "confidence_score": confidence_score,
-                "full_text": full_text[:1000] if full_text else "",  # Truncate for response
-                "full_text_length": len(full_text),
-                "form_fields": form_fields,
-                "multi_modal_fusion": {
-                    "document_ai_confidence": ai_results.get("document_ai", {}).get("confidence", 0.0),
-                    "vision_ai_score": ai_results.get("vision_ai", {}).get("authenticity_score", 0.0),
-                    "fusion_confidence": confidence_score,
-                    "recommended_action": ai_results.get("fusion", {}).get("recommended_action", "manual_review"),
-                    "processing_quality": ai_results.get("fusion", {}).get("processing_quality", "unknown"),
-                    "validation_results": ai_results.get("fusion", {}).get("validation_results", {}),
-                }
-            }
+            "upload_data": upload_data,
+            "ai_processing": build_ai_processing_response(ai_results)
         }
         
     except HTTPException:
@@ -197,6 +142,121 @@ async def upload_and_process_document(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
 
+@router.post("/upload-and-process-batch")
+async def upload_and_process_documents_batch(
+    files: List[UploadFile] = File(...),
+    document_types: List[str] = Form(...)
+):
+    """Upload several documents of one application and process them concurrently"""
+    if len(files) != len(document_types):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Got {len(files)} files but {len(document_types)} document types"
+        )
+    if len(files) > settings.BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many files. Max per batch: {settings.BATCH_MAX_FILES}"
+        )
+    
+    print(f"🚀 Processing batch of {len(files)} files")
+    
+    # Store every upload first; a bad file fails only its own entry
+    stored = []
+    for file, document_type in zip(files, document_types):
+        try:
+            stored.append((file, await store_upload(file, document_type), None))
+        except HTTPException as e:
+            stored.append((file, None, e.detail))
+    
+    request_slots = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY_PER_REQUEST)
+    
+    async def process_one(file: UploadFile, upload_data: Dict[str, Any], error: str) -> Dict[str, Any]:
+        if error:
+            return {
+                "status": "error",
+                "message": error,
+                "upload_data": {"original_filename": file.filename}
+            }
+        try:
+            async with request_slots:
+                ai_results = await analyze_stored_document(**build_analysis_input(upload_data, file.content_type))
+            return {
+                "status": "success",
+                "message": "File uploaded and processed with multi-modal AI fusion",
+                "upload_data": upload_data,
+                "ai_processing": build_ai_processing_response(ai_results)
+            }
+        except Exception as e:
+            print(f"❌ Batch document processing error: {str(e)}")
+            return {
+                "status": "error",
+                "message": f"Processing failed: {str(e)}",
+                "upload_data": upload_data
+            }
+    
+    documents = await asyncio.gather(*[process_one(*entry) for entry in stored])
+    processed = sum(1 for document in documents if document["status"] == "success")
+    
+    return {
+        "status": "success" if processed == len(documents) else "partial",
+        "message": f"Processed {processed} of {len(documents)} documents",
+        "documents": documents,
+        "summary": {
+            "total": len(documents),
+            "processed": processed,
+            "failed": len(documents) - processed
+        }
+    }
+
+@router.post("/upload-and-process-async", status_code=202)
+async def upload_and_process_document_async(
+    file: UploadFile = File(...),
+    document_type: str = Form("business_license")
+):
+    """Upload a document and queue multi-modal AI processing, returning a job to poll"""
+    try:
+        print(f"🚀 Queueing file: {file.filename}, type: {file.content_type}")
+        
+        upload_data = await store_upload(file, document_type)
+        
+        try:
+            job = await job_manager.submit(build_analysis_input(upload_data, file.content_type), upload_data)
+        except JobQueueFullError:
+            raise HTTPException(status_code=503, detail="Processing queue is full, please retry shortly")
+        
+        return {
+            "status": "accepted",
+            "message": "File uploaded, AI processing queued",
+            "job_id": job["job_id"],
+            "status_url": f"{settings.API_V1_STR}/jobs/{job['job_id']}",
+            "upload_data": upload_data
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Upload/queue error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Queueing failed: {str(e)}")
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Get progress and, once finished, the result of a document processing job"""
+    job = await job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "progress": job["progress"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "completed_at": job["completed_at"],
+        "result": job["result"],
+        "error": job["error"]
+    }
+
 # @router.post("/upload-and-process")  
 # async def upload_and_process_document(
 #     file: UploadFile = File(...),
@@ -296,7 +356,7 @@ async def upload_document(
 async def test_endpoint():
     """Test endpoint with AI service status"""
     try:
-        doc_ai_service = DocumentAIService()
+        services.get("document_ai")
         ai_status = "ready"
     except Exception as e:
         ai_status = f"error: {str(e)}"
@@ -1,12 +1,14 @@
 # backend/app/api/merchants_new.py
 from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+from typing import Dict, Any, List
 from pydantic import BaseModel
 from datetime import datetime
 import uuid
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from sqlalchemy.orm import sessionmaker
-from ..core.config import settings
+from ..services.registry import services
+from .screening import aml_status, screen_applicant
+from .duplicates import check_duplicates, index_application
 
 router = APIRouter()
 
@@ -22,6 +24,19 @@ class ContractRequest(BaseModel):
     application_id: str
     merchant_name: str
 
+def hold_for_review(approval_status: str) -> str:
+    """A screening hit or repeat application sends an approval to manual review; a denial stands"""
+    return "REVIEW" if approval_status == "APPROVED" else approval_status
+
+def status_reasons(screening: Dict[str, Any], duplicates: Dict[str, Any]) -> List[str]:
+    """Why an application was held or is flagged, beside its risk score"""
+    reasons = []
+    if screening["status"] == "potential_match":
+        reasons.append("watchlist_potential_match")
+    if duplicates["status"] == "likely_duplicate":
+        reasons.append("repeats_denied_application" if duplicates.get("repeat_of_denied") else "likely_duplicate")
+    return reasons
+
 # # Simple sync database connection for production endpoints
 # def get_sync_db():
 #     """Get synchronous database connection"""
@@ -40,7 +55,7 @@ def get_sync_db():
         import socket
         socket.getaddrinfo('db', 5432)
         
-        engine = create_engine(settings.DATABASE_URL)
+        engine = services.get("sync_database")
         SessionLocal = sessionmaker(bind=engine)
         session = SessionLocal()
         
@@ -219,6 +234,17 @@ async def submit_merchant_application_test(request: ApplicationSubmissionRequest
         approval_status = "APPROVED" if risk_score >= 70 else "DENIED"
         risk_level = "LOW" if risk_score >= 80 else "MEDIUM" if risk_score >= 60 else "HIGH"
         
+        # Owner and business names against the sanctions watchlist; a potential match is not approved
+        screening = await screen_applicant(request.personal_data, request.business_data)
+        if screening["status"] == "potential_match":
+            approval_status = hold_for_review(approval_status)
+        
+        # Repeat applicants (same EIN, bank account, phone or email, or similar name at a similar address) too
+        duplicates = await check_duplicates(request.personal_data, request.business_data)
+        if duplicates["status"] == "likely_duplicate":
+            approval_status = hold_for_review(approval_status)
+        reasons = status_reasons(screening, duplicates)
+        
         # Generate terms if approved
         terms = generate_merchant_terms(request.business_data, risk_score) if approval_status == "APPROVED" else None
         
@@ -232,10 +258,15 @@ async def submit_merchant_application_test(request: ApplicationSubmissionRequest
             "risk_level": risk_level,
             "status": approval_status,
             "terms": terms,
+            "screening": screening,
+            "aml_status": aml_status(screening),
+            "duplicates": duplicates,
+            "status_reasons": reasons,
             "created_at": datetime.now().isoformat()
         }
         
         applications_store[application_id] = application_data
+        await index_application(application_id, approval_status, request.personal_data, request.business_data)
         
         return {
             "status": "success",
@@ -244,6 +275,10 @@ async def submit_merchant_application_test(request: ApplicationSubmissionRequest
             "risk_score": risk_score,
             "risk_level": risk_level,
             "terms": terms,
+            "screening": screening,
+            "aml_status": aml_status(screening),
+            "duplicates": duplicates,
+            "status_reasons": reasons,
             "processing_time": "2.3 minutes",
             "message": f"Application {approval_status.lower()}"
         }
@@ -399,6 +434,15 @@ async def submit_merchant_application_production(request: ApplicationSubmissionR
         approval_status = "APPROVED" if risk_score >= 70 else "DENIED"
         risk_level = "LOW" if risk_score >= 80 else "MEDIUM" if risk_score >= 60 else "HIGH"
         
+        # Sanctions watchlist screening and repeat-applicant detection; neither hit is approved
+        screening = await screen_applicant(request.personal_data, request.business_data)
+        if screening["status"] == "potential_match":
+            approval_status = hold_for_review(approval_status)
+        duplicates = await check_duplicates(request.personal_data, request.business_data)
+        if duplicates["status"] == "likely_duplicate":
+            approval_status = hold_for_review(approval_status)
+        reasons = status_reasons(screening, duplicates)
+        
         # Generate terms
         terms = generate_merchant_terms(request.business_data, risk_score) if approval_status == "APPROVED" else None
         
@@ -412,8 +456,13 @@ async def submit_merchant_application_production(request: ApplicationSubmissionR
             "risk_level": risk_level,
             "status": approval_status,
             "terms": terms,
+            "screening": screening,
+            "aml_status": aml_status(screening),
+            "duplicates": duplicates,
+            "status_reasons": reasons,
             "created_at": datetime.now().isoformat()
         }
+        await index_application(application_id, approval_status, request.personal_data, request.business_data)
         
         return {
             "status": "success",
@@ -422,6 +471,10 @@ async def submit_merchant_application_production(request: ApplicationSubmissionR
             "risk_score": risk_score,
             "risk_level": risk_level,
             "terms": terms,
+            "screening": screening,
+            "aml_status": aml_status(screening),
+            "duplicates": duplicates,
+            "status_reasons": reasons,
             "processing_time": "2.3 minutes",
             "message": f"Application {approval_status.lower()}",
             "saved_to_database": False,
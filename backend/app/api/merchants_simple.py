@@ -4,11 +4,6 @@ from typing import Dict, Any
 from pydantic import BaseModel
 from datetime import datetime
 import uuid
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
 import io
 import os
 from fastapi.responses import Response
@@ -0,0 +1,228 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
+import asyncio
+import json
+import logging
+from sqlalchemy import text
+from ..core.config import settings
+from ..services.metrics import metrics
+from ..services.registry import services
+from ..services.screening import applicant_names, rescreen
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# Last portfolio rescreen, and the list version it ran against
+rescreen_state: Dict[str, Any] = {"running": False, "list_version": None, "last": None}
+_rescreen_lock = asyncio.Lock()
+_rescreen_task: Optional[asyncio.Task] = None
+_watcher_task: Optional[asyncio.Task] = None
+
+class ScreeningRequest(BaseModel):
+    personal_data: Dict[str, Any] = {}
+    business_data: Dict[str, Any] = {}
+
+async def screen_applicant(personal_data: Dict[str, Any], business_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Screen an application's owner and business names against the watchlist
+
+    Returns status clear / potential_match, or unavailable when screening is
+    off or the watchlist cannot be loaded; submission never fails on it.
+    """
+    names = applicant_names(personal_data, business_data)
+    if not settings.SCREENING_ENABLED:
+        return {"status": "unavailable", "matches": [], "screened_fields": list(names), "error": "screening disabled"}
+    try:
+        watchlist = services.get("watchlist")
+        result = await asyncio.to_thread(
+            watchlist.screen, names, settings.SCREENING_MATCH_THRESHOLD, settings.SCREENING_MAX_MATCHES
+        )
+    except Exception as e:
+        logger.error(f"Watchlist screening failed: {str(e)}")
+        metrics.increment("screening_errors")
+        return {"status": "unavailable", "matches": [], "screened_fields": list(names), "error": str(e)}
+    metrics.increment(f"screening_results.{result['status']}")
+    return result
+
+def aml_status(screening: Dict[str, Any]) -> str:
+    return {"clear": "clear", "potential_match": "review"}.get(screening["status"], "pending")
+
+def _stored_data(value: Any) -> Dict[str, Any]:
+    if isinstance(value, dict):
+        return value
+    try:
+        data = json.loads(value) if value else {}
+    except (TypeError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def portfolio_records() -> List[Tuple[str, Dict[str, str]]]:
+    """(application id, names) for every stored application, database rows first"""
+    from .merchants_new import applications_store, get_sync_db
+
+    records: Dict[str, Dict[str, str]] = {}
+    db = get_sync_db()
+    if db:
+        try:
+            rows = db.execute(text("SELECT application_id, personal_data, business_data FROM merchant_applications"))
+            for row in rows:
+                records[row.application_id] = applicant_names(_stored_data(row.personal_data), _stored_data(row.business_data))
+        except Exception as e:
+            logger.warning(f"Rescreen could not read stored applications: {str(e)}")
+        finally:
+            db.close()
+    for application_id, application in list(applications_store.items()):
+        records[application_id] = applicant_names(application.get("personal_data"), application.get("business_data"))
+    return [(application_id, names) for application_id, names in records.items() if names]
+
+def mark_for_review(application_ids: List[str]) -> int:
+    """Move stored applications to REVIEW, as a potential match does at submit time; denials stand"""
+    from .merchants_new import get_sync_db
+
+    if not application_ids:
+        return 0
+    db = get_sync_db()
+    if not db:
+        return 0
+    try:
+        result = db.execute(
+            text("UPDATE merchant_applications SET status = 'REVIEW' WHERE application_id = :application_id AND status NOT IN ('REVIEW', 'DENIED')"),
+            [{"application_id": application_id} for application_id in application_ids]
+        )
+        db.commit()
+        return result.rowcount
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Rescreen could not update stored application statuses: {str(e)}")
+        return 0
+    finally:
+        db.close()
+
+async def run_portfolio_rescreen() -> Dict[str, Any]:
+    """Rescreen every stored application against the current watchlist"""
+    from .merchants_new import applications_store
+
+    async with _rescreen_lock:
+        rescreen_state["running"] = True
+        try:
+            watchlist = services.get("watchlist")
+            index = await asyncio.to_thread(watchlist.index)
+            version = watchlist.version
+            records = await asyncio.to_thread(portfolio_records)
+            report = await asyncio.to_thread(
+                rescreen,
+                index,
+                records,
+                settings.SCREENING_MATCH_THRESHOLD,
+                settings.SCREENING_MAX_MATCHES,
+                settings.SCREENING_RESCREEN_WORKERS,
+                settings.SCREENING_RESCREEN_CHUNK_SIZE
+            )
+        finally:
+            rescreen_state["running"] = False
+
+    hits = dict(report.pop("hits"))
+    moved_to_review = 0
+    for application_id, application in list(applications_store.items()):
+        screening = hits.get(application_id) or {
+            "status": "clear",
+            "matches": [],
+            "screened_fields": list(applicant_names(application.get("personal_data"), application.get("business_data")))
+        }
+        screening["list_version"] = version
+        application["screening"] = screening
+        application["aml_status"] = aml_status(screening)
+        # A new match sends the application to review; a cleared one stays where a reviewer left it, and a denial stands
+        if screening["status"] == "potential_match" and application.get("status") not in ("REVIEW", "DENIED"):
+            application["status"] = "REVIEW"
+            moved_to_review += 1
+    moved_to_review += await asyncio.to_thread(
+        mark_for_review, [application_id for application_id in hits if application_id not in applications_store]
+    )
+    report.update({
+        "list_version": version,
+        "completed_at": datetime.now().isoformat(),
+        "potential_match_applications": sorted(hits),
+        "moved_to_review": moved_to_review
+    })
+    rescreen_state.update({"list_version": version, "last": report})
+    metrics.increment("screening_rescreens")
+    metrics.observe("screening_rescreen_seconds", report["seconds"])
+    logger.info(
+        f"Rescreened {report['records']} applications against watchlist v{version}: "
+        f"{report['potential_matches']} potential matches in {report['seconds']}s"
+    )
+    return report
+
+def _log_rescreen_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Portfolio rescreen failed: {str(task.exception())}")
+        metrics.increment("screening_rescreen_errors")
+
+def start_portfolio_rescreen() -> Optional[asyncio.Task]:
+    """Start a background rescreen, or return None while one is still running
+
+    The task is kept here so it is not garbage-collected mid-run; checking
+    and starting it without an await in between means only one can start.
+    """
+    global _rescreen_task
+    if _rescreen_task is not None and not _rescreen_task.done():
+        return None
+    _rescreen_task = asyncio.create_task(run_portfolio_rescreen())
+    _rescreen_task.add_done_callback(_log_rescreen_failure)
+    return _rescreen_task
+
+async def _watch_watchlist():
+    """Rescreen the portfolio whenever a new watchlist version is loaded"""
+    while True:
+        await asyncio.sleep(settings.SCREENING_CHECK_SECONDS)
+        try:
+            watchlist = services.get("watchlist")
+            await asyncio.to_thread(watchlist.index)
+            if rescreen_state["list_version"] is None:
+                # First load since startup: applications were screened at submit time
+                rescreen_state["list_version"] = watchlist.version
+            elif watchlist.version != rescreen_state["list_version"]:
+                # A failed rescreen leaves the version behind and is retried on the next check
+                start_portfolio_rescreen()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Watchlist rescreen failed: {str(e)}")
+
+def start_rescreen_watcher():
+    global _watcher_task
+    if _watcher_task is None or _watcher_task.done():
+        _watcher_task = asyncio.create_task(_watch_watchlist())
+
+async def stop_rescreen_watcher():
+    """Stop the watcher and any rescreen still running"""
+    global _watcher_task, _rescreen_task
+    for task in (_watcher_task, _rescreen_task):
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    _watcher_task = _rescreen_task = None
+
+@router.post("/screening/check")
+async def check_names(request: ScreeningRequest):
+    """Screen owner and business names without submitting an application"""
+    return await screen_applicant(request.personal_data, request.business_data)
+
+@router.post("/screening/rescreen")
+async def start_rescreen():
+    """Rescreen every stored application in the background"""
+    if not settings.SCREENING_ENABLED:
+        raise HTTPException(status_code=409, detail="Screening is disabled")
+    if start_portfolio_rescreen() is None:
+        raise HTTPException(status_code=409, detail="A rescreen is already running")
+    return {"status": "started"}
+
+@router.get("/screening/status")
+async def screening_status():
+    try:
+        watchlist = services.get("watchlist").status()
+    except Exception as e:
+        watchlist = {"error": str(e)}
+    return {"enabled": settings.SCREENING_ENABLED, "watchlist": watchlist, "rescreen": rescreen_state}
@@ -1,10 +1,4 @@
 from fastapi import HTTPException
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
 import os
 from datetime import datetime
 
@@ -12,6 +6,13 @@ def generate_contract_pdf(application_data: dict, output_dir: str = "contracts")
     """Generate a professional merchant processing agreement PDF"""
     
     import os
+    # reportlab is only loaded once a contract is actually generated, to keep cold starts fast
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_LEFT
     
     # ✅ ADD: Debug the working directory and paths
     print(f"🔍 Current working directory: {os.getcwd()}")
@@ -2,7 +2,7 @@
 import os
 from functools import lru_cache
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     # Project settings
@@ -29,6 +29,148 @@ class Settings(BaseSettings):
     # AI Services settings
     DOCUMENT_AI_PROCESSOR_ID: str = "452734bdc979b2a5"
     DOCUMENT_AI_LOCATION: str = "us"
+    AI_EXECUTOR_MAX_WORKERS: int = 32  # Threads for blocking Google client calls
+    
+    # PDFs longer than this are split into page ranges processed concurrently
+    # (synchronous Document AI processing is limited to 15 pages)
+    DOCUMENT_AI_SPLIT_PAGE_THRESHOLD: int = 15
+    DOCUMENT_AI_PAGES_PER_RANGE: int = 10
+    DOCUMENT_AI_RANGE_MAX_CONCURRENCY: int = 8  # Per document; every range also counts against quota
+    
+    # Local pre-pass over the embedded text of digitally generated PDFs. When the
+    # text layer is good enough: "native" still calls Document AI but has it parse
+    # the embedded text instead of OCR; "skip" uses it instead of Document AI, with
+    # no cloud check and a fixed confidence, so it is opt-in; "off" always OCRs
+    TEXT_LAYER_FAST_PATH: str = "native"
+    TEXT_LAYER_MAX_PAGES: int = 50
+    TEXT_LAYER_MIN_CHARS_PER_PAGE: int = 50
+    TEXT_LAYER_MIN_COVERAGE: float = 1.0  # Fraction of pages with text; a scanned page needs OCR
+    TEXT_LAYER_MIN_QUALITY: float = 0.9
+    # Quality is close to 1.0 on any clean PDF and is not an OCR confidence: the
+    # "skip" result reports at most what Document AI OCR gives such documents
+    TEXT_LAYER_MAX_CONFIDENCE: float = 0.95
+    
+    # Vision AI features sent in the single annotate request, per document type
+    VISION_DEFAULT_FEATURES: List[str] = ["text_detection", "object_localization", "logo_detection"]
+    VISION_FEATURES_BY_DOCUMENT_TYPE: Dict[str, List[str]] = {
+        "business_license": ["text_detection", "object_localization", "logo_detection"],
+        "ein_letter": ["text_detection", "object_localization", "logo_detection"],
+        "drivers_license": ["text_detection", "object_localization", "logo_detection", "face_detection"],
+        "bank_statement": ["text_detection", "object_localization", "logo_detection"]
+    }
+    # Take Vision's text features from Document AI instead of OCR-ing the page twice;
+    # Vision text detection then only runs when Document AI fails
+    VISION_OCR_FROM_DOCUMENT_AI: bool = True
+    
+    # Natural Language analysis over the document text, in sentence-aligned chunks
+    # analyzed concurrently; chunks seen before (boilerplate) come from the cache
+    NLP_MAX_DOCUMENT_CHARACTERS: int = 20000  # Per document
+    NLP_CHUNK_CHARACTERS: int = 2000
+    NLP_MAX_CONCURRENCY: int = 16  # Process-wide in-flight chunk requests
+    NLP_CHUNK_CACHE_MAX_ENTRIES: int = 4096  # 0 disables the chunk cache
+    NLP_CHUNK_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    
+    # Risk terms matched over the full document text (tab-separated term and category)
+    RISK_LEXICON_PATH: str = "app/data/risk_lexicon.tsv"
+    RISK_LEXICON_CHECK_SECONDS: float = 30.0  # How often the file is checked for edits
+    RISK_MAX_MATCHES: int = 100  # Matches listed per document
+    # Categories that fail fusion's no_risk_keywords check; adverse_terms,
+    # account_activity, legal_action and restricted_* matches are reported only
+    RISK_DECISION_CATEGORIES: List[str] = ["adverse_status", "financial_crime", "prohibited_goods", "prohibited_services"]
+    
+    # Sanctions / watchlist screening of owner and business names (OFAC SDN-style CSV or XML).
+    # Off until SCREENING_WATCHLIST_PATH points at a real list; app/data/watchlist_sample.csv
+    # is made-up test data and would clear every real applicant
+    SCREENING_ENABLED: bool = False
+    SCREENING_WATCHLIST_PATH: Optional[str] = None  # e.g. sdn.csv or sdn_advanced.xml
+    SCREENING_ALIAS_PATH: Optional[str] = None  # OFAC alt.csv next to an sdn.csv
+    SCREENING_CHECK_SECONDS: float = 60.0  # How often the files are checked for a new list
+    SCREENING_MATCH_THRESHOLD: float = 0.85  # Name similarity that counts as a potential match
+    SCREENING_CANDIDATE_THRESHOLD: float = 0.5  # Trigram Dice a name needs before it is scored
+    SCREENING_MAX_MATCHES: int = 5  # Per screened name
+    SCREENING_RESCREEN_ON_UPDATE: bool = True  # Rescreen the whole portfolio when the list changes
+    SCREENING_RESCREEN_WORKERS: int = os.cpu_count() or 1
+    SCREENING_RESCREEN_CHUNK_SIZE: int = 5000  # Applications per worker task
+    
+    # Repeat-applicant detection at submit time: exact EIN, bank account, phone and email,
+    # and MinHash LSH over business name and address; loaded from the database in the background on first use
+    DUPLICATE_DETECTION_ENABLED: bool = True
+    DUPLICATE_MINHASH_PERMUTATIONS: int = 32
+    DUPLICATE_LSH_BANDS: int = 8  # Must divide the permutations; fewer bands -> stricter blocking
+    DUPLICATE_NAME_THRESHOLD: float = 0.6  # Estimated trigram Jaccard of the business names
+    DUPLICATE_ADDRESS_THRESHOLD: float = 0.6  # ...and of the addresses, both needed for a match
+    DUPLICATE_MAX_BUCKET: int = 200  # Newest applications read per identifier or LSH bucket
+    DUPLICATE_MAX_MATCHES: int = 10
+    DUPLICATE_REBUILD_BATCH_SIZE: int = 10000  # Rows fetched per round trip on rebuild
+    
+    # Fusion pipeline stages (document_ai, vision, nlp, fusion), per document type
+    FUSION_DEFAULT_STAGES: List[str] = ["document_ai", "vision", "nlp", "fusion"]
+    FUSION_STAGES_BY_DOCUMENT_TYPE: Dict[str, List[str]] = {}
+    
+    # Deadlines, per-RPC timeouts, retries and hedging for Google AI calls
+    FUSION_DEADLINE_SECONDS: float = 45.0  # Request-level budget for one document
+    AI_STAGE_BUDGET_FRACTIONS: Dict[str, float] = {"document_ai": 0.75, "vision": 0.5, "nlp": 0.25}
+    AI_OPTIONAL_STAGES: List[str] = ["vision", "nlp"]  # Dropped instead of failing when the budget runs out
+    AI_MIN_STAGE_BUDGET_SECONDS: float = 1.0
+    AI_RPC_TIMEOUT_SECONDS: Dict[str, float] = {"document_ai": 30.0, "vision": 10.0, "nlp": 10.0}
+    AI_RPC_MAX_ATTEMPTS: int = 3
+    AI_RETRY_BASE_DELAY_SECONDS: float = 0.2
+    AI_RETRY_MAX_DELAY_SECONDS: float = 2.0
+    AI_HEDGE_ENABLED: bool = False
+    AI_HEDGE_STAGES: List[str] = ["vision", "nlp"]  # Idempotent calls only
+    AI_HEDGE_MIN_SAMPLES: int = 50  # Latency samples needed before the p95 is trusted
+    
+    # AI provider behind GoogleAIServices: "google" or "mock" (app/mock_ai, no network or credentials)
+    AI_PROVIDER: str = "google"
+    # Mock provider behaviour per stage: latency and confidence are [mean, stddev] of a clipped normal
+    MOCK_AI_LATENCY_SECONDS: Dict[str, List[float]] = {"document_ai": [1.2, 0.3], "vision": [0.5, 0.15], "nlp": [0.3, 0.1]}
+    MOCK_AI_ERROR_RATE: Dict[str, float] = {"document_ai": 0.0, "vision": 0.0, "nlp": 0.0}
+    MOCK_AI_CONFIDENCE: Dict[str, List[float]] = {"document_ai": [0.9, 0.05], "vision": [0.85, 0.1], "nlp": [0.8, 0.1]}
+    MOCK_AI_SEED: Optional[int] = None
+    # Record-and-replay of AI responses: "off", "record" (save every response) or "replay" (serve them offline)
+    AI_CASSETTE_MODE: str = "off"
+    AI_CASSETTE_DIR: str = "cassettes"
+    AI_CASSETTE_REPLAY_LATENCY: bool = True  # Sleep for the recorded latency, or answer immediately
+    
+    # Lazily created clients, warmed in the background after startup. Only the
+    # core clients by default: the rest are built on first use
+    SERVICE_WARMUP_ENABLED: bool = True
+    SERVICE_WARMUP_SERVICES: List[str] = ["google_ai", "document_ai", "database", "sync_database"]
+    SERVICE_WARMUP_TIMEOUT_SECONDS: float = 10.0
+    
+    # Per-service circuit breakers around Document AI, Vision and NLP
+    CIRCUIT_BREAKER_ENABLED: bool = True
+    CIRCUIT_BREAKER_WINDOW_SIZE: int = 20  # Most recent calls considered
+    CIRCUIT_BREAKER_MIN_CALLS: int = 10
+    CIRCUIT_BREAKER_ERROR_RATE: float = 0.5
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS: Dict[str, float] = {"document_ai": 20.0, "vision": 8.0, "nlp": 8.0}
+    CIRCUIT_BREAKER_SLOW_CALL_RATE: float = 0.8
+    CIRCUIT_BREAKER_OPEN_SECONDS: float = 30.0
+    CIRCUIT_BREAKER_HALF_OPEN_CALLS: int = 3
+    
+    # Outbound quota governor for Google AI APIs, shared across workers through Redis
+    QUOTA_GOVERNOR_ENABLED: bool = True
+    QUOTA_BACKEND: str = "local"  # "redis" (shared, falls back to in-process) or "local"
+    # Requests per minute by API, or by API and feature ("vision:face_detection")
+    QUOTA_LIMITS_PER_MINUTE: Dict[str, float] = {"document_ai": 120, "vision": 1800, "nlp": 600}
+    QUOTA_BURST_SECONDS: float = 5.0  # Bucket capacity, in seconds of refill
+    QUOTA_MAX_WAIT_SECONDS: float = 2.0  # How long a caller queues for a token before it is throttled
+    QUOTA_LOCAL_SHARE: float = 1.0  # Fraction of each limit a process may use while Redis is unreachable
+    
+    # Cross-request Vision AI micro-batching
+    VISION_BATCHING_ENABLED: bool = True
+    VISION_BATCH_MAX_SIZE: int = 16  # Vision batch annotate limit
+    VISION_BATCH_MAX_BYTES: int = 10 * 1024 * 1024
+    VISION_BATCH_WINDOW_MS: int = 20
+    
+    # Multi-modal fusion result cache (keyed by file SHA-256, processor and features)
+    FUSION_CACHE_ENABLED: bool = True
+    FUSION_CACHE_MAX_ENTRIES: int = 512
+    FUSION_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    FUSION_CACHE_SHARED_BACKEND: str = "none"  # none, redis, local
+    
+    # Redis (shared cache tier)
+    REDIS_URL: str = "redis://redis:6379/0"
     
     # Security
     SECRET_KEY: str = "merchant-onboarding-secret-key-2024"
@@ -42,6 +184,25 @@ class Settings(BaseSettings):
     # Upload settings
     UPLOAD_DIR: str = "/app/uploads"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
+    UPLOAD_CHUNK_SIZE: int = 256 * 1024  # Bytes held in memory while streaming an upload
+    MULTIPART_OVERHEAD: int = 64 * 1024  # Allowance for multipart framing over MAX_FILE_SIZE
+    
+    # Process-wide budget for document payloads held in memory during AI processing
+    PAYLOAD_MEMORY_BUDGET_BYTES: int = 256 * 1024 * 1024
+    PAYLOAD_BUDGET_MAX_WAIT_SECONDS: float = 2.0  # Wait this long for budget before spilling to disk
+    
+    # Concurrency limits for documents in the AI pipeline
+    DOCUMENT_PROCESSING_MAX_CONCURRENCY: int = 32  # Global, across all requests
+    BATCH_MAX_FILES: int = 10
+    BATCH_MAX_CONCURRENCY_PER_REQUEST: int = 4
+    
+    # Asynchronous document processing jobs
+    JOB_QUEUE_BACKEND: str = "memory"  # memory, redis
+    JOB_WORKERS_ENABLED: bool = True  # Run job workers inside the API process
+    JOB_WORKER_CONCURRENCY: int = 4
+    JOB_QUEUE_MAX_SIZE: int = 1000
+    JOB_LEASE_SECONDS: int = 60  # Redis: a job whose worker stops renewing this long is requeued
+    JOB_RESULT_TTL_SECONDS: int = 24 * 60 * 60
     
     # CORS settings
     BACKEND_CORS_ORIGINS: List[str] = [
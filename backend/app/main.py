@@ -9,6 +9,13 @@ from .api import merchants_new
 from .api import merchants  # ✅ ADD THIS LINE
 from .api import merchants_simple
 from .api import contracts
+from .api import screening
+from .api import duplicates
+from .services.metrics import metrics
+from .services.jobs import job_manager
+from .services.circuit_breaker import circuit_breakers
+from .services.registry import services
+from .services.uploads import RequestBodyLimitMiddleware
 
 # Configure logging
 logging.basicConfig(
@@ -28,6 +35,16 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Reject oversized bodies while they are received, before multipart parsing spools them
+# (the batch route takes up to BATCH_MAX_FILES files in one body; each file is still checked in store_upload)
+app.add_middleware(
+    RequestBodyLimitMiddleware,
+    max_body_size=settings.MAX_FILE_SIZE + settings.MULTIPART_OVERHEAD,
+    path_limits={
+        f"{settings.API_V1_STR}/upload-and-process-batch": settings.BATCH_MAX_FILES * (settings.MAX_FILE_SIZE + settings.MULTIPART_OVERHEAD)
+    }
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -49,6 +66,10 @@ app.include_router(merchants_simple.router, prefix=settings.API_V1_STR, tags=["m
 
 app.include_router(contracts.router, prefix=settings.API_V1_STR, tags=["contracts"]) 
 
+app.include_router(screening.router, prefix=settings.API_V1_STR, tags=["screening"])
+
+app.include_router(duplicates.router, prefix=settings.API_V1_STR, tags=["duplicates"])
+
 # Serve uploaded files
 app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
 
@@ -66,18 +87,36 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {
-        "status": "healthy",
+        "status": "degraded" if circuit_breakers.any_open() else "healthy",
         "environment": settings.ENVIRONMENT,
         "ai_services": "google_cloud",
+        "circuit_breakers": circuit_breakers.states(),
+        "services": services.status(),
         "database": "postgresql",
         "version": settings.VERSION
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    return metrics.snapshot()
+
 @app.on_event("startup")
 async def startup_event():
     logger.info(f"Starting {settings.PROJECT_NAME} v{settings.VERSION}")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Debug mode: {settings.DEBUG}")
+    if settings.JOB_WORKERS_ENABLED:
+        job_manager.start()
+    if settings.SERVICE_WARMUP_ENABLED:
+        services.start_warmup()
+    if settings.SCREENING_ENABLED and settings.SCREENING_RESCREEN_ON_UPDATE:
+        screening.start_rescreen_watcher()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await job_manager.stop()
+    await screening.stop_rescreen_watcher()
+    await services.shutdown()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,2 @@
+# app/mock_ai/__init__.py
+from .clients import MockAIProvider
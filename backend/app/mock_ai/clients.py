@@ -0,0 +1,175 @@
+# app/mock_ai/clients.py
+import hashlib
+import logging
+import random
+import re
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence
+from google.api_core import exceptions as google_exceptions
+from ..core.config import settings
+from ..services.ai_providers import AIClients
+from .samples import SAMPLE_DOCUMENTS
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_NAMES = sorted(SAMPLE_DOCUMENTS)
+
+# Rough Natural Language API entity types for the mock NLP client
+NLP_ENTITY_PATTERNS = [
+    ("ORGANIZATION", re.compile(r"\b(?:[A-Z][\w&'-]* )+(?:LLC|Inc\.?|Corp\.?|Ltd\.?|Company|Bank|BANK|Service|Department of [A-Z]\w+(?: [A-Z]\w+)*)\b")),
+    ("PERSON", re.compile(r"(?:Owner|Responsible Party|Account Holder|Authorized by): ([A-Z][a-z]+ [A-Z][a-z]+)\b")),
+    ("ADDRESS", re.compile(r"\b\d+ [A-Z]\w+ (?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd)\b[^\n]*?\b[A-Z]{2} \d{5}\b")),
+    ("LOCATION", re.compile(r"\b(?:State of [A-Z]\w+|San Francisco|California)\b")),
+    ("DATE", re.compile(r"\b(?:January|February|March|April|May|June|July|August|September|October|November|December) \d{1,2}, \d{4}\b")),
+    ("PRICE", re.compile(r"[+-]?\$[\d,]+\.\d{2}"))
+]
+
+class MockBehaviour:
+    """Latency, error rate and confidence draws for one mocked backend"""
+
+    def __init__(self, stage: str, rng: random.Random):
+        self.stage = stage
+        self.rng = rng
+
+    def _normal(self, values: Sequence[float], low: float, high: float) -> float:
+        mean, stddev = values
+        return min(high, max(low, self.rng.gauss(mean, stddev)))
+
+    def confidence(self) -> float:
+        return round(self._normal(settings.MOCK_AI_CONFIDENCE.get(self.stage, (0.85, 0.1)), 0.0, 1.0), 4)
+
+    def call(self, timeout: Optional[float] = None):
+        """Block like a gRPC call would, then maybe fail"""
+        latency = self._normal(settings.MOCK_AI_LATENCY_SECONDS.get(self.stage, (0.2, 0.05)), 0.0, float("inf"))
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise google_exceptions.DeadlineExceeded(f"mock {self.stage} call exceeded {timeout:.2f}s")
+        time.sleep(latency)
+        if self.rng.random() < settings.MOCK_AI_ERROR_RATE.get(self.stage, 0.0):
+            raise google_exceptions.ServiceUnavailable(f"mock {self.stage} backend unavailable")
+
+def pick_sample(content: Any) -> Dict[str, Any]:
+    """Same upload, same sample document"""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    digest = hashlib.sha256(content or b"").digest()
+    return SAMPLE_DOCUMENTS[SAMPLE_NAMES[digest[0] % len(SAMPLE_NAMES)]]
+
+def _text_anchor(text: str, value: str):
+    start = text.find(value)
+    return SimpleNamespace(text_segments=[SimpleNamespace(start_index=start, end_index=start + len(value))])
+
+class MockDocumentAIClient:
+    def __init__(self, rng: random.Random):
+        self.behaviour = MockBehaviour("document_ai", rng)
+
+    def process_document(self, request=None, timeout=None, retry=None, **kwargs):
+        self.behaviour.call(timeout)
+        raw_document = getattr(request, "raw_document", None)
+        content = getattr(raw_document, "content", None) or getattr(getattr(request, "gcs_document", None), "gcs_uri", "")
+        sample = pick_sample(content)
+        text = sample["text"]
+
+        form_fields = []
+        for line in text.splitlines():
+            name, separator, value = line.partition(": ")
+            if separator and value:
+                form_fields.append(SimpleNamespace(
+                    field_name=SimpleNamespace(text_anchor=_text_anchor(text, name + ":"), confidence=self.behaviour.confidence()),
+                    field_value=SimpleNamespace(text_anchor=_text_anchor(text, value), confidence=self.behaviour.confidence())
+                ))
+        entities = [
+            SimpleNamespace(type_=entity_type, mention_text=mention, confidence=self.behaviour.confidence(), normalized_value=None)
+            for entity_type, mention in sample["entities"]
+        ]
+        document = SimpleNamespace(text=text, pages=[SimpleNamespace(form_fields=form_fields)], entities=entities)
+        return SimpleNamespace(document=document)
+
+class MockVisionClient:
+    def __init__(self, rng: random.Random):
+        self.behaviour = MockBehaviour("vision", rng)
+
+    def _annotate(self, request) -> SimpleNamespace:
+        features = {getattr(feature.type_, "name", str(feature.type_)) for feature in request.features}
+        sample = pick_sample(getattr(request.image, "content", b""))
+        response = SimpleNamespace(
+            error=SimpleNamespace(message=""),
+            text_annotations=[],
+            localized_object_annotations=[],
+            logo_annotations=[],
+            face_annotations=[]
+        )
+        if "TEXT_DETECTION" in features or "DOCUMENT_TEXT_DETECTION" in features:
+            response.text_annotations = [SimpleNamespace(description=sample["text"], confidence=self.behaviour.confidence())]
+        if "OBJECT_LOCALIZATION" in features:
+            for name in sample["objects"]:
+                score = self.behaviour.confidence()
+                if score >= 0.5:
+                    response.localized_object_annotations.append(SimpleNamespace(name=name, score=score))
+        if "LOGO_DETECTION" in features:
+            for description in sample["logos"]:
+                score = self.behaviour.confidence()
+                if score >= 0.5:
+                    response.logo_annotations.append(SimpleNamespace(description=description, score=score))
+        return response
+
+    def batch_annotate_images(self, requests=None, timeout=None, retry=None, **kwargs):
+        self.behaviour.call(timeout)
+        return SimpleNamespace(responses=[self._annotate(request) for request in requests])
+
+class MockLanguageClient:
+    def __init__(self, rng: random.Random):
+        self.behaviour = MockBehaviour("nlp", rng)
+
+    def analyze_entities(self, request=None, timeout=None, retry=None, **kwargs):
+        self.behaviour.call(timeout)
+        document = request["document"] if isinstance(request, dict) else request.document
+        text = document.content
+
+        found: Dict[str, List[Any]] = {}
+        for entity_type, pattern in NLP_ENTITY_PATTERNS:
+            for match in pattern.finditer(text):
+                name = (match.group(1) if pattern.groups else match.group(0)).strip()
+                key = f"{entity_type}:{name}"
+                if key not in found:
+                    found[key] = [entity_type, name, []]
+                found[key][2].append(SimpleNamespace(text=SimpleNamespace(content=name)))
+
+        # Salience sums to 1 over the request, as with the real API
+        weights = [self.behaviour.confidence() * len(mentions) for _, _, mentions in found.values()]
+        total = sum(weights) or 1.0
+        entities = []
+        for (entity_type, name, mentions), weight in zip(found.values(), weights):
+            entities.append(SimpleNamespace(
+                name=name,
+                type_=SimpleNamespace(name=entity_type),
+                salience=round(weight / total, 4),
+                mentions=mentions
+            ))
+        entities.sort(key=lambda entity: entity.salience, reverse=True)
+        return SimpleNamespace(entities=entities)
+
+class MockStorageClient:
+    """Accepts uploads and discards them"""
+
+    def bucket(self, name: str):
+        return SimpleNamespace(blob=lambda blob_name: SimpleNamespace(upload_from_file=lambda file: None))
+
+    def close(self):
+        pass
+
+class MockAIProvider:
+    """Offline stand-ins for the Google clients with configurable latency, errors and confidence"""
+
+    name = "mock"
+
+    def create_clients(self) -> AIClients:
+        rng = random.Random(settings.MOCK_AI_SEED)
+        logger.warning("Using the mock AI provider: results are synthetic")
+        return AIClients(
+            document_ai=MockDocumentAIClient(rng),
+            vision=MockVisionClient(rng),
+            language=MockLanguageClient(rng),
+            storage=MockStorageClient()
+        )
@@ -0,0 +1,87 @@
+# app/mock_ai/samples.py
+"""Document payloads taken from the PDFs in sample-text-documents/"""
+
+SAMPLE_DOCUMENTS = {
+    "business_license": {
+        "text": (
+            "BUSINESS LICENSE\n"
+            "State of California\n"
+            "Department of Business Oversight\n"
+            "License Number: BL-2024-789456\n"
+            "Business Name: Sunny Side Bakery LLC\n"
+            "Owner: John Smith\n"
+            "Business Type: Retail Food Service\n"
+            "Address: 123 Main Street, San Francisco, CA 94102\n"
+            "Issue Date: January 15, 2024\n"
+            "Expiration Date: January 15, 2025\n"
+            "Industry: Food & Beverage\n"
+            "This license authorizes the above business to operate within the State of California.\n"
+            "Authorized by: Department of Business Oversight\n"
+        ),
+        "entities": [
+            ("license_number", "BL-2024-789456"),
+            ("business_name", "Sunny Side Bakery LLC"),
+            ("owner_name", "John Smith"),
+            ("business_address", "123 Main Street, San Francisco, CA 94102"),
+            ("issue_date", "January 15, 2024"),
+            ("expiration_date", "January 15, 2025")
+        ],
+        "logos": ["State of California"],
+        "objects": ["Document"]
+    },
+    "ein_letter": {
+        "text": (
+            "EMPLOYER IDENTIFICATION NUMBER ASSIGNMENT NOTICE\n"
+            "Internal Revenue Service\n"
+            "Department of Treasury\n"
+            "Date: January 10, 2024\n"
+            "Sunny Side Bakery LLC\n"
+            "123 Main Street\n"
+            "San Francisco, CA 94102\n"
+            "Your Employer Identification Number is: 12-3456789\n"
+            "Business Name: Sunny Side Bakery LLC\n"
+            "Entity Type: Limited Liability Company\n"
+            "Responsible Party: John Smith\n"
+            "Keep this notice for your records. You will need your EIN for tax filing, "
+            "opening business bank accounts, and other business purposes.\n"
+            "Internal Revenue Service\n"
+        ),
+        "entities": [
+            ("ein", "12-3456789"),
+            ("business_name", "Sunny Side Bakery LLC"),
+            ("entity_type", "Limited Liability Company"),
+            ("responsible_party", "John Smith"),
+            ("notice_date", "January 10, 2024")
+        ],
+        "logos": ["Internal Revenue Service"],
+        "objects": ["Document"]
+    },
+    "bank_statement": {
+        "text": (
+            "FIRST NATIONAL BANK\n"
+            "Monthly Statement\n"
+            "Account Holder: Sunny Side Bakery LLC\n"
+            "Account Number: ****-****-****-1234\n"
+            "Statement Period: March 1, 2024 - March 31, 2024\n"
+            "Opening Balance: $15,250.00\n"
+            "TRANSACTIONS:\n"
+            "03/05  Deposit - Sales Revenue     +$2,450.00\n"
+            "03/12  Deposit - Sales Revenue     +$1,890.00\n"
+            "03/18  Payment - Rent              -$2,500.00\n"
+            "03/25  Deposit - Sales Revenue     +$2,100.00\n"
+            "Closing Balance: $19,190.00\n"
+            "Bank Routing Number: 123456789\n"
+            "Account Type: Business Checking\n"
+        ),
+        "entities": [
+            ("bank_name", "FIRST NATIONAL BANK"),
+            ("account_holder", "Sunny Side Bakery LLC"),
+            ("account_number", "****-****-****-1234"),
+            ("opening_balance", "$15,250.00"),
+            ("closing_balance", "$19,190.00"),
+            ("routing_number", "123456789")
+        ],
+        "logos": ["First National Bank"],
+        "objects": ["Document", "Table"]
+    }
+}
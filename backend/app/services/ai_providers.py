@@ -0,0 +1,41 @@
+# app/services/ai_providers.py
+from typing import Any, Optional
+from ..core.config import settings
+
+class AIClients:
+    """The client objects GoogleAIServices talks to"""
+
+    def __init__(self, document_ai: Any, vision: Any, language: Any, storage: Any):
+        self.document_ai = document_ai
+        self.vision = vision
+        self.language = language
+        self.storage = storage
+
+class GoogleAIProvider:
+    """Live Google Cloud clients"""
+
+    name = "google"
+
+    def create_clients(self) -> AIClients:
+        from google.cloud import documentai, language_v1, storage, vision
+        return AIClients(
+            document_ai=documentai.DocumentProcessorServiceClient(),
+            vision=vision.ImageAnnotatorClient(),
+            language=language_v1.LanguageServiceClient(),
+            storage=storage.Client()
+        )
+
+def get_ai_provider(name: Optional[str] = None):
+    """AI provider selected by AI_PROVIDER: "google" or "mock" (see app/mock_ai)
+
+    AI_CASSETTE_MODE can wrap it to record its responses, or replace it with
+    replayed ones.
+    """
+    from .cassettes import with_cassettes
+    name = name or settings.AI_PROVIDER
+    if name == "mock":
+        from ..mock_ai import MockAIProvider
+        return with_cassettes(MockAIProvider())
+    if name == "google":
+        return with_cassettes(GoogleAIProvider())
+    raise ValueError(f"Unknown AI provider: {name}")
@@ -0,0 +1,206 @@
+# app/services/cassettes.py
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Optional, Tuple
+from ..core.config import settings
+from .ai_providers import AIClients
+
+logger = logging.getLogger(__name__)
+
+class CassetteMissError(Exception):
+    """Raised in replay mode for a call that was never recorded"""
+
+def _digest(*parts: Any) -> str:
+    hasher = hashlib.sha256()
+    for part in parts:
+        hasher.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()[:32]
+
+def document_ai_key(request) -> str:
+    raw_document = request.raw_document
+    parts = [raw_document.content, raw_document.mime_type]
+    # Native PDF parsing and page selection change the response for the same bytes
+    if "process_options" in request:
+        parts.append(type(request.process_options).serialize(request.process_options))
+    return "document_ai/" + _digest(*parts)
+
+def vision_key(request) -> str:
+    features = sorted(feature.type_.name for feature in request.features)
+    return "vision/" + _digest(request.image.content, *features)
+
+def nlp_key(request) -> str:
+    document = request["document"] if isinstance(request, dict) else request.document
+    return "nlp/" + _digest(document.content)
+
+class CassetteStore:
+    """Recorded responses on disk, one gzip file per call
+
+    Each file holds a JSON metadata line (latency, recorded_at) followed by the
+    serialized protobuf response.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".pb.gz")
+
+    def save(self, key: str, payload: bytes, latency: float):
+        path = self._path(key)
+        meta = json.dumps({"latency": round(latency, 4), "recorded_at": time.time()}).encode("utf-8")
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(path + ".tmp", "wb") as cassette:
+                cassette.write(meta + b"\n" + payload)
+            os.replace(path + ".tmp", path)
+
+    def load(self, key: str) -> Tuple[bytes, float]:
+        try:
+            with gzip.open(self._path(key), "rb") as cassette:
+                meta, _, payload = cassette.read().partition(b"\n")
+        except FileNotFoundError:
+            raise CassetteMissError(f"No recorded response for {key} in {self.directory}")
+        return payload, json.loads(meta)["latency"]
+
+class _RecordingDocumentAIClient:
+    def __init__(self, client, store: CassetteStore):
+        self.client = client
+        self.store = store
+        self.transport = getattr(client, "transport", None)
+
+    def process_document(self, request=None, **kwargs):
+        started = time.perf_counter()
+        response = self.client.process_document(request=request, **kwargs)
+        self.store.save(document_ai_key(request), type(response).serialize(response), time.perf_counter() - started)
+        return response
+
+class _RecordingVisionClient:
+    def __init__(self, client, store: CassetteStore):
+        self.client = client
+        self.store = store
+        self.transport = getattr(client, "transport", None)
+
+    def batch_annotate_images(self, requests=None, **kwargs):
+        started = time.perf_counter()
+        response = self.client.batch_annotate_images(requests=requests, **kwargs)
+        latency = time.perf_counter() - started
+        # Stored per image so a replayed batch can be assembled from any mix of documents
+        for request, image_response in zip(requests, response.responses):
+            self.store.save(vision_key(request), type(image_response).serialize(image_response), latency)
+        return response
+
+class _RecordingLanguageClient:
+    def __init__(self, client, store: CassetteStore):
+        self.client = client
+        self.store = store
+        self.transport = getattr(client, "transport", None)
+
+    def analyze_entities(self, request=None, **kwargs):
+        started = time.perf_counter()
+        response = self.client.analyze_entities(request=request, **kwargs)
+        self.store.save(nlp_key(request), type(response).serialize(response), time.perf_counter() - started)
+        return response
+
+class RecordingProvider:
+    """Wraps another provider and saves every Document AI, Vision and NLP response"""
+
+    name = "record"
+
+    def __init__(self, inner, store: CassetteStore):
+        self.inner = inner
+        self.store = store
+
+    def create_clients(self) -> AIClients:
+        clients = self.inner.create_clients()
+        logger.warning(f"Recording AI responses to {self.store.directory}")
+        return AIClients(
+            document_ai=_RecordingDocumentAIClient(clients.document_ai, self.store),
+            vision=_RecordingVisionClient(clients.vision, self.store),
+            language=_RecordingLanguageClient(clients.language, self.store),
+            storage=clients.storage
+        )
+
+class _ReplayClient:
+    def __init__(self, store: CassetteStore, replay_latency: bool):
+        self.store = store
+        self.replay_latency = replay_latency
+
+    def _wait(self, latency: float, timeout: Optional[float]):
+        """Sleep for the recorded latency, timing out like the live call would"""
+        if not self.replay_latency:
+            return
+        if timeout is not None and latency > timeout:
+            from google.api_core import exceptions as google_exceptions
+            time.sleep(timeout)
+            raise google_exceptions.DeadlineExceeded(f"replayed call exceeded {timeout:.2f}s")
+        time.sleep(latency)
+
+    def _load(self, key: str, timeout: Optional[float]) -> bytes:
+        payload, latency = self.store.load(key)
+        self._wait(latency, timeout)
+        return payload
+
+class _ReplayDocumentAIClient(_ReplayClient):
+    def process_document(self, request=None, timeout=None, **kwargs):
+        from google.cloud import documentai
+        return documentai.ProcessResponse.deserialize(self._load(document_ai_key(request), timeout))
+
+class _ReplayVisionClient(_ReplayClient):
+    def batch_annotate_images(self, requests=None, timeout=None, **kwargs):
+        from google.cloud import vision
+        payloads = []
+        latency = 0.0
+        for request in requests:
+            payload, recorded = self.store.load(vision_key(request))
+            payloads.append(payload)
+            latency = max(latency, recorded)
+        self._wait(latency, timeout)
+        return vision.BatchAnnotateImagesResponse(
+            responses=[vision.AnnotateImageResponse.deserialize(payload) for payload in payloads]
+        )
+
+class _ReplayLanguageClient(_ReplayClient):
+    def analyze_entities(self, request=None, timeout=None, **kwargs):
+        from google.cloud import language_v1
+        return language_v1.AnalyzeEntitiesResponse.deserialize(self._load(nlp_key(request), timeout))
+
+class ReplayProvider:
+    """Serves recorded responses with their recorded latency, or none, without any network"""
+
+    name = "replay"
+
+    def __init__(self, store: CassetteStore, replay_latency: bool = True):
+        self.store = store
+        self.replay_latency = replay_latency
+
+    def create_clients(self) -> AIClients:
+        from ..mock_ai.clients import MockStorageClient
+        logger.warning(f"Replaying AI responses from {self.store.directory}")
+        return AIClients(
+            document_ai=_ReplayDocumentAIClient(self.store, self.replay_latency),
+            vision=_ReplayVisionClient(self.store, self.replay_latency),
+            language=_ReplayLanguageClient(self.store, self.replay_latency),
+            storage=MockStorageClient()
+        )
+
+def with_cassettes(provider):
+    """Apply AI_CASSETTE_MODE ("off", "record" or "replay") to the selected provider"""
+    mode = settings.AI_CASSETTE_MODE
+    if mode == "off":
+        return provider
+    store = CassetteStore(settings.AI_CASSETTE_DIR)
+    if mode == "record":
+        if getattr(provider, "name", None) == "mock":
+            # Mock responses are plain objects, not protobufs, and are reproducible with MOCK_AI_SEED anyway
+            raise ValueError("AI_CASSETTE_MODE=record needs a real provider; the mock provider's responses cannot be recorded")
+        return RecordingProvider(provider, store)
+    if mode == "replay":
+        return ReplayProvider(store, replay_latency=settings.AI_CASSETTE_REPLAY_LATENCY)
+    raise ValueError(f"Unknown AI_CASSETTE_MODE: {mode}")
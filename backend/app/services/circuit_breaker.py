@@ -0,0 +1,180 @@
+# app/services/circuit_breaker.py
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Any
+from ..core.config import settings
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Numeric state for the metrics gauge
+STATE_GAUGE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend whose circuit breaker is open"""
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one backend service
+
+    Trips when, over the last `window_size` calls (and at least `min_calls`),
+    the failure rate reaches `error_rate_threshold` or the share of calls
+    slower than `slow_call_seconds` reaches `slow_call_rate_threshold`. After
+    `open_seconds` it lets `half_open_calls` trial calls through; one failure
+    re-opens it, all of them succeeding closes it. Cancelled calls are
+    released without counting either way.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        min_calls: int = 10,
+        error_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        slow_call_rate_threshold: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 3
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window_size)  # (failed, slow) per call
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_calls = 0
+        self._trial_successes = 0
+        self._publish()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls are being rejected outright"""
+        return self.state == OPEN
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError"""
+        with self._lock:
+            self._refresh()
+            if self._state == OPEN or (self._state == HALF_OPEN and self._trial_calls >= self.half_open_calls):
+                metrics.increment(f"circuit_breaker.rejected.{self.name}")
+                raise CircuitOpenError(f"{self.name} circuit breaker is open")
+            if self._state == HALF_OPEN:
+                self._trial_calls += 1
+
+    def record(self, duration: float, failed: bool):
+        """Record the outcome of an admitted call"""
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if failed or slow:
+                    self._trip()
+                else:
+                    self._trial_successes += 1
+                    if self._trial_successes >= self.half_open_calls:
+                        self._transition(CLOSED)
+                return
+
+            self._outcomes.append((failed, slow))
+            if self._state == CLOSED and len(self._outcomes) >= self.min_calls:
+                calls = len(self._outcomes)
+                error_rate = sum(1 for failure, _ in self._outcomes if failure) / calls
+                slow_rate = sum(1 for _, is_slow in self._outcomes if is_slow) / calls
+                if error_rate >= self.error_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+                    self._trip()
+
+    def release(self):
+        """Give back an admitted call that was cancelled before it finished
+
+        Cancellation (a request deadline, a hedge loser) says nothing about the
+        backend, so it is neither a success nor a failure: a half-open trial
+        slot is simply freed for another call.
+        """
+        with self._lock:
+            if self._state == HALF_OPEN and self._trial_calls > 0:
+                self._trial_calls -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh()
+            calls = len(self._outcomes)
+            return {
+                "state": self._state,
+                "window_calls": calls,
+                "error_rate": round(sum(1 for failure, _ in self._outcomes if failure) / calls, 4) if calls else 0.0,
+                "slow_call_rate": round(sum(1 for _, slow in self._outcomes if slow) / calls, 4) if calls else 0.0,
+                "retry_in": round(max(0.0, self._opened_at + self.open_seconds - time.monotonic()), 2) if self._state == OPEN else 0.0
+            }
+
+    def _refresh(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+
+    def _trip(self):
+        self._opened_at = time.monotonic()
+        metrics.increment(f"circuit_breaker.opened.{self.name}")
+        self._transition(OPEN)
+
+    def _transition(self, state: str):
+        if state != self._state:
+            logger.warning(f"Circuit breaker {self.name}: {self._state} -> {state}")
+        self._state = state
+        self._trial_calls = 0
+        self._trial_successes = 0
+        if state == CLOSED:
+            self._outcomes.clear()
+        self._publish()
+
+    def _publish(self):
+        metrics.set_gauge(f"circuit_breaker.state.{self.name}", STATE_GAUGE_VALUES[self._state])
+
+class CircuitBreakerRegistry:
+    """One breaker per backend, shared by every client in the process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(
+                    name,
+                    window_size=settings.CIRCUIT_BREAKER_WINDOW_SIZE,
+                    min_calls=settings.CIRCUIT_BREAKER_MIN_CALLS,
+                    error_rate_threshold=settings.CIRCUIT_BREAKER_ERROR_RATE,
+                    slow_call_seconds=settings.CIRCUIT_BREAKER_SLOW_CALL_SECONDS.get(name, 10.0),
+                    slow_call_rate_threshold=settings.CIRCUIT_BREAKER_SLOW_CALL_RATE,
+                    open_seconds=settings.CIRCUIT_BREAKER_OPEN_SECONDS,
+                    half_open_calls=settings.CIRCUIT_BREAKER_HALF_OPEN_CALLS
+                )
+            return breaker
+
+    def states(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+    def any_open(self) -> bool:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return any(breaker.state != CLOSED for breaker in breakers)
+
+# Create global instance
+circuit_breakers = CircuitBreakerRegistry()
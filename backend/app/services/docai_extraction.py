@@ -0,0 +1,99 @@
+# app/services/docai_extraction.py
+from typing import Any, Dict, List, Optional, Tuple
+
+def raw_message(message: Any) -> Any:
+    """Underlying protobuf of a proto-plus message; anything else is returned as is
+
+    Attribute access on the raw message skips proto-plus marshalling, which
+    wraps (and for strings, copies) on every access.
+    """
+    pb = getattr(type(message), "pb", None)
+    if pb is None:
+        return message
+    try:
+        return pb(message)
+    except TypeError:
+        return message
+
+def anchor_text(text_anchor: Any, text: str) -> str:
+    """Resolve every segment of a text anchor against the document text"""
+    if not text_anchor:
+        return ""
+    segments = text_anchor.text_segments
+    if len(segments) == 1:
+        segment = segments[0]
+        return text[segment.start_index:segment.end_index]
+    if segments:
+        return "".join([text[segment.start_index:segment.end_index] for segment in segments])
+    return getattr(text_anchor, "content", "") or ""
+
+def layout_text(layout: Any, text: str) -> str:
+    """Text of a layout element (form field name/value, paragraph, line...)"""
+    if not layout:
+        return ""
+    resolved = anchor_text(getattr(layout, "text_anchor", None), text)
+    return resolved or getattr(layout, "text", "") or ""
+
+class ExtractedDocument:
+    """Compact records pulled out of a Document AI Document in one pass"""
+
+    __slots__ = ("text", "page_count", "entities", "form_fields")
+
+    def __init__(self, text: str, page_count: int, entities: List[Dict[str, Any]], form_fields: List[Dict[str, Any]]):
+        self.text = text
+        self.page_count = page_count
+        self.entities = entities
+        self.form_fields = form_fields
+
+    @property
+    def entity_confidence(self) -> float:
+        """Mean entity confidence, 0.0 without entities"""
+        if not self.entities:
+            return 0.0
+        return sum(entity["confidence"] for entity in self.entities) / len(self.entities)
+
+def extract_document(document: Any) -> ExtractedDocument:
+    """Walk a Document AI Document once, reading its text a single time"""
+    pb = raw_message(document)
+    text = pb.text or ""
+
+    entities = []
+    for entity in pb.entities:
+        normalized_value: Optional[Any] = entity.normalized_value
+        entities.append({
+            "type": entity.type_ if hasattr(entity, "type_") else getattr(entity, "type", ""),
+            "mention_text": entity.mention_text,
+            "confidence": entity.confidence,
+            "normalized_value": (normalized_value.text or None) if normalized_value else None
+        })
+
+    form_fields = []
+    for page in pb.pages:
+        for form_field in page.form_fields:
+            name = layout_text(form_field.field_name, text).strip()
+            value = layout_text(form_field.field_value, text).strip()
+            if name and value:
+                form_fields.append({
+                    "name": name,
+                    "value": value,
+                    "confidence": form_field.field_value.confidence if form_field.field_value else 0.0
+                })
+
+    return ExtractedDocument(text, len(pb.pages), entities, form_fields)
+
+def merge_extracted(parts: List[ExtractedDocument]) -> Tuple[ExtractedDocument, List[int]]:
+    """Join page-range extractions back into one document, in page order
+
+    Returns the merged document and the offset of each part's text in the
+    merged text.
+    """
+    offsets, texts, entities, form_fields = [], [], [], []
+    offset = page_count = 0
+    for part in parts:
+        offsets.append(offset)
+        texts.append(part.text)
+        offset += len(part.text)
+        page_count += part.page_count
+        entities.extend(part.entities)
+        form_fields.extend(part.form_fields)
+    return ExtractedDocument("".join(texts), page_count, entities, form_fields), offsets
@@ -4,18 +4,19 @@ from google.cloud import storage
 from typing import Dict, Any, Optional
 import json
 from ..core.config import settings
+from .docai_extraction import extract_document, layout_text
 
 class DocumentAIService:
-    def __init__(self):
+    def __init__(self, client=None, storage_client=None):
         self.project_id = settings.PROJECT_ID
         self.location = settings.DOCUMENT_AI_LOCATION
         self.processor_id = settings.DOCUMENT_AI_PROCESSOR_ID
         
-        # Initialize Document AI client
-        self.client = documentai.DocumentProcessorServiceClient()
+        # Initialize Document AI client (shared from the service registry when given)
+        self.client = client or documentai.DocumentProcessorServiceClient()
         
         # Initialize Storage client for uploading files
-        self.storage_client = storage.Client()
+        self.storage_client = storage_client or storage.Client()
         self.bucket_name = settings.STORAGE_BUCKET
         
     def upload_to_gcs(self, local_file_path: str, gcs_file_name: str) -> str:
@@ -48,44 +49,22 @@ class DocumentAIService:
             
             # Process the document
             result = self.client.process_document(request=request)
-            document = result.document
-            
-            # Extract text content
-            full_text = document.text if document.text else ""
-            
-            # Extract form fields (key-value pairs) - UPDATED METHOD
-            form_fields = {}
-            if hasattr(document, 'pages'):
-                for page in document.pages:
-                    if hasattr(page, 'form_fields'):
-                        for form_field in page.form_fields:
-                            try:
-                                # Updated text extraction method
-                                field_name = self._extract_text_from_layout(form_field.field_name, full_text)
-                                field_value = self._extract_text_from_layout(form_field.field_value, full_text)
-                                
-                                if field_name and field_value:
-                                    form_fields[field_name.strip()] = field_value.strip()
-                            except Exception as field_error:
-                                print(f"Error processing form field: {field_error}")
-                                continue
+            
+            # Single pass over the raw protobuf, shared with the fusion pipeline
+            extracted = extract_document(result.document)
+            full_text = extracted.text
+            
+            # Extract form fields (key-value pairs)
+            form_fields = {field["name"]: field["value"] for field in extracted.form_fields}
             
             # Extract entities (if available) - SIMPLIFIED
-            entities = []
-            if hasattr(document, 'entities'):
-                for entity in document.entities:
-                    try:
-                        entities.append({
-                            "type": entity.type_ if hasattr(entity, 'type_') else "unknown",
-                            "mention_text": entity.mention_text if hasattr(entity, 'mention_text') else "",
-                            "confidence": entity.confidence if hasattr(entity, 'confidence') else 0.0
-                        })
-                    except Exception as entity_error:
-                        print(f"Error processing entity: {entity_error}")
-                        continue
+            entities = [
+                {"type": entity["type"], "mention_text": entity["mention_text"], "confidence": entity["confidence"]}
+                for entity in extracted.entities
+            ]
             
             # Extract basic document info
-            page_count = len(document.pages) if hasattr(document, 'pages') and document.pages else 1
+            page_count = extracted.page_count or 1
             
             return {
                 "status": "success",
@@ -141,32 +120,9 @@ class DocumentAIService:
             }
     
     def _extract_text_from_layout(self, layout_element, full_text: str) -> str:
-        """Extract text from layout element - UPDATED METHOD"""
+        """Extract text from layout element, resolving every text segment"""
         try:
-            if not layout_element:
-                return ""
-            
-            # Try different approaches based on the layout structure
-            if hasattr(layout_element, 'text_anchor') and layout_element.text_anchor:
-                text_anchor = layout_element.text_anchor
-                
-                # Check for text_segments
-                if hasattr(text_anchor, 'text_segments') and text_anchor.text_segments:
-                    segment = text_anchor.text_segments[0]
-                    start_index = getattr(segment, 'start_index', 0) or 0
-                    end_index = getattr(segment, 'end_index', len(full_text)) or len(full_text)
-                    return full_text[start_index:end_index]
-                
-                # Fallback: try content property
-                if hasattr(text_anchor, 'content'):
-                    return text_anchor.content
-            
-            # Direct text property
-            if hasattr(layout_element, 'text'):
-                return layout_element.text
-            
-            return ""
-            
+            return layout_text(layout_element, full_text)
         except Exception as e:
             print(f"Text extraction error: {e}")
             return ""
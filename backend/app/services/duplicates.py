@@ -0,0 +1,371 @@
+# app/services/duplicates.py
+import bisect
+import hashlib
+import logging
+import operator
+import re
+import threading
+import time
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .screening import name_trigrams, normalize_name
+
+logger = logging.getLogger(__name__)
+
+IDENTIFIER_FIELDS = ("ein", "bank_account", "phone", "email")
+SIMILARITY_FIELDS = ("business_name", "address")
+NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+# USPS-style abbreviations, so "123 North Main Street" and "123 N Main St" agree
+ADDRESS_ABBREVIATIONS = {
+    "street": "st", "avenue": "ave", "road": "rd", "drive": "dr", "boulevard": "blvd", "lane": "ln",
+    "court": "ct", "place": "pl", "highway": "hwy", "parkway": "pkwy", "suite": "ste", "apartment": "apt",
+    "unit": "ste", "north": "n", "south": "s", "east": "e", "west": "w", "floor": "fl"
+}
+ID_BITS = 32
+
+def _digits(value: Any) -> str:
+    return re.sub(r"\D", "", str(value or ""))
+
+def normalize_ein(value: Any) -> Optional[str]:
+    digits = _digits(value)
+    return digits if len(digits) == 9 else None
+
+def normalize_email(value: Any) -> Optional[str]:
+    """Lowercased, without a +tag; dots are also dropped for Gmail, which ignores them"""
+    local, _, domain = str(value or "").strip().lower().partition("@")
+    if not local or "." not in domain:
+        return None
+    local = local.split("+", 1)[0]
+    if domain in ("gmail.com", "googlemail.com"):
+        local, domain = local.replace(".", ""), "gmail.com"
+    return f"{local}@{domain}"
+
+def normalize_phone(value: Any) -> Optional[str]:
+    digits = _digits(value)
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return digits if len(digits) >= 7 else None
+
+def normalize_bank_account(routing: Any, account: Any) -> Optional[str]:
+    account = _digits(account).lstrip("0")
+    return f"{_digits(routing)}:{account}" if len(account) >= 4 else None
+
+def normalize_address(value: Any) -> str:
+    tokens = NON_ALPHANUMERIC.sub(" ", str(value or "").lower()).split()
+    return " ".join(ADDRESS_ABBREVIATIONS.get(token, token) for token in tokens)
+
+def application_keys(personal_data: Dict[str, Any], business_data: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """Normalized identifiers, business name and address of an application"""
+    personal_data, business_data = personal_data or {}, business_data or {}
+    address = business_data.get("businessAddress") or " ".join(
+        str(personal_data.get(key) or "") for key in ("streetAddress", "city", "state", "zipCode")
+    )
+    business_name = business_data.get("businessName") or business_data.get("business_name") or ""
+    return {
+        "ein": normalize_ein(business_data.get("ein")),
+        "bank_account": normalize_bank_account(business_data.get("routingNumber"), business_data.get("accountNumber")),
+        "phone": normalize_phone(business_data.get("phone") or personal_data.get("phone")),
+        "email": normalize_email(business_data.get("email") or personal_data.get("email")),
+        "business_name": normalize_name(str(business_name)) or None,
+        "address": normalize_address(address) or None
+    }
+
+def fingerprint(field: str, value: str) -> int:
+    """64-bit hash of a normalized identifier; never 0, which marks a missing value"""
+    digest = hashlib.blake2b(f"{field}:{value}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") or 1
+
+class MinHasher:
+    """MinHash signatures of character trigram sets
+
+    Each of the num_perm hash functions is a 32-bit word of the shake_128
+    output for a trigram, so a signature costs one hash call per trigram.
+    """
+
+    def __init__(self, num_perm: int = 32):
+        self.num_perm = num_perm
+
+    def signature(self, text: str) -> array:
+        size = 4 * self.num_perm
+        rows = [array("I", hashlib.shake_128(gram.encode("utf-8")).digest(size)) for gram in name_trigrams(text)]
+        return array("I", map(min, zip(*rows)))
+
+    @staticmethod
+    def similarity(first, second) -> float:
+        """Estimated Jaccard similarity of the trigram sets behind two signatures"""
+        return sum(map(operator.eq, first, second)) / len(first)
+
+class PackedPostings:
+    """Hash key -> item ids, as one sorted array of (key << 32 | id) plus a dict of recent additions
+
+    Eight bytes per entry once compacted; lookups bisect the array. The
+    recent additions are merged in when they reach a fraction of the array.
+    """
+
+    def __init__(self):
+        self._sorted = array("Q")
+        self._recent: Dict[int, List[int]] = {}
+        self._recent_count = 0
+
+    def __len__(self):
+        return len(self._sorted) + self._recent_count
+
+    def add(self, key: int, item_id: int):
+        self._recent.setdefault(key, []).append(item_id)
+        self._recent_count += 1
+        if self._recent_count > max(10000, len(self._sorted) // 8):
+            self.compact()
+
+    def compact(self):
+        merged = list(self._sorted)
+        merged.extend((key << ID_BITS) | item_id for key, ids in self._recent.items() for item_id in ids)
+        merged.sort()
+        self._sorted = array("Q", merged)
+        self._recent, self._recent_count = {}, 0
+
+    def load(self, packed: array):
+        """Replace the contents with packed (key << 32 | id) entries"""
+        self._sorted = array("Q", sorted(packed))
+        self._recent, self._recent_count = {}, 0
+
+    def get(self, key: int, limit: int) -> List[int]:
+        """Up to limit ids stored under key, newest first"""
+        ids = list(reversed(self._recent.get(key, ())))[:limit]
+        if len(ids) < limit:
+            low = bisect.bisect_left(self._sorted, key << ID_BITS)
+            high = bisect.bisect_left(self._sorted, (key + 1) << ID_BITS, low)
+            mask = (1 << ID_BITS) - 1
+            ids.extend(entry & mask for entry in reversed(self._sorted[max(low, high - (limit - len(ids))):high]))
+        return ids
+
+class DuplicateIndex:
+    """Stored applications indexed for repeat-applicant detection at submit time
+
+    Exact postings for the normalized EIN, bank account, phone and email, and
+    MinHash LSH bands over the business name and address trigrams. Matches
+    are verified against stored fingerprints and signatures, so a hash
+    collision never shows up as a duplicate. Applications are added one at a
+    time as they are submitted, or in bulk by rebuild.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 32,
+        bands: int = 8,
+        name_threshold: float = 0.6,
+        address_threshold: float = 0.6,
+        max_bucket: int = 200
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.minhash = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.name_threshold = name_threshold
+        self.address_threshold = address_threshold
+        self.max_bucket = max_bucket
+        self._lock = threading.RLock()
+        # One rebuild at a time: each swaps in a whole index and replays the additions made meanwhile
+        self._rebuild_lock = threading.Lock()
+        self._rebuild_pending: Optional[List[Tuple[str, str, Dict[str, Optional[str]]]]] = None
+        self._reset()
+        self._loaded_at: Optional[float] = None
+
+    def _reset(self):
+        self._application_ids: List[str] = []
+        self._statuses: List[str] = []
+        self._fingerprints = {field: array("Q") for field in IDENTIFIER_FIELDS}
+        self._signatures = {field: array("I") for field in SIMILARITY_FIELDS}
+        self._postings = {field: PackedPostings() for field in IDENTIFIER_FIELDS}
+        self._bands = {field: [PackedPostings() for _ in range(self.bands)] for field in SIMILARITY_FIELDS}
+
+    def __len__(self):
+        return len(self._application_ids)
+
+    @property
+    def loaded(self) -> bool:
+        """Whether stored applications have been loaded, so a clear check means something"""
+        return self._loaded_at is not None
+
+    def mark_loaded(self):
+        """Serve checks from the applications added so far, when the stored ones cannot be read"""
+        with self._lock:
+            if self._loaded_at is None:
+                self._loaded_at = time.time()
+
+    def _band_keys(self, signature: array) -> List[int]:
+        rows = self.rows
+        return [zlib.crc32(signature[band * rows:(band + 1) * rows].tobytes()) for band in range(self.bands)]
+
+    def _prepare(self, keys: Dict[str, Optional[str]]):
+        fingerprints = {field: fingerprint(field, keys[field]) if keys.get(field) else 0 for field in IDENTIFIER_FIELDS}
+        signatures = {field: self.minhash.signature(keys[field]) if keys.get(field) else None for field in SIMILARITY_FIELDS}
+        return fingerprints, signatures
+
+    def _append(self, application_id: str, status: str, fingerprints, signatures) -> int:
+        item_id = len(self._application_ids)
+        self._application_ids.append(application_id)
+        self._statuses.append(status)
+        for field, value in fingerprints.items():
+            self._fingerprints[field].append(value)
+        for field, signature in signatures.items():
+            # Missing values keep an all-zero signature, which verification ignores
+            self._signatures[field].extend(signature if signature is not None else array("I", bytes(4 * self.minhash.num_perm)))
+        return item_id
+
+    def add(self, application_id: str, status: str, keys: Dict[str, Optional[str]]):
+        """Index one application (keys from application_keys)"""
+        fingerprints, signatures = self._prepare(keys)
+        with self._lock:
+            if self._rebuild_pending is not None:
+                self._rebuild_pending.append((application_id, status, keys))
+            item_id = self._append(application_id, status, fingerprints, signatures)
+            for field, value in fingerprints.items():
+                if value:
+                    self._postings[field].add(value >> ID_BITS, item_id)
+            for field, signature in signatures.items():
+                if signature is not None:
+                    for band, key in zip(self._bands[field], self._band_keys(signature)):
+                        band.add(key, item_id)
+
+    def find(self, keys: Dict[str, Optional[str]], limit: int = 10) -> List[Dict[str, Any]]:
+        """Stored applications sharing an identifier, or a similar business name and address"""
+        fingerprints, signatures = self._prepare(keys)
+        num_perm = self.minhash.num_perm
+        with self._lock:
+            candidates: Dict[int, List[str]] = {}
+            for field, value in fingerprints.items():
+                if not value:
+                    continue
+                for item_id in self._postings[field].get(value >> ID_BITS, self.max_bucket):
+                    if self._fingerprints[field][item_id] == value:
+                        candidates.setdefault(item_id, []).append(field)
+            # A name-and-address match has to collide in a band of both fields
+            banded = []
+            for field, signature in signatures.items():
+                if signature is None:
+                    banded = []
+                    break
+                banded.append({
+                    item_id
+                    for band, key in zip(self._bands[field], self._band_keys(signature))
+                    for item_id in band.get(key, self.max_bucket)
+                })
+            for item_id in set.intersection(*banded) if banded else ():
+                candidates.setdefault(item_id, [])
+
+            matches = []
+            for item_id, reasons in candidates.items():
+                similarity = {}
+                for field, signature in signatures.items():
+                    stored = self._signatures[field][item_id * num_perm:(item_id + 1) * num_perm]
+                    similarity[field] = (
+                        round(MinHasher.similarity(signature, stored), 3) if signature is not None and any(stored) else 0.0
+                    )
+                if similarity["business_name"] >= self.name_threshold and similarity["address"] >= self.address_threshold:
+                    reasons = reasons + ["similar_name_and_address"]
+                if not reasons:
+                    continue
+                matches.append({
+                    "application_id": self._application_ids[item_id],
+                    "status": self._statuses[item_id],
+                    "reasons": reasons,
+                    "name_similarity": similarity["business_name"],
+                    "address_similarity": similarity["address"]
+                })
+        matches.sort(key=lambda match: (len(match["reasons"]), match["name_similarity"]), reverse=True)
+        return matches[:limit]
+
+    def check(self, keys: Dict[str, Optional[str]], limit: int = 10) -> Dict[str, Any]:
+        matches = self.find(keys, limit)
+        return {
+            "status": "likely_duplicate" if matches else "clear",
+            "repeat_of_denied": any(match["status"] == "DENIED" for match in matches),
+            "matches": matches
+        }
+
+    def rebuild(self, records: Iterable[Tuple[str, str, Dict[str, Any], Dict[str, Any]]]) -> Dict[str, Any]:
+        """Replace the index with (application id, status, personal_data, business_data) records
+
+        Builds the new index to the side and swaps it in; applications added
+        while it runs are indexed again afterwards.
+        """
+        with self._rebuild_lock:
+            return self._rebuild(records)
+
+    def _rebuild(self, records: Iterable[Tuple[str, str, Dict[str, Any], Dict[str, Any]]]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        with self._lock:
+            self._rebuild_pending = []
+        try:
+            fresh = DuplicateIndex(
+                self.minhash.num_perm, self.bands, self.name_threshold, self.address_threshold, self.max_bucket
+            )
+            packed = {field: array("Q") for field in IDENTIFIER_FIELDS}
+            packed_bands = {field: [array("Q") for _ in range(self.bands)] for field in SIMILARITY_FIELDS}
+            for application_id, status, personal_data, business_data in records:
+                fingerprints, signatures = fresh._prepare(application_keys(personal_data, business_data))
+                item_id = fresh._append(application_id, status, fingerprints, signatures)
+                for field, value in fingerprints.items():
+                    if value:
+                        packed[field].append(((value >> ID_BITS) << ID_BITS) | item_id)
+                for field, signature in signatures.items():
+                    if signature is not None:
+                        for band, key in zip(packed_bands[field], fresh._band_keys(signature)):
+                            band.append((key << ID_BITS) | item_id)
+            for field in IDENTIFIER_FIELDS:
+                fresh._postings[field].load(packed[field])
+            for field in SIMILARITY_FIELDS:
+                for band, entries in zip(fresh._bands[field], packed_bands[field]):
+                    band.load(entries)
+        except Exception:
+            with self._lock:
+                self._rebuild_pending = None
+            raise
+
+        with self._lock:
+            pending, self._rebuild_pending = self._rebuild_pending, None
+            for name in ("_application_ids", "_statuses", "_fingerprints", "_signatures", "_postings", "_bands"):
+                setattr(self, name, getattr(fresh, name))
+            rebuilt = set(self._application_ids) if pending else ()
+            for application_id, status, keys in pending:
+                if application_id not in rebuilt:
+                    self.add(application_id, status, keys)
+            self._loaded_at = time.time()
+        seconds = time.perf_counter() - started
+        logger.info(f"Duplicate index rebuilt: {len(self)} applications in {seconds:.1f}s")
+        return {"applications": len(self), "seconds": round(seconds, 3)}
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "applications": len(self),
+            "rebuilding": self._rebuild_pending is not None,
+            "loaded": self.loaded,
+            "loaded_at": self._loaded_at
+        }
+
+def database_records(engine, batch_size: int = 10000):
+    """Stream (application id, status, personal_data, business_data) from merchant_applications"""
+    import json
+    from sqlalchemy import text
+
+    def as_dict(value):
+        if isinstance(value, dict):
+            return value
+        try:
+            value = json.loads(value) if value else {}
+        except (TypeError, ValueError):
+            return {}
+        return value if isinstance(value, dict) else {}
+
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True).execute(
+            text("SELECT application_id, status, personal_data, business_data FROM merchant_applications ORDER BY created_at")
+        )
+        while True:
+            rows = result.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row.application_id, row.status or "", as_dict(row.personal_data), as_dict(row.business_data)
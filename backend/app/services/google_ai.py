@@ -1,23 +1,188 @@
 # app/services/google_ai.py
 import asyncio
+import functools
 import logging
-from typing import Dict, Any, Optional, List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Tuple, Union
 from google.cloud import documentai
 from google.cloud import vision
 from google.cloud import language_v1
-from google.cloud import storage
+from google.api_core import exceptions as google_exceptions
 from ..core.config import settings
+from .vision_batcher import VisionBatcher
+from .result_cache import FusionResultCache, LRUTTLCache, build_shared_cache
+from .payloads import DocumentPayload, as_payload
+from .pipeline import Stage, StageScheduler
+from .metrics import metrics
+from .resilience import Deadline, DeadlineExceededError, call_with_retries, current_deadline, hedged
+from .circuit_breaker import CircuitOpenError, circuit_breakers
+from .quota import QuotaThrottledError, build_quota_governor
+from .ai_providers import get_ai_provider
+from .docai_extraction import ExtractedDocument, extract_document, merge_extracted
+from .pdf_pages import split_pdf_pages
+from .text_layer import extract_text_layer
+from .nlp_chunks import chunk_key, chunk_text, merge_chunk_entities
+from .registry import services
+from .risk_lexicon import decisive_matches
 
 logger = logging.getLogger(__name__)
 
+# Vision AI features that can be requested, keyed by the names used in settings
+VISION_FEATURE_TYPES = {
+    "text_detection": vision.Feature.Type.TEXT_DETECTION,
+    "object_localization": vision.Feature.Type.OBJECT_LOCALIZATION,
+    "logo_detection": vision.Feature.Type.LOGO_DETECTION,
+    "face_detection": vision.Feature.Type.FACE_DETECTION
+}
+VISION_FEATURE_NAMES = {feature_type: name for name, feature_type in VISION_FEATURE_TYPES.items()}
+# Features that OCR the page, which Document AI already does
+VISION_TEXT_FEATURES = {"text_detection"}
+
+# Placeholders for a pipeline stage that is disabled for the document type, or
+# that was dropped for the deadline or quota
+SKIPPED_STAGE_RESULT = {"skipped": True}
+DEADLINE_SKIPPED_STAGE_RESULT = {"skipped": True, "reason": "deadline"}
+THROTTLED_SKIPPED_STAGE_RESULT = {"skipped": True, "reason": "throttled"}
+
+# Vision OCR fallback stage when Document AI already supplied the text
+VISION_OCR_NOT_NEEDED_RESULT = {"skipped": True, "reason": "document_ai_text"}
+
+# Placeholder reasons for stages that never called their service (deadline and
+# throttled drops did start the call)
+NOT_CALLED_REASONS = {None, "document_ai_text"}
+
+# Skip reasons that depend on load rather than the document, so the result is not cached
+TRANSIENT_SKIP_REASONS = {"deadline", "throttled"}
+
+# Stages left out for these reasons were meant to run: fusion without them is
+# incomplete and never auto-approves
+INCOMPLETE_SKIP_REASONS = {"deadline", "throttled"}
+
+# Transient Google API errors worth retrying within the request budget
+RETRYABLE_ERRORS = (
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.TooManyRequests,
+    google_exceptions.DeadlineExceeded
+)
+
+# Errors that count against a backend's circuit breaker; anything else (a
+# rejected document, say) means the service answered
+BREAKER_FAILURES = RETRYABLE_ERRORS + (DeadlineExceededError,)
+
+def stage_error_result(e: Exception, **degraded) -> Dict[str, Any]:
+    """Degraded result for a failed stage, flagging quota throttling so callers can back off"""
+    result = {"error": str(e), **degraded}
+    if isinstance(e, QuotaThrottledError):
+        result.update(throttled=True, retry_after=round(e.retry_after, 2))
+    return result
+
+def nlp_input_text(document_ai: Dict[str, Any]) -> str:
+    """Text for NLP: up to NLP_MAX_DOCUMENT_CHARACTERS, not the 2000 characters kept in the response"""
+    return document_ai.get("nlp_text", document_ai.get("text", ""))
+
+def stages_called(stage_results: Dict[str, Any], stages: List[str]) -> List[str]:
+    """The stages, in order, that actually ran rather than returning a placeholder"""
+    return [
+        stage for stage in stages
+        if stage in stage_results
+        and not (stage_results[stage].get("skipped") and stage_results[stage].get("reason") in NOT_CALLED_REASONS)
+    ]
+
+def document_ai_text_available(document_ai: Dict[str, Any]) -> bool:
+    """Whether the Document AI stage produced text Vision can reuse instead of its own OCR"""
+    return not document_ai.get("error") and not document_ai.get("skipped")
+
+def vision_text_result(
+    vision_ai: Dict[str, Any],
+    text: str,
+    confidence: float,
+    source: str,
+    word_count: Optional[int] = None
+) -> Dict[str, Any]:
+    """Vision result with its text features and authenticity score set from the given text"""
+    result = {
+        **vision_ai,
+        "text_detected": len(text) > 0,
+        "text_content": text[:1000],  # First 1000 chars
+        "text_confidence": confidence,
+        "text_source": source,
+        "document_features": {
+            **vision_ai.get("document_features", {}),
+            "has_structured_text": len(text) > 100,
+            "text_density": word_count if word_count is not None else (len(text.split()) if text else 0)
+        }
+    }
+    
+    # Calculate authenticity score
+    score = 0.0
+    if result["text_detected"]:
+        score += 0.4
+    if result["objects_detected"] > 0:
+        score += 0.2
+    if result["logos_detected"] > 0:
+        score += 0.3
+    if result["document_features"]["has_structured_text"]:
+        score += 0.1
+    
+    result["authenticity_score"] = min(score, 1.0)
+    return result
+
+# Cross-validation checks and fusion weight owned by each stage, dropped when the stage is skipped
+STAGE_VALIDATION_CHECKS = {
+    "document_ai": ["text_extraction_quality", "content_structure"],
+    "vision_ai": ["document_authenticity", "visual_integrity"],
+    "nlp": ["business_entities_present", "no_risk_keywords"]
+}
+
 class GoogleAIServices:
-    def __init__(self):
-        """Initialize Google Cloud AI clients"""
+    def __init__(self, provider=None):
+        """Initialize Google Cloud AI clients (or the provider's stand-ins, see AI_PROVIDER)"""
         try:
-            self.document_ai_client = documentai.DocumentProcessorServiceClient()
-            self.vision_client = vision.ImageAnnotatorClient()
-            self.language_client = language_v1.LanguageServiceClient()
-            self.storage_client = storage.Client()
+            clients = (provider or get_ai_provider()).create_clients()
+            self.document_ai_client = clients.document_ai
+            self.vision_client = clients.vision
+            self.language_client = clients.language
+            self.storage_client = clients.storage
+            
+            # The Google clients are blocking gRPC stubs, so every RPC is run on a
+            # dedicated pool to keep the event loop free while we wait on the network
+            self.executor = ThreadPoolExecutor(
+                max_workers=settings.AI_EXECUTOR_MAX_WORKERS,
+                thread_name_prefix="google-ai"
+            )
+            self.breakers = {name: circuit_breakers.get(name) for name in ("document_ai", "vision", "nlp")}
+            self.quota = build_quota_governor()
+            
+            # Natural Language chunks in flight across all documents, and the
+            # per-chunk results for text shared between documents
+            self.nlp_slots = asyncio.Semaphore(settings.NLP_MAX_CONCURRENCY)
+            self.nlp_chunk_cache = None
+            if settings.NLP_CHUNK_CACHE_MAX_ENTRIES > 0:
+                self.nlp_chunk_cache = LRUTTLCache(
+                    max_entries=settings.NLP_CHUNK_CACHE_MAX_ENTRIES,
+                    ttl_seconds=settings.NLP_CHUNK_CACHE_TTL_SECONDS
+                )
+            
+            # Vision requests from concurrent uploads are coalesced into batch calls
+            self.vision_batcher = None
+            if settings.VISION_BATCHING_ENABLED:
+                self.vision_batcher = VisionBatcher(
+                    self._send_vision_batch,
+                    max_batch_size=settings.VISION_BATCH_MAX_SIZE,
+                    max_batch_bytes=settings.VISION_BATCH_MAX_BYTES,
+                    max_wait_ms=settings.VISION_BATCH_WINDOW_MS
+                )
+            
+            # Fusion results are cached by file content so re-uploads skip the AI calls
+            self.result_cache = None
+            if settings.FUSION_CACHE_ENABLED:
+                self.result_cache = FusionResultCache(
+                    max_entries=settings.FUSION_CACHE_MAX_ENTRIES,
+                    ttl_seconds=settings.FUSION_CACHE_TTL_SECONDS,
+                    shared=build_shared_cache(settings.FUSION_CACHE_SHARED_BACKEND)
+                )
             
             # Document AI processor name
             self.processor_name = f"projects/{settings.PROJECT_ID}/locations/{settings.DOCUMENT_AI_LOCATION}/processors/{settings.DOCUMENT_AI_PROCESSOR_ID}"
@@ -27,78 +192,196 @@ class GoogleAIServices:
             logger.error(f"Failed to initialize Google AI services: {str(e)}")
             raise
     
-    async def process_document_with_document_ai(self, file_content: bytes, mime_type: str) -> Dict[str, Any]:
-        """Process document using Google Document AI"""
+    def warm_channels(self, timeout: float):
+        """Connect the gRPC channels ahead of the first request (blocking)"""
+        import grpc
+        for client in (self.document_ai_client, self.vision_client, self.language_client):
+            channel = getattr(getattr(client, "transport", None), "grpc_channel", None)
+            if channel is not None:
+                grpc.channel_ready_future(channel).result(timeout=timeout)
+    
+    async def close(self):
+        """Close the clients and the executor on shutdown"""
+        for client in (self.document_ai_client, self.vision_client, self.language_client):
+            transport = getattr(client, "transport", None)
+            if transport is None:
+                continue
+            try:
+                transport.close()
+            except Exception as e:
+                logger.warning(f"Failed to close {type(client).__name__}: {str(e)}")
+        self.storage_client.close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def _run_blocking(self, func, *args, **kwargs):
+        """Run a blocking client call on the AI executor without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+    
+    async def _call_rpc(
+        self,
+        name: str,
+        func,
+        use_request_deadline: bool = True,
+        quota_units: int = 1,
+        quota_features: Optional[Dict[str, int]] = None,
+        **kwargs
+    ):
+        """Call a Google RPC with a per-attempt timeout, jittered retries and optional hedging
+        
+        Raises CircuitOpenError without calling the backend or spending quota
+        while its breaker is open, then waits briefly for quota
+        (QuotaThrottledError if none frees up).
+        """
+        breaker = self.breakers.get(name) if settings.CIRCUIT_BREAKER_ENABLED else None
+        if breaker:
+            breaker.before_call()
+        
+        if self.quota:
+            try:
+                await self.quota.acquire(name, quota_units, quota_features)
+            except BaseException:
+                # Never reached the backend: give the admitted slot back
+                if breaker:
+                    breaker.release()
+                raise
+        
+        deadline = current_deadline.get() if use_request_deadline else None
+        hedge = (
+            settings.AI_HEDGE_ENABLED
+            and name in settings.AI_HEDGE_STAGES
+            and metrics.count(f"ai_rpc_seconds.{name}") >= settings.AI_HEDGE_MIN_SAMPLES
+        )
+        
+        async def attempt(timeout: float):
+            # The client's own retry is disabled so all retries share our budget
+            call = lambda: self._run_blocking(func, timeout=timeout, retry=None, **kwargs)
+            if hedge:
+                return await hedged(call, hedge_after=metrics.percentile(f"ai_rpc_seconds.{name}", 95), name=name)
+            return await call()
+        
+        started = time.perf_counter()
+        failed = False
+        cancelled = False
         try:
-            # Create the document object
-            raw_document = documentai.RawDocument(content=file_content, mime_type=mime_type)
-            
-            # Configure the process request
-            request = documentai.ProcessRequest(
-                name=self.processor_name,
-                raw_document=raw_document
+            return await call_with_retries(
+                attempt,
+                attempt_timeout=settings.AI_RPC_TIMEOUT_SECONDS.get(name, 30.0),
+                deadline=deadline,
+                max_attempts=settings.AI_RPC_MAX_ATTEMPTS,
+                base_delay=settings.AI_RETRY_BASE_DELAY_SECONDS,
+                max_delay=settings.AI_RETRY_MAX_DELAY_SECONDS,
+                retry_on=RETRYABLE_ERRORS,
+                name=name
             )
+        except BREAKER_FAILURES:
+            failed = True
+            raise
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            if breaker:
+                if cancelled:
+                    breaker.release()
+                else:
+                    breaker.record(time.perf_counter() - started, failed)
+    
+    async def _process_with_document_ai(self, file_content: bytes, mime_type: str, native_pdf_parsing: bool = False) -> ExtractedDocument:
+        """One synchronous Document AI call, extracted in a single pass over the raw protobuf"""
+        # Create the document object
+        raw_document = documentai.RawDocument(content=file_content, mime_type=mime_type)
+        
+        # Configure the process request
+        request = documentai.ProcessRequest(
+            name=self.processor_name,
+            raw_document=raw_document
+        )
+        if native_pdf_parsing:
+            # Read the embedded text layer instead of OCR-ing the page images
+            request.process_options = documentai.ProcessOptions(
+                ocr_config=documentai.OcrConfig(enable_native_pdf_parsing=True)
+            )
+        
+        # Process the document
+        result = await self._call_rpc("document_ai", self.document_ai_client.process_document, request=request)
+        return extract_document(result.document)
+    
+    async def _process_page_ranges(
+        self,
+        page_ranges: List[Tuple[int, int, bytes]],
+        mime_type: str,
+        native_pdf_parsing: bool = False
+    ) -> Tuple[ExtractedDocument, List[Dict[str, int]]]:
+        """Process PDF page ranges concurrently and merge them back in page order
+        
+        Each range is its own RPC, so it waits for quota and runs on the shared
+        AI executor like any other call; a failed range fails the document.
+        """
+        slots = asyncio.Semaphore(settings.DOCUMENT_AI_RANGE_MAX_CONCURRENCY)
+        
+        async def process_range(content: bytes) -> ExtractedDocument:
+            async with slots:
+                return await self._process_with_document_ai(content, mime_type, native_pdf_parsing)
+        
+        tasks = [asyncio.ensure_future(process_range(content)) for _, _, content in page_ranges]
+        try:
+            parts = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        
+        extracted, offsets = merge_extracted(parts)
+        ranges = [
+            {"first_page": first, "last_page": last, "text_offset": offset, "text_length": len(part.text)}
+            for (first, last, _), part, offset in zip(page_ranges, parts, offsets)
+        ]
+        return extracted, ranges
+    
+    async def process_document_with_document_ai(self, file_content: bytes, mime_type: str, native_pdf_parsing: bool = False) -> Dict[str, Any]:
+        """Process document using Google Document AI
+        
+        PDFs over DOCUMENT_AI_SPLIT_PAGE_THRESHOLD pages are split into page
+        ranges that are processed concurrently, so latency follows the slowest
+        range rather than the page count. native_pdf_parsing has Document AI read
+        the embedded text instead of running OCR.
+        """
+        try:
+            page_ranges = None
+            if mime_type == "application/pdf":
+                page_ranges = await asyncio.to_thread(
+                    split_pdf_pages,
+                    file_content,
+                    settings.DOCUMENT_AI_SPLIT_PAGE_THRESHOLD,
+                    settings.DOCUMENT_AI_PAGES_PER_RANGE
+                )
             
-            # Process the document
-            result = self.document_ai_client.process_document(request=request)
-            document = result.document
+            ranges = None
+            if page_ranges:
+                metrics.increment("document_ai.page_range_documents")
+                metrics.increment("document_ai.page_ranges", len(page_ranges))
+                extracted, ranges = await self._process_page_ranges(page_ranges, mime_type, native_pdf_parsing)
+            else:
+                extracted = await self._process_with_document_ai(file_content, mime_type, native_pdf_parsing)
             
-            # Extract text and entities
             extracted_data = {
-                "text": document.text[:2000],  # First 2000 chars
-                "entities": [],
-                "form_fields": [],
-                "pages": len(document.pages),
-                "confidence": 0.0
+                "text": extracted.text[:2000],  # First 2000 chars
+                "nlp_text": extracted.text,
+                "word_count": len(extracted.text.split()),
+                "entities": extracted.entities,
+                "form_fields": extracted.form_fields,
+                "pages": extracted.page_count,
+                "confidence": extracted.entity_confidence
             }
-            
-            # Extract entities
-            total_confidence = 0
-            entity_count = 0
-            
-            for entity in document.entities:
-                entity_data = {
-                    "type": entity.type_,
-                    "mention_text": entity.mention_text,
-                    "confidence": entity.confidence,
-                    "normalized_value": entity.normalized_value.text if entity.normalized_value else None
-                }
-                extracted_data["entities"].append(entity_data)
-                total_confidence += entity.confidence
-                entity_count += 1
-            
-            # Calculate average confidence
-            if entity_count > 0:
-                extracted_data["confidence"] = total_confidence / entity_count
-            
-            # Extract form fields
-            for page in document.pages:
-                for form_field in page.form_fields:
-                    field_name = ""
-                    field_value = ""
-                    
-                    if form_field.field_name and form_field.field_name.text_anchor:
-                        field_name = document.text[
-                            form_field.field_name.text_anchor.text_segments[0].start_index:
-                            form_field.field_name.text_anchor.text_segments[0].end_index
-                        ].strip()
-                    
-                    if form_field.field_value and form_field.field_value.text_anchor:
-                        field_value = document.text[
-                            form_field.field_value.text_anchor.text_segments[0].start_index:
-                            form_field.field_value.text_anchor.text_segments[0].end_index
-                        ].strip()
-                    
-                    if field_name and field_value:
-                        extracted_data["form_fields"].append({
-                            "name": field_name,
-                            "value": field_value,
-                            "confidence": form_field.field_value.confidence if form_field.field_value else 0.0
-                        })
+            if ranges:
+                extracted_data["page_ranges"] = ranges
             
             logger.info(f"Document AI processing completed. Extracted {len(extracted_data['entities'])} entities, {len(extracted_data['form_fields'])} form fields")
             return extracted_data
             
+        except (DeadlineExceededError, QuotaThrottledError):
+            raise
         except Exception as e:
             logger.error(f"Document AI processing failed: {str(e)}")
             return {
@@ -109,54 +392,169 @@ class GoogleAIServices:
                 "confidence": 0.0
             }
     
-    async def analyze_document_with_vision_ai(self, file_content: bytes) -> Dict[str, Any]:
-        """Analyze document authenticity using Google Vision AI"""
-        try:
-            # Create Vision AI image object
-            image = vision.Image(content=file_content)
-            
-            # Perform multiple analyses
-            text_response = self.vision_client.text_detection(image=image)
-            object_response = self.vision_client.object_localization(image=image)
-            logo_response = self.vision_client.logo_detection(image=image)
-            face_response = self.vision_client.face_detection(image=image)
-            
-            # Extract text
-            texts = text_response.text_annotations
-            detected_text = texts[0].description if texts else ""
-            
-            # Build analysis result
-            analysis_result = {
-                "text_detected": len(detected_text) > 0,
-                "text_content": detected_text[:1000],  # First 1000 chars
-                "text_confidence": texts[0].confidence if texts else 0.0,
-                "objects_detected": len(object_response.localized_object_annotations),
-                "logos_detected": len(logo_response.logo_annotations),
-                "faces_detected": len(face_response.face_annotations),
-                "document_features": {
-                    "has_structured_text": len(detected_text) > 100,
-                    "has_official_elements": len(logo_response.logo_annotations) > 0,
-                    "has_faces": len(face_response.face_annotations) > 0,
-                    "text_density": len(detected_text.split()) if detected_text else 0
-                }
+    async def extract_document_content(self, file_content: bytes, mime_type: str) -> Dict[str, Any]:
+        """Document text, entities and form fields, from the PDF text layer when it is good enough
+        
+        Digitally generated PDFs carry their text, so a local pre-pass checks the
+        embedded text for page coverage and quality first. Depending on
+        TEXT_LAYER_FAST_PATH a usable text layer replaces the Document AI call
+        ("skip") or downgrades it from OCR to native PDF parsing ("native").
+        The result's "source" records the path taken.
+        """
+        mode = settings.TEXT_LAYER_FAST_PATH
+        text_layer = None
+        if mode != "off" and mime_type == "application/pdf":
+            text_layer = await asyncio.to_thread(
+                extract_text_layer,
+                file_content,
+                settings.TEXT_LAYER_MAX_PAGES,
+                settings.TEXT_LAYER_MIN_CHARS_PER_PAGE
+            )
+        
+        usable = text_layer is not None and text_layer.is_usable(settings.TEXT_LAYER_MIN_COVERAGE, settings.TEXT_LAYER_MIN_QUALITY)
+        if usable and mode == "skip":
+            metrics.increment("document_ai.text_layer.skipped")
+            # Keep confidences on the Document AI OCR scale, which fusion thresholds assume
+            confidence = min(round(text_layer.quality, 4), settings.TEXT_LAYER_MAX_CONFIDENCE)
+            form_fields = [dict(field, confidence=confidence) for field in text_layer.form_fields()]
+            result = {
+                "text": text_layer.text[:2000],  # First 2000 chars
+                "nlp_text": text_layer.text,
+                "word_count": len(text_layer.text.split()),
+                "entities": [
+                    {
+                        "type": field["name"].rstrip(":").strip().lower().replace(" ", "_"),
+                        "mention_text": field["value"],
+                        "confidence": field["confidence"],
+                        "normalized_value": None
+                    }
+                    for field in form_fields
+                ],
+                "form_fields": form_fields,
+                "pages": text_layer.page_count,
+                "confidence": confidence,
+                "source": "text_layer"
             }
-            
-            # Calculate authenticity score
-            score = 0.0
-            if analysis_result["text_detected"]:
-                score += 0.4
-            if analysis_result["objects_detected"] > 0:
-                score += 0.2
-            if analysis_result["logos_detected"] > 0:
-                score += 0.3
-            if analysis_result["document_features"]["has_structured_text"]:
-                score += 0.1
-            
-            analysis_result["authenticity_score"] = min(score, 1.0)
-            
-            logger.info(f"Vision AI analysis completed. Authenticity score: {analysis_result['authenticity_score']:.2f}")
+            logger.info(f"Used the PDF text layer instead of Document AI ({len(form_fields)} form fields)")
+        else:
+            native = usable and mode == "native"
+            if native:
+                metrics.increment("document_ai.text_layer.native")
+            result = await self.process_document_with_document_ai(file_content, mime_type, native_pdf_parsing=native)
+            result["source"] = "document_ai_native" if native else "document_ai"
+        
+        if text_layer is not None:
+            result["text_layer"] = {**text_layer.summary(), "usable": usable}
+        return result
+    
+    async def _batch_annotate_images(self, requests: List[Any], use_request_deadline: bool = True) -> List[Any]:
+        """Send Vision annotate requests as a single batch call"""
+        # Vision quota is counted per image and per feature
+        feature_units: Dict[str, int] = {}
+        for request in requests:
+            for feature in request.features:
+                name = VISION_FEATURE_NAMES.get(feature.type_)
+                if name:
+                    feature_units[name] = feature_units.get(name, 0) + 1
+        response = await self._call_rpc(
+            "vision",
+            self.vision_client.batch_annotate_images,
+            use_request_deadline=use_request_deadline,
+            quota_units=len(requests),
+            quota_features=feature_units,
+            requests=requests
+        )
+        return list(response.responses)
+    
+    async def _send_vision_batch(self, requests: List[Any]) -> List[Any]:
+        """Batcher entry point; a shared batch is bounded by the RPC timeout, not one request's deadline"""
+        return await self._batch_annotate_images(requests, use_request_deadline=False)
+    
+    def get_vision_features(self, document_type: Optional[str] = None, ocr: bool = True) -> List[str]:
+        """Resolve the Vision AI features to request for a document type
+        
+        ocr=False leaves out text detection, for when the text comes from Document AI.
+        """
+        features = settings.VISION_FEATURES_BY_DOCUMENT_TYPE.get(document_type, settings.VISION_DEFAULT_FEATURES)
+        return [
+            feature for feature in features
+            if feature in VISION_FEATURE_TYPES and (ocr or feature not in VISION_TEXT_FEATURES)
+        ]
+    
+    async def _annotate_image(self, file_content: bytes, features: List[str]) -> Any:
+        """One Vision annotate request with the given features, batched across uploads when enabled"""
+        # One annotate request carries every feature for this document type
+        request = vision.AnnotateImageRequest(
+            image=vision.Image(content=file_content),
+            features=[vision.Feature(type_=VISION_FEATURE_TYPES[feature]) for feature in features]
+        )
+        if self.vision_batcher:
+            # Fail fast rather than queueing behind a batch that will be rejected
+            breaker = self.breakers.get("vision")
+            if settings.CIRCUIT_BREAKER_ENABLED and breaker and breaker.is_open:
+                raise CircuitOpenError("vision circuit breaker is open")
+            deadline = current_deadline.get()
+            try:
+                response = await asyncio.wait_for(
+                    self.vision_batcher.annotate(request, len(file_content)),
+                    timeout=deadline.remaining() if deadline else None
+                )
+            except asyncio.TimeoutError:
+                raise DeadlineExceededError("vision did not complete within its time budget")
+        else:
+            response = (await self._batch_annotate_images([request]))[0]
+        if response.error.message:
+            raise Exception(response.error.message)
+        return response
+    
+    def build_vision_result(self, response: Any, features: List[str], ocr: bool = True) -> Dict[str, Any]:
+        """Vision analysis result from an annotate response
+        
+        Without OCR the text features are left for fusion to fill in from the
+        Document AI text (see complete_vision_text).
+        """
+        objects = response.localized_object_annotations if response is not None else []
+        logos = response.logo_annotations if response is not None else []
+        faces = response.face_annotations if response is not None else []
+        
+        # Build analysis result
+        analysis_result = {
+            "objects_detected": len(objects),
+            "logos_detected": len(logos),
+            "faces_detected": len(faces),
+            "features_requested": features,
+            "document_features": {
+                "has_official_elements": len(logos) > 0,
+                "has_faces": len(faces) > 0
+            }
+        }
+        if not ocr:
+            return vision_text_result(analysis_result, "", 0.0, "deferred")
+        
+        # Extract text
+        texts = response.text_annotations if response is not None else []
+        detected_text = texts[0].description if texts else ""
+        return vision_text_result(analysis_result, detected_text, texts[0].confidence if texts else 0.0, "vision")
+    
+    async def analyze_document_with_vision_ai(self, file_content: bytes, document_type: Optional[str] = None, ocr: bool = True) -> Dict[str, Any]:
+        """Analyze document authenticity using Google Vision AI
+        
+        With ocr=False text detection is not requested; the text features are
+        taken from Document AI at fusion time instead of OCR-ing the page twice.
+        """
+        try:
+            features = self.get_vision_features(document_type, ocr=ocr)
+            response = await self._annotate_image(file_content, features) if features else None
+            analysis_result = self.build_vision_result(response, features, ocr=ocr)
+            
+            if ocr:
+                logger.info(f"Vision AI analysis completed. Authenticity score: {analysis_result['authenticity_score']:.2f}")
+            else:
+                logger.info("Vision AI analysis completed; text features deferred to Document AI")
             return analysis_result
             
+        except (DeadlineExceededError, QuotaThrottledError):
+            raise
         except Exception as e:
             logger.error(f"Vision AI analysis failed: {str(e)}")
             return {
@@ -165,106 +563,332 @@ class GoogleAIServices:
                 "text_detected": False
             }
     
+    async def _run_vision_ocr_fallback(self, inputs: Dict[str, Any], payload: DocumentPayload) -> Dict[str, Any]:
+        """Vision text detection, only when Document AI produced no text to share"""
+        if inputs.get("vision", {}).get("text_source") != "deferred":
+            return SKIPPED_STAGE_RESULT
+        if document_ai_text_available(inputs.get("document_ai", SKIPPED_STAGE_RESULT)):
+            return VISION_OCR_NOT_NEEDED_RESULT
+        metrics.increment("vision.ocr_fallbacks")
+        response = await self._annotate_image(await payload.read(), ["text_detection"])
+        texts = response.text_annotations
+        return {
+            "text": texts[0].description if texts else "",
+            "text_confidence": texts[0].confidence if texts else 0.0
+        }
+    
+    def complete_vision_text(self, document_ai: Dict, vision_ai: Dict, vision_ocr: Optional[Dict] = None) -> Dict[str, Any]:
+        """Fill in deferred Vision text features, from Document AI or the fallback OCR"""
+        if vision_ai.get("text_source") != "deferred":
+            return vision_ai
+        if document_ai_text_available(document_ai):
+            text = document_ai.get("text", "")
+            return vision_text_result(
+                vision_ai, text, document_ai.get("confidence", 0.0), "document_ai",
+                word_count=document_ai.get("word_count")
+            )
+        if vision_ocr and "text" in vision_ocr:
+            return vision_text_result(vision_ai, vision_ocr["text"], vision_ocr.get("text_confidence", 0.0), "vision")
+        return vision_text_result(vision_ai, "", 0.0, "none")
+    
+    async def _analyze_nlp_chunk(self, chunk: str) -> Tuple[List[Dict[str, Any]], bool]:
+        """Entities of one chunk and whether they came from the chunk cache"""
+        key = chunk_key(chunk)
+        if self.nlp_chunk_cache is not None:
+            cached = self.nlp_chunk_cache.get(key)
+            if cached is not None:
+                metrics.increment("nlp.chunk_cache.hits")
+                return cached, True
+            metrics.increment("nlp.chunk_cache.misses")
+        
+        # Create document object
+        document = language_v1.Document(content=chunk, type_=language_v1.Document.Type.PLAIN_TEXT)
+        
+        # Perform entity analysis
+        async with self.nlp_slots:
+            entities_response = await self._call_rpc(
+                "nlp",
+                self.language_client.analyze_entities,
+                request={"document": document, "encoding_type": language_v1.EncodingType.UTF8}
+            )
+        
+        entities = [
+            {
+                "name": entity.name,
+                "type": entity.type_.name,
+                "salience": entity.salience,
+                "mentions": [mention.text.content for mention in entity.mentions[:3]]  # Limit mentions
+            }
+            for entity in entities_response.entities
+        ]
+        if self.nlp_chunk_cache is not None:
+            self.nlp_chunk_cache.set(key, entities)
+        return entities, False
+    
+    def find_risk_keywords(self, text: str) -> List[Dict[str, Any]]:
+        """Risk lexicon matches in the text, with their offsets (blocking, one pass over the text)"""
+        matches = services.get("risk_lexicon").find_all(text, limit=settings.RISK_MAX_MATCHES)
+        if matches:
+            metrics.increment("nlp.risk_keyword_matches", len(matches))
+        return matches
+    
+    def risk_lexicon_version(self) -> str:
+        """Version of the risk lexicon matched by NLP (blocking; "unavailable" if it does not load)"""
+        try:
+            return services.get("risk_lexicon").version()
+        except Exception as e:
+            logger.error(f"Risk lexicon unavailable: {str(e)}")
+            return "unavailable"
+    
     async def analyze_content_with_nlp(self, text: str) -> Dict[str, Any]:
-        """Analyze document content using Natural Language AI"""
+        """Analyze document content using Natural Language AI
+        
+        Up to NLP_MAX_DOCUMENT_CHARACTERS of text is split into sentence-aligned
+        chunks that are analyzed concurrently, then merged: entities are
+        de-duplicated and their salience re-weighted over the whole text.
+        risk_keywords lists risk lexicon matches over all of the text.
+        """
+        risk_keywords: List[Dict[str, Any]] = []
         try:
             if not text or len(text.strip()) < 10:
                 return {"entities": [], "entity_count": 0, "risk_keywords": []}
             
-            # Create document object
-            document = language_v1.Document(content=text[:1000], type_=language_v1.Document.Type.PLAIN_TEXT)
+            # Risk terms are matched locally over the whole text, not just what NLP sees
+            risk_keywords = await asyncio.to_thread(self.find_risk_keywords, text)
             
-            # Perform entity analysis
-            entities_response = self.language_client.analyze_entities(
-                request={"document": document, "encoding_type": language_v1.EncodingType.UTF8}
-            )
+            analyzed_text = text[:settings.NLP_MAX_DOCUMENT_CHARACTERS]
+            chunks = chunk_text(analyzed_text, settings.NLP_CHUNK_CHARACTERS)
             
-            # Extract entities
-            entities = []
-            risk_keywords = []
+            # Repeated chunks (a header on every page) are analyzed once
+            unique_chunks = list(dict.fromkeys(chunks))
+            tasks = [asyncio.ensure_future(self._analyze_nlp_chunk(chunk)) for chunk in unique_chunks]
+            try:
+                chunk_results = dict(zip(unique_chunks, await asyncio.gather(*tasks)))
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
             
-            for entity in entities_response.entities:
-                entity_data = {
-                    "name": entity.name,
-                    "type": entity.type_.name,
-                    "salience": entity.salience,
-                    "mentions": [mention.text.content for mention in entity.mentions[:3]]  # Limit mentions
-                }
-                entities.append(entity_data)
-                
-                # Check for risk-related keywords
-                if any(keyword in entity.name.lower() for keyword in ['fraud', 'illegal', 'violation', 'suspended', 'revoked']):
-                    risk_keywords.append(entity.name)
+            # Extract entities
+            entities = merge_chunk_entities([(len(chunk), chunk_results[chunk][0]) for chunk in chunks])
             
             nlp_result = {
                 "entities": entities,
                 "entity_count": len(entities),
                 "risk_keywords": risk_keywords,
                 "has_business_entities": any(e["type"] in ["ORGANIZATION", "LOCATION"] for e in entities),
-                "has_person_entities": any(e["type"] == "PERSON" for e in entities)
+                "has_person_entities": any(e["type"] == "PERSON" for e in entities),
+                "characters_analyzed": len(analyzed_text),
+                "text_truncated": len(text) > len(analyzed_text),
+                "chunks": len(chunks),
+                "chunks_from_cache": sum(1 for chunk in unique_chunks if chunk_results[chunk][1])
             }
             
             logger.info(f"NLP analysis completed. Found {len(entities)} entities, {len(risk_keywords)} risk keywords")
             return nlp_result
             
+        except (DeadlineExceededError, QuotaThrottledError):
+            raise
         except Exception as e:
             logger.error(f"NLP analysis failed: {str(e)}")
             return {
                 "error": str(e),
                 "entities": [],
                 "entity_count": 0,
-                "risk_keywords": []
+                "risk_keywords": risk_keywords
             }
     
 
-    async def multi_modal_fusion_analysis(self, file_content: bytes, mime_type: str) -> Dict[str, Any]:
+    def get_pipeline_stages(self, document_type: Optional[str] = None) -> List[str]:
+        """Resolve the fusion pipeline stages enabled for a document type"""
+        stages = settings.FUSION_STAGES_BY_DOCUMENT_TYPE.get(document_type, settings.FUSION_DEFAULT_STAGES)
+        stages = [stage for stage in stages if stage not in ("fusion", "vision_ocr")]
+        # Vision skips its own OCR when Document AI reads the text, keeping a
+        # fallback OCR stage for when Document AI fails
+        if settings.VISION_OCR_FROM_DOCUMENT_AI and "vision" in stages and "document_ai" in stages:
+            stages.append("vision_ocr")
+        # Fusion always runs; it is what produces the recommendation
+        return stages + ["fusion"]
+    
+    async def _run_fusion_stage(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Pipeline adapter for _perform_fusion_analysis"""
+        return self._perform_fusion_analysis(
+            inputs.get("document_ai", SKIPPED_STAGE_RESULT),
+            inputs.get("vision", SKIPPED_STAGE_RESULT),
+            inputs.get("nlp", SKIPPED_STAGE_RESULT),
+            inputs.get("vision_ocr")
+        )
+    
+    async def _run_stage_within_budget(self, stage: str, run) -> Dict[str, Any]:
+        """Give a stage its share of the request deadline, dropping optional stages that run out
+        
+        Optional stages are also dropped when their API quota is exhausted.
+        """
+        deadline = current_deadline.get()
+        optional = stage in settings.AI_OPTIONAL_STAGES
+        token = None
+        if deadline is not None:
+            if optional and deadline.remaining() < settings.AI_MIN_STAGE_BUDGET_SECONDS:
+                logger.warning(f"Dropping optional stage {stage}: {deadline.remaining():.2f}s left in request budget")
+                metrics.increment(f"pipeline.deadline_drops.{stage}")
+                return DEADLINE_SKIPPED_STAGE_RESULT
+            share = deadline.budget * settings.AI_STAGE_BUDGET_FRACTIONS.get(stage, 1.0)
+            token = current_deadline.set(Deadline(deadline.cap(share)))
+        
+        try:
+            return await run()
+        except DeadlineExceededError:
+            if not optional:
+                raise
+            logger.warning(f"Dropping optional stage {stage}: it ran out of its time budget")
+            metrics.increment(f"pipeline.deadline_drops.{stage}")
+            return DEADLINE_SKIPPED_STAGE_RESULT
+        except QuotaThrottledError:
+            if not optional:
+                raise
+            logger.warning(f"Dropping optional stage {stage}: API quota exhausted")
+            return THROTTLED_SKIPPED_STAGE_RESULT
+        finally:
+            if token is not None:
+                current_deadline.reset(token)
+    
+    def _build_pipeline(
+        self,
+        payload: DocumentPayload,
+        mime_type: str,
+        document_type: Optional[str],
+        stages: List[str]
+    ) -> StageScheduler:
+        """Fusion pipeline stages for one document"""
+        vision_ocr = "vision_ocr" not in stages
+        
+        # Stages read the payload once they run, so a spilled payload only
+        # takes memory budget while the stages need its bytes
+        async def extract_document_content():
+            return await self.extract_document_content(await payload.read(), mime_type)
+        
+        async def analyze_document_with_vision_ai():
+            return await self.analyze_document_with_vision_ai(await payload.read(), document_type, ocr=vision_ocr)
+        
+        # Each stage starts as soon as its inputs are ready: NLP only waits for
+        # Document AI, and fusion waits for whatever was enabled
+        return StageScheduler([
+            Stage(
+                "document_ai",
+                lambda inputs: self._run_stage_within_budget("document_ai", extract_document_content),
+                on_error=lambda e: stage_error_result(e, confidence=0.0)
+            ),
+            Stage(
+                "vision",
+                lambda inputs: self._run_stage_within_budget("vision", analyze_document_with_vision_ai),
+                on_error=lambda e: stage_error_result(e, authenticity_score=0.0)
+            ),
+            Stage(
+                "vision_ocr",
+                lambda inputs: self._run_stage_within_budget(
+                    "vision", lambda: self._run_vision_ocr_fallback(inputs, payload)
+                ),
+                depends_on=["document_ai", "vision"],
+                on_error=lambda e: stage_error_result(e)
+            ),
+            Stage(
+                "nlp",
+                lambda inputs: self._run_stage_within_budget(
+                    "nlp", lambda: self.analyze_content_with_nlp(nlp_input_text(inputs.get("document_ai", {})))
+                ),
+                depends_on=["document_ai"],
+                on_error=lambda e: stage_error_result(e, entities=[], entity_count=0, risk_keywords=[])
+            ),
+            Stage(
+                "fusion",
+                self._run_fusion_stage,
+                depends_on=["document_ai", "vision", "nlp", "vision_ocr"]
+            )
+        ])
+    
+    async def multi_modal_fusion_analysis(
+        self,
+        file_content: Union[bytes, DocumentPayload],
+        mime_type: str,
+        document_type: Optional[str] = None,
+        content_hash: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Perform multi-modal AI fusion analysis - OUR INNOVATION"""
         try:
-            logger.info("Starting multi-modal AI fusion analysis")
-            
-            # Run Document AI and Vision AI in parallel
-            try:
-                document_ai_task = self.process_document_with_document_ai(file_content, mime_type)
-                vision_ai_task = self.analyze_document_with_vision_ai(file_content)
-                
-                # Wait for both to complete
-                document_ai_result, vision_ai_result = await asyncio.gather(
-                    document_ai_task, vision_ai_task, return_exceptions=True
+            payload = as_payload(file_content)
+            stages = self.get_pipeline_stages(document_type)
+            
+            cache_key = None
+            if self.result_cache:
+                cache_key = FusionResultCache.make_key(
+                    content_hash or payload.digest(),
+                    self.processor_name,
+                    self.get_vision_features(document_type)
+                    + [f"stage:{stage}" for stage in stages]
+                    + [f"text_layer:{settings.TEXT_LAYER_FAST_PATH}"]
+                    # A lexicon reload or new decision categories change the decision
+                    + [f"risk_lexicon:{await asyncio.to_thread(self.risk_lexicon_version)}"]
+                    + [f"risk_decision:{category}" for category in settings.RISK_DECISION_CATEGORIES]
                 )
-            except Exception as parallel_error:
-                logger.error(f"Parallel processing error: {parallel_error}")
-                # Fallback: run sequentially
-                document_ai_result = await self.process_document_with_document_ai(file_content, mime_type)
-                vision_ai_result = await self.analyze_document_with_vision_ai(file_content)
+                cached_result = await self.result_cache.get(cache_key)
+                if cached_result is not None:
+                    cached_result["cached"] = True
+                    logger.info("Multi-modal fusion served from cache")
+                    return cached_result
             
-            # Handle exceptions from parallel execution
-            if isinstance(document_ai_result, Exception):
-                logger.error(f"Document AI failed: {document_ai_result}")
-                document_ai_result = {"error": str(document_ai_result), "confidence": 0.0}
-            if isinstance(vision_ai_result, Exception):
-                logger.error(f"Vision AI failed: {vision_ai_result}")
-                vision_ai_result = {"error": str(vision_ai_result), "authenticity_score": 0.0}
+            logger.info("Starting multi-modal AI fusion analysis")
             
-            # Run NLP on extracted text
-            text_content = document_ai_result.get("text", "")
-            nlp_result = await self.analyze_content_with_nlp(text_content)
+            # Request-level deadline, inherited by every stage task and RPC below
+            deadline = current_deadline.get()
+            deadline_token = None
+            if deadline is None:
+                deadline = Deadline(settings.FUSION_DEADLINE_SECONDS)
+                deadline_token = current_deadline.set(deadline)
+            try:
+                scheduler = self._build_pipeline(payload, mime_type, document_type, stages)
+                stage_results, pipeline_report = await scheduler.run(stages)
+                pipeline_report["stages_run"] = stages_called(stage_results, pipeline_report["stages_run"])
+            finally:
+                if deadline_token is not None:
+                    current_deadline.reset(deadline_token)
+            pipeline_report["deadline"] = {
+                "budget": deadline.budget,
+                "remaining": round(deadline.remaining(), 4)
+            }
             
-            # Perform fusion analysis
-            fusion_result = self._perform_fusion_analysis(document_ai_result, vision_ai_result, nlp_result)
+            # The longer text handed to NLP is not part of the response
+            document_ai_result = {
+                key: value for key, value in stage_results.get("document_ai", SKIPPED_STAGE_RESULT).items() if key != "nlp_text"
+            }
+            vision_ai_result = self.complete_vision_text(
+                document_ai_result, stage_results.get("vision", SKIPPED_STAGE_RESULT), stage_results.get("vision_ocr")
+            )
+            nlp_result = stage_results.get("nlp", SKIPPED_STAGE_RESULT)
+            fusion_result = stage_results["fusion"]
             
             final_result = {
-                "status": "success",  # ✅ ADD status field
+                "status": "throttled" if document_ai_result.get("throttled") else "success",  # ✅ ADD status field
+                "cached": False,
                 "document_ai": document_ai_result,
                 "vision_ai": vision_ai_result,
                 "nlp": nlp_result,
                 "fusion": fusion_result,
+                "pipeline": pipeline_report,
                 "processing_summary": {
-                    "total_processing_time": fusion_result.get("processing_time", 0),
+                    "total_processing_time": pipeline_report["wall_time"],
                     "confidence_score": fusion_result.get("fusion_confidence", 0),
-                    "recommended_action": fusion_result.get("recommended_action", "manual_review")
+                    "recommended_action": fusion_result.get("recommended_action", "manual_review"),
+                    "document_text_source": document_ai_result.get("source")
                 }
             }
             
+            # Only cache complete results so a transient backend error is retried next time
+            if cache_key and not any(
+                "error" in result or result.get("reason") in TRANSIENT_SKIP_REASONS
+                for result in (document_ai_result, vision_ai_result, nlp_result)
+            ):
+                await self.result_cache.set(cache_key, final_result)
+            
             logger.info(f"Multi-modal fusion completed. Final confidence: {fusion_result.get('fusion_confidence', 0):.2f}")
             return final_result
             
@@ -278,9 +902,12 @@ class GoogleAIServices:
                 "fusion": {"fusion_confidence": 0.0, "recommended_action": "manual_review"}
             }
         
-    def _perform_fusion_analysis(self, document_ai: Dict, vision_ai: Dict, nlp: Dict) -> Dict[str, Any]:
+    def _perform_fusion_analysis(self, document_ai: Dict, vision_ai: Dict, nlp: Dict, vision_ocr: Optional[Dict] = None) -> Dict[str, Any]:
         """Cross-validation and fusion of AI results - CORE INNOVATION"""
         
+        # Vision text features come from the Document AI text unless Vision OCR'd the page itself
+        vision_ai = self.complete_vision_text(document_ai, vision_ai, vision_ocr)
+        
         # Extract confidence scores
         doc_ai_confidence = document_ai.get("confidence", 0.0)
         vision_ai_confidence = vision_ai.get("authenticity_score", 0.0)
@@ -292,7 +919,7 @@ class GoogleAIServices:
             "content_structure": len(document_ai.get("entities", [])) >= 1,
             "visual_integrity": vision_ai.get("text_detected", False),
             "business_entities_present": nlp.get("has_business_entities", False),
-            "no_risk_keywords": len(nlp.get("risk_keywords", [])) == 0
+            "no_risk_keywords": not decisive_matches(nlp.get("risk_keywords", []), settings.RISK_DECISION_CATEGORIES)
         }
         
         # Calculate weighted fusion confidence
@@ -302,15 +929,31 @@ class GoogleAIServices:
             "validation": 0.3
         }
         
-        validation_score = sum(validation_results.values()) / len(validation_results)
+        # Stages disabled for this document type drop their checks and weight
+        # instead of counting as failures
+        for stage, result in (("document_ai", document_ai), ("vision_ai", vision_ai), ("nlp", nlp)):
+            if result.get("skipped"):
+                for check in STAGE_VALIDATION_CHECKS[stage]:
+                    validation_results.pop(check, None)
+                if stage in weights:
+                    weights[stage] = 0.0
+        
+        validation_score = sum(validation_results.values()) / len(validation_results) if validation_results else 0.0
         fusion_confidence = (
             doc_ai_confidence * weights["document_ai"] +
             vision_ai_confidence * weights["vision_ai"] +
             validation_score * weights["validation"]
-        )
+        ) / sum(weights.values())
         
-        # Determine recommended action
-        if fusion_confidence >= 0.85 and validation_score >= 0.8:
+        # Determine recommended action. A decisive risk keyword is never
+        # auto-approved, nor is a result missing a stage that was meant to run:
+        # its weight went to the stages that did
+        risk_flagged = validation_results.get("no_risk_keywords") is False
+        incomplete = any(
+            result.get("skipped") and result.get("reason") in INCOMPLETE_SKIP_REASONS
+            for result in (document_ai, vision_ai, nlp)
+        )
+        if fusion_confidence >= 0.85 and validation_score >= 0.8 and not risk_flagged and not incomplete:
             recommended_action = "auto_approve"
         elif fusion_confidence >= 0.60:
             recommended_action = "human_review"
@@ -335,6 +978,3 @@ class GoogleAIServices:
             "ai_agreement_score": abs(doc_ai_confidence - vision_ai_confidence),
             "processing_time": 3.2  # Simulated processing time
         }
-
-# Create global instance
-google_ai_services = GoogleAIServices()
\ No newline at end of file
@@ -0,0 +1,334 @@
+# app/services/jobs.py
+import asyncio
+import json
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from ..core.config import settings
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = {"completed", "failed"}
+
+# Push a job unless the queue is already at its maximum size
+ENQUEUE_SCRIPT = """
+if redis.call('LLEN', KEYS[1]) >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('LPUSH', KEYS[1], ARGV[1])
+return 1
+"""
+
+# Put a job whose worker stopped renewing its lease back at the head of the
+# queue; LREM makes sure only one process recovers it
+REQUEUE_SCRIPT = """
+if redis.call('EXISTS', KEYS[3]) == 1 then
+    return 0
+end
+if redis.call('LREM', KEYS[2], 1, ARGV[1]) == 0 then
+    return 0
+end
+redis.call('RPUSH', KEYS[1], ARGV[1])
+return 1
+"""
+
+class JobQueueFullError(Exception):
+    """Raised when the job queue cannot accept more work"""
+
+class InMemoryJobBackend:
+    """Default job queue and store, local to this process"""
+
+    def __init__(self, max_queue_size: int = 1000, max_finished_jobs: int = 10000):
+        self.max_queue_size = max_queue_size
+        self.max_finished_jobs = max_finished_jobs
+        self._queue = None
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def _get_queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        return self._queue
+
+    async def enqueue(self, job_id: str):
+        try:
+            self._get_queue().put_nowait(job_id)
+        except asyncio.QueueFull:
+            raise JobQueueFullError("Job queue is full")
+
+    async def dequeue(self, timeout: float = 1.0) -> Optional[str]:
+        try:
+            return await asyncio.wait_for(self._get_queue().get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def renew(self, job_id: str):
+        """Jobs in this process cannot outlive it, so there is no lease to renew"""
+
+    async def ack(self, job_id: str):
+        pass
+
+    async def requeue(self, job_id: str):
+        await self.enqueue(job_id)
+
+    async def requeue_stalled(self) -> int:
+        return 0
+
+    async def save(self, job: Dict[str, Any]):
+        self._jobs[job["job_id"]] = job
+        self._jobs.move_to_end(job["job_id"])
+
+        # Drop the oldest finished jobs once the store is over its bound
+        overflow = len(self._jobs) - self.max_finished_jobs
+        if overflow > 0:
+            for job_id in [job_id for job_id, stored in self._jobs.items() if stored["status"] in FINISHED_STATUSES][:overflow]:
+                del self._jobs[job_id]
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._jobs.get(job_id)
+
+    async def queue_depth(self) -> int:
+        return self._get_queue().qsize()
+
+class RedisJobBackend:
+    """Job queue and store shared between API and worker processes through Redis
+
+    Delivery is at-least-once: BLMOVE moves a job to a processing list rather
+    than removing it, and a lease key the worker keeps renewing marks it as
+    running. The job leaves the processing list when it is acked; a job whose
+    lease expired (its worker died) is put back on the queue.
+    """
+
+    QUEUE_KEY = "jobs:queue"
+    PROCESSING_KEY = "jobs:processing"
+    LEASE_PREFIX = "jobs:lease:"
+
+    def __init__(self, redis_url: str, result_ttl_seconds: int, max_queue_size: int = 1000, lease_seconds: int = 60):
+        import redis.asyncio as redis_asyncio
+        self.client = redis_asyncio.from_url(redis_url)
+        self.result_ttl_seconds = result_ttl_seconds
+        self.max_queue_size = max_queue_size
+        self.lease_seconds = lease_seconds
+        self._enqueue_script = self.client.register_script(ENQUEUE_SCRIPT)
+        self._requeue_script = self.client.register_script(REQUEUE_SCRIPT)
+        # Processing jobs seen without a lease on the last check. A lease is set
+        # just after BLMOVE, so a job is only recovered on the second sighting.
+        self._unleased: set = set()
+
+    async def enqueue(self, job_id: str):
+        if not int(await self._enqueue_script(keys=[self.QUEUE_KEY], args=[job_id, self.max_queue_size])):
+            raise JobQueueFullError("Job queue is full")
+
+    async def dequeue(self, timeout: float = 1.0) -> Optional[str]:
+        job_id = await self.client.blmove(self.QUEUE_KEY, self.PROCESSING_KEY, max(1, int(timeout)), "RIGHT", "LEFT")
+        if job_id is None:
+            return None
+        job_id = job_id.decode("utf-8") if isinstance(job_id, bytes) else job_id
+        await self.renew(job_id)
+        return job_id
+
+    async def renew(self, job_id: str):
+        """Extend the lease on a running job"""
+        await self.client.set(self.LEASE_PREFIX + job_id, "1", ex=self.lease_seconds)
+
+    async def ack(self, job_id: str):
+        """Remove a finished job from the processing list"""
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.lrem(self.PROCESSING_KEY, 1, job_id)
+            pipe.delete(self.LEASE_PREFIX + job_id)
+            await pipe.execute()
+
+    async def requeue(self, job_id: str):
+        """Hand a job this worker will not finish back to the queue"""
+        await self.client.delete(self.LEASE_PREFIX + job_id)
+        await self._requeue_script(keys=[self.QUEUE_KEY, self.PROCESSING_KEY, self.LEASE_PREFIX + job_id], args=[job_id])
+
+    async def requeue_stalled(self) -> int:
+        """Put jobs whose lease expired back on the queue; returns how many"""
+        processing = {
+            job_id.decode("utf-8") if isinstance(job_id, bytes) else job_id
+            for job_id in await self.client.lrange(self.PROCESSING_KEY, 0, -1)
+        }
+        unleased = set()
+        for job_id in processing:
+            if not await self.client.exists(self.LEASE_PREFIX + job_id):
+                unleased.add(job_id)
+        requeued = 0
+        for job_id in unleased & self._unleased:
+            keys = [self.QUEUE_KEY, self.PROCESSING_KEY, self.LEASE_PREFIX + job_id]
+            if int(await self._requeue_script(keys=keys, args=[job_id])):
+                logger.warning(f"Job {job_id} lost its worker, requeued")
+                requeued += 1
+        self._unleased = unleased
+        return requeued
+
+    async def save(self, job: Dict[str, Any]):
+        await self.client.set(f"jobs:{job['job_id']}", json.dumps(job, default=str), ex=self.result_ttl_seconds)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        payload = await self.client.get(f"jobs:{job_id}")
+        return json.loads(payload) if payload else None
+
+    async def queue_depth(self) -> int:
+        return await self.client.llen(self.QUEUE_KEY)
+
+def build_job_backend(backend: str):
+    """Create the job backend selected in settings"""
+    if backend == "redis":
+        return RedisJobBackend(
+            settings.REDIS_URL,
+            settings.JOB_RESULT_TTL_SECONDS,
+            max_queue_size=settings.JOB_QUEUE_MAX_SIZE,
+            lease_seconds=settings.JOB_LEASE_SECONDS
+        )
+    return InMemoryJobBackend(max_queue_size=settings.JOB_QUEUE_MAX_SIZE)
+
+class DocumentJobManager:
+    """Queues document processing jobs and runs them on a bounded worker pool"""
+
+    def __init__(self, backend, concurrency: int):
+        self.backend = backend
+        self.concurrency = concurrency
+        self._workers: List[asyncio.Task] = []
+
+    async def submit(self, job_input: Dict[str, Any], upload_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a queued job and enqueue it for the workers"""
+        job = {
+            "job_id": str(uuid.uuid4()),
+            "status": "queued",
+            "progress": {"stage": "queued", "percent": 0},
+            "input": job_input,
+            "upload_data": upload_data,
+            "result": None,
+            "error": None,
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "completed_at": None
+        }
+        await self.backend.save(job)
+        await self.backend.enqueue(job["job_id"])
+        metrics.increment("jobs.submitted")
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.backend.get(job_id)
+
+    async def _update(self, job: Dict[str, Any], **changes):
+        job.update(changes)
+        await self.backend.save(job)
+
+    async def _run_job(self, job_id: str):
+        from .document_processing import analyze_stored_document, build_ai_processing_response
+
+        job = await self.backend.get(job_id)
+        if job is None:
+            logger.warning(f"Job {job_id} was dequeued but has no stored record")
+            return
+        if job["status"] in FINISHED_STATUSES:
+            # Redelivered after its worker finished it but died before the ack
+            return
+
+        await self._update(
+            job,
+            status="processing",
+            progress={"stage": "ai_analysis", "percent": 10},
+            started_at=datetime.now().isoformat()
+        )
+        try:
+            file_path = job["input"]["file_path"]
+            if not os.path.exists(file_path):
+                # The API stores the upload; a separate worker needs the same UPLOAD_DIR mounted
+                raise FileNotFoundError(f"Upload {file_path} is not visible to this worker; share UPLOAD_DIR with the API")
+            ai_results = await analyze_stored_document(**job["input"])
+            result = {
+                "status": "success",
+                "message": "File uploaded and processed with multi-modal AI fusion",
+                "upload_data": job["upload_data"],
+                "ai_processing": build_ai_processing_response(ai_results)
+            }
+            await self._update(
+                job,
+                status="completed",
+                progress={"stage": "completed", "percent": 100},
+                result=result,
+                completed_at=datetime.now().isoformat()
+            )
+            metrics.increment("jobs.completed")
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            await self._update(
+                job,
+                status="failed",
+                progress={"stage": "failed", "percent": 100},
+                error=str(e),
+                completed_at=datetime.now().isoformat()
+            )
+            metrics.increment("jobs.failed")
+
+    async def _renew_lease(self, job_id: str):
+        while True:
+            await asyncio.sleep(settings.JOB_LEASE_SECONDS / 3)
+            try:
+                await self.backend.renew(job_id)
+            except Exception as e:
+                logger.warning(f"Could not renew the lease on job {job_id}: {str(e)}")
+
+    async def _run_leased_job(self, job_id: str):
+        """Run a dequeued job, acking it when done and handing it back if the worker stops first"""
+        renewal = asyncio.create_task(self._renew_lease(job_id))
+        try:
+            await self._run_job(job_id)
+        except asyncio.CancelledError:
+            await asyncio.shield(self.backend.requeue(job_id))
+            raise
+        finally:
+            renewal.cancel()
+        await self.backend.ack(job_id)
+
+    async def _worker(self, worker_id: int):
+        while True:
+            try:
+                job_id = await self.backend.dequeue()
+                metrics.set_gauge("jobs.queue_depth", await self.backend.queue_depth())
+                if job_id is None:
+                    continue
+                await self._run_leased_job(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} error: {str(e)}")
+                await asyncio.sleep(1)
+
+    async def _recover_stalled(self):
+        """Requeue jobs whose worker died, checking every half lease"""
+        while True:
+            await asyncio.sleep(settings.JOB_LEASE_SECONDS / 2)
+            try:
+                requeued = await self.backend.requeue_stalled()
+                if requeued:
+                    metrics.increment("jobs.requeued", requeued)
+            except Exception as e:
+                logger.error(f"Stalled job recovery failed: {str(e)}")
+
+    def start(self):
+        """Start the worker pool on the running event loop"""
+        if self._workers:
+            return
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.concurrency)]
+        self._workers.append(asyncio.create_task(self._recover_stalled()))
+        logger.info(f"Started {self.concurrency} document job workers")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+# Create global instance
+job_manager = DocumentJobManager(
+    build_job_backend(settings.JOB_QUEUE_BACKEND),
+    concurrency=settings.JOB_WORKER_CONCURRENCY
+)
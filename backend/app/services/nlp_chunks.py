@@ -0,0 +1,72 @@
+# app/services/nlp_chunks.py
+import hashlib
+import re
+from typing import Any, Dict, List, Tuple
+
+# Sentence ends, and line breaks: statements and letters put one item per line
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\s*\n\s*")
+
+def chunk_key(chunk: str) -> str:
+    """Cache key of a chunk; identical boilerplate in any document maps to the same key"""
+    return "nlp-chunk:" + hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+def chunk_text(text: str, max_chars: int) -> List[str]:
+    """Split text into chunks of at most max_chars, cutting only between sentences
+
+    A sentence longer than max_chars is cut at the last space that fits.
+    """
+    chunks, current, length = [], [], 0
+    for sentence in split_sentences(text):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                chunks.append("\n".join(current))
+                current, length = [], 0
+            chunks.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if current and length + 1 + len(sentence) > max_chars:
+            chunks.append("\n".join(current))
+            current, length = [], 0
+        current.append(sentence)
+        length += len(sentence) + (1 if length else 0)
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+def merge_chunk_entities(chunk_results: List[Tuple[int, List[Dict[str, Any]]]], max_mentions: int = 3) -> List[Dict[str, Any]]:
+    """Merge per-chunk entities into one list for the whole text
+
+    chunk_results holds (chunk length, entities) per chunk. Entities with the
+    same name and type are merged. Salience sums to 1 within each chunk, so
+    it is re-weighted by each chunk's share of the text and summed, keeping
+    the merged saliences summing to 1 over the document. Sorted by salience.
+    """
+    total = sum(length for length, _ in chunk_results) or 1
+    merged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for length, entities in chunk_results:
+        weight = length / total
+        for entity in entities:
+            key = (" ".join(entity["name"].lower().split()), entity["type"])
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = {
+                    "name": entity["name"],
+                    "type": entity["type"],
+                    "salience": entity["salience"] * weight,
+                    "mentions": list(entity["mentions"][:max_mentions])
+                }
+                continue
+            existing["salience"] += entity["salience"] * weight
+            for mention in entity["mentions"]:
+                if len(existing["mentions"]) >= max_mentions:
+                    break
+                if mention not in existing["mentions"]:
+                    existing["mentions"].append(mention)
+    entities = sorted(merged.values(), key=lambda entity: entity["salience"], reverse=True)
+    for entity in entities:
+        entity["salience"] = round(entity["salience"], 6)
+    return entities
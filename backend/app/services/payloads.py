@@ -0,0 +1,205 @@
+# app/services/payloads.py
+import asyncio
+import hashlib
+import logging
+import mmap
+import time
+from contextlib import asynccontextmanager
+from typing import Optional, Union
+import aiofiles
+from ..core.config import settings
+from .metrics import metrics
+from .resilience import DeadlineExceededError, current_deadline
+
+logger = logging.getLogger(__name__)
+
+class DocumentPayload:
+    """Document bytes for the AI stages, held in memory or memory-mapped from disk
+
+    In-memory payloads hand out the same bytes object to every stage. Spilled
+    payloads keep only a read-only mapping of the stored upload until a stage
+    needs the bytes; the first read then waits for budget and makes one copy
+    that every stage shares, held until the payload is released. Payloads that
+    never need their bytes (a cache hit) use no budget at all.
+    """
+
+    def __init__(
+        self,
+        content: Optional[bytes] = None,
+        path: Optional[str] = None,
+        budget: Optional["PayloadMemoryBudget"] = None
+    ):
+        self._content = content
+        self._path = path
+        self._budget = budget
+        self._file = None
+        self._map = None
+        self._copy: Optional[bytes] = None
+        self._copy_lock: Optional[asyncio.Lock] = None
+        self._reserved = 0
+        if content is None and path is not None:
+            self._file = open(path, "rb")
+            if self._file.seek(0, 2) > 0:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    async def load(cls, path: str, spill: bool = False, budget: Optional["PayloadMemoryBudget"] = None) -> "DocumentPayload":
+        """Load a stored upload, either fully into memory or as a mapped spill reading against `budget`"""
+        if spill:
+            return cls(path=path, budget=budget)
+        async with aiofiles.open(path, "rb") as stored:
+            return cls(content=await stored.read())
+
+    @property
+    def spilled(self) -> bool:
+        return self._content is None
+
+    @property
+    def size(self) -> int:
+        if self._content is not None:
+            return len(self._content)
+        return len(self._map) if self._map is not None else 0
+
+    async def read(self) -> bytes:
+        """Bytes for a stage; a spilled payload copies them out of the mapping once, under the budget"""
+        if self._content is not None:
+            return self._content
+        if self._map is None:
+            return b""
+        if self._copy_lock is None:
+            self._copy_lock = asyncio.Lock()
+        async with self._copy_lock:
+            if self._copy is None:
+                if self._budget is not None:
+                    self._reserved = await self._budget.reserve_shared_copy(len(self._map))
+                self._copy = self._map[:]
+                metrics.increment("payload_budget.spill_copies")
+        return self._copy
+
+    async def release(self):
+        """Drop a spilled payload's shared copy and give its budget back"""
+        self._copy = None
+        if self._reserved:
+            reserved, self._reserved = self._reserved, 0
+            await self._budget.release_shared_copy(reserved)
+
+    def digest(self) -> str:
+        """SHA-256 of the payload without materialising a spilled payload"""
+        if self._content is not None:
+            return hashlib.sha256(self._content).hexdigest()
+        return hashlib.sha256(self._map if self._map is not None else b"").hexdigest()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._content = None
+        self._copy = None
+
+def as_payload(file_content: Union[bytes, DocumentPayload]) -> DocumentPayload:
+    """Accept raw bytes wherever a DocumentPayload is expected"""
+    if isinstance(file_content, DocumentPayload):
+        return file_content
+    return DocumentPayload(content=file_content)
+
+class PayloadMemoryBudget:
+    """Process-wide byte budget for document payloads held in memory
+
+    A request that does not fit waits up to `max_wait_seconds` for other
+    requests to release their reservation. If it still does not fit it is told
+    to spill, i.e. to memory-map its stored upload instead of loading it. A
+    spilled payload reserves budget again, within the request deadline, once a
+    stage needs its bytes.
+    """
+
+    def __init__(self, max_bytes: int, max_wait_seconds: float):
+        self.max_bytes = max_bytes
+        self.max_wait_seconds = max_wait_seconds
+        self.bytes_in_use = 0
+        self._condition = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _publish(self):
+        metrics.set_gauge("payload_budget.bytes_in_use", self.bytes_in_use)
+        metrics.set_gauge("payload_budget.utilization", self.bytes_in_use / self.max_bytes if self.max_bytes else 0.0)
+
+    async def _acquire(self, nbytes: int, timeout: Optional[float]) -> bool:
+        """Reserve nbytes, waiting up to timeout seconds (None: as long as it takes)"""
+        if nbytes > self.max_bytes:
+            return False
+
+        condition = self._get_condition()
+        started = time.perf_counter()
+        async with condition:
+            try:
+                await asyncio.wait_for(
+                    condition.wait_for(lambda: self.bytes_in_use + nbytes <= self.max_bytes),
+                    timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                metrics.observe("payload_budget.wait_seconds", time.perf_counter() - started)
+                return False
+            self.bytes_in_use += nbytes
+
+        metrics.observe("payload_budget.wait_seconds", time.perf_counter() - started)
+        self._publish()
+        return True
+
+    async def _release(self, nbytes: int):
+        condition = self._get_condition()
+        async with condition:
+            self.bytes_in_use -= nbytes
+            condition.notify_all()
+        self._publish()
+
+    async def reserve_shared_copy(self, nbytes: int) -> int:
+        """Reserve budget for a spilled payload's shared copy, waiting until the request deadline
+
+        A payload larger than the whole budget takes all of it. Returns the
+        bytes reserved; raises DeadlineExceededError if they never free up.
+        """
+        nbytes = min(nbytes, self.max_bytes)
+        deadline = current_deadline.get()
+        if not await self._acquire(nbytes, deadline.remaining() if deadline is not None else None):
+            raise DeadlineExceededError("no payload memory budget freed up within the request deadline")
+        return nbytes
+
+    async def release_shared_copy(self, nbytes: int):
+        await self._release(nbytes)
+
+    @asynccontextmanager
+    async def reserve(self, nbytes: int):
+        """Reserve budget for a payload; yields False when the caller should spill"""
+        reserved = await self._acquire(nbytes, self.max_wait_seconds)
+        if not reserved:
+            metrics.increment("payload_budget.spills")
+            logger.info(f"Payload of {nbytes} bytes is over the memory budget, spilling to a mapped file")
+        try:
+            yield reserved
+        finally:
+            if reserved:
+                await self._release(nbytes)
+
+    @asynccontextmanager
+    async def open_payload(self, path: str, nbytes: int):
+        """Reserve budget and load a stored upload, spilling when over budget"""
+        async with self.reserve(nbytes) as reserved:
+            payload = await DocumentPayload.load(path, spill=not reserved, budget=self)
+            try:
+                yield payload
+            finally:
+                await payload.release()
+                payload.close()
+
+# Create global instance
+payload_budget = PayloadMemoryBudget(
+    max_bytes=settings.PAYLOAD_MEMORY_BUDGET_BYTES,
+    max_wait_seconds=settings.PAYLOAD_BUDGET_MAX_WAIT_SECONDS
+)
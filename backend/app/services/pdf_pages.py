@@ -0,0 +1,42 @@
+# app/services/pdf_pages.py
+import io
+import logging
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def split_pdf_pages(content: bytes, threshold: int, pages_per_range: int) -> Optional[List[Tuple[int, int, bytes]]]:
+    """Split a PDF longer than threshold pages into (first_page, last_page, pdf_bytes) ranges
+
+    Pages are numbered from 1. Returns None when the PDF is short enough for a
+    single call, or when it cannot be split (pypdf missing, unreadable or
+    encrypted file); the caller then sends the document whole. Blocking: run it
+    off the event loop.
+    """
+    try:
+        from pypdf import PdfReader, PdfWriter
+    except ImportError:
+        logger.warning("pypdf is not installed; large PDFs are sent to Document AI in one call")
+        return None
+
+    try:
+        reader = PdfReader(io.BytesIO(content))
+        if reader.is_encrypted:
+            return None
+        page_count = len(reader.pages)
+        if page_count <= threshold:
+            return None
+
+        ranges = []
+        for first in range(0, page_count, max(1, pages_per_range)):
+            writer = PdfWriter()
+            last = min(first + pages_per_range, page_count)
+            for index in range(first, last):
+                writer.add_page(reader.pages[index])
+            buffer = io.BytesIO()
+            writer.write(buffer)
+            ranges.append((first + 1, last, buffer.getvalue()))
+        return ranges
+    except Exception as e:
+        logger.warning(f"Could not split PDF into page ranges: {str(e)}")
+        return None
@@ -0,0 +1,160 @@
+# app/services/quota.py
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Tuple
+from ..core.config import settings
+from .metrics import metrics
+from .resilience import current_deadline
+
+logger = logging.getLogger(__name__)
+
+# Atomic token bucket; Redis TIME keeps every process on the same clock.
+# Floats go back as strings because Lua numbers are truncated to integers.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local granted = 0
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+    granted = 1
+else
+    wait = (requested - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {granted, tostring(wait), tostring(tokens)}
+"""
+
+class QuotaThrottledError(Exception):
+    """Raised when no token for an API became available within the allowed wait"""
+
+    def __init__(self, bucket: str, retry_after: float):
+        super().__init__(f"throttled: {bucket} quota exhausted, retry after {retry_after:.2f}s")
+        self.bucket = bucket
+        self.retry_after = retry_after
+
+class LocalQuotaStore:
+    """In-process token buckets; the fallback when Redis is unreachable and the stand-in for tests"""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # key -> (tokens, updated_at)
+
+    async def take(self, key: str, rate: float, capacity: float, tokens: float) -> Tuple[bool, float, float]:
+        """Take tokens if available; returns (granted, seconds until they would be, level)"""
+        now = time.monotonic()
+        level, updated_at = self._buckets.get(key, (capacity, now))
+        level = min(capacity, level + (now - updated_at) * rate)
+        if level >= tokens:
+            self._buckets[key] = (level - tokens, now)
+            return True, 0.0, level - tokens
+        self._buckets[key] = (level, now)
+        return False, (tokens - level) / rate, level
+
+class RedisQuotaStore:
+    """Token buckets on the Redis service from docker-compose, shared by every worker and replica"""
+
+    def __init__(self, redis_url: str, prefix: str = "quota:"):
+        import redis.asyncio as redis_asyncio
+        self.client = redis_asyncio.from_url(redis_url)
+        self.prefix = prefix
+        self._script = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def take(self, key: str, rate: float, capacity: float, tokens: float) -> Tuple[bool, float, float]:
+        granted, wait, level = await self._script(keys=[self.prefix + key], args=[rate, capacity, tokens])
+        return bool(int(granted)), float(wait), float(level)
+
+def build_quota_store(backend: str):
+    """Create the quota store selected in settings"""
+    if backend == "redis":
+        try:
+            return RedisQuotaStore(settings.REDIS_URL)
+        except Exception as e:
+            logger.warning(f"Redis quota store unavailable, using in-process buckets: {str(e)}")
+    return LocalQuotaStore()
+
+class QuotaGovernor:
+    """Token-bucket governor for outbound Google AI calls, per API and per feature
+
+    Limits are requests per minute keyed by API ("vision") or API and feature
+    ("vision:face_detection"); keys without a limit are not governed. A caller
+    waits up to `max_wait_seconds` (capped by the request deadline) for its
+    tokens and otherwise gets QuotaThrottledError.
+    """
+
+    def __init__(
+        self,
+        store,
+        limits_per_minute: Dict[str, float],
+        burst_seconds: float = 5.0,
+        max_wait_seconds: float = 2.0,
+        local_share: float = 1.0
+    ):
+        self.store = store
+        self.limits_per_minute = limits_per_minute
+        self.burst_seconds = burst_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self.local_share = local_share
+        self.fallback = store if isinstance(store, LocalQuotaStore) else LocalQuotaStore()
+
+    async def acquire(self, api: str, units: int = 1, features: Optional[Dict[str, int]] = None):
+        """Wait for `units` tokens from the API bucket and the matching feature buckets"""
+        buckets = {api: units}
+        for feature, feature_units in (features or {}).items():
+            buckets[f"{api}:{feature}"] = feature_units
+        for key, tokens in buckets.items():
+            if key in self.limits_per_minute and tokens > 0:
+                await self._acquire_bucket(key, tokens)
+
+    async def _acquire_bucket(self, key: str, tokens: float):
+        rate = self.limits_per_minute[key] / 60.0
+        capacity = max(float(tokens), rate * self.burst_seconds)
+        max_wait = self.max_wait_seconds
+        deadline = current_deadline.get()
+        if deadline:
+            max_wait = deadline.cap(max_wait)
+
+        waited = 0.0
+        while True:
+            granted, wait, level = await self._take(key, rate, capacity, tokens)
+            metrics.set_gauge(f"quota.level.{key}", round(level, 3))
+            if granted:
+                if waited:
+                    metrics.observe(f"quota.wait_seconds.{key}", waited)
+                return
+            if waited + wait > max_wait:
+                metrics.increment(f"quota.throttled.{key}")
+                raise QuotaThrottledError(key, wait)
+            await asyncio.sleep(wait)
+            waited += wait
+
+    async def _take(self, key: str, rate: float, capacity: float, tokens: float) -> Tuple[bool, float, float]:
+        if self.store is not self.fallback:
+            try:
+                return await self.store.take(key, rate, capacity, tokens)
+            except Exception as e:
+                logger.warning(f"Shared quota store unavailable, using in-process bucket for {key}: {str(e)}")
+                metrics.increment(f"quota.fallback.{key}")
+        # Without coordination each process only gets its share of the limit
+        share = self.local_share
+        return await self.fallback.take(key, rate * share, max(float(tokens), capacity * share), tokens)
+
+def build_quota_governor() -> Optional[QuotaGovernor]:
+    """Create the governor configured in settings, or None when disabled"""
+    if not settings.QUOTA_GOVERNOR_ENABLED:
+        return None
+    return QuotaGovernor(
+        build_quota_store(settings.QUOTA_BACKEND),
+        settings.QUOTA_LIMITS_PER_MINUTE,
+        burst_seconds=settings.QUOTA_BURST_SECONDS,
+        max_wait_seconds=settings.QUOTA_MAX_WAIT_SECONDS,
+        local_share=settings.QUOTA_LOCAL_SHARE
+    )
@@ -0,0 +1,211 @@
+# app/services/registry.py
+import asyncio
+import inspect
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class ServiceRegistry:
+    """Process-wide singletons for clients that are expensive to build, created on first use
+
+    Nothing is constructed at import time, so the app boots without Google
+    credentials or a reachable database; a service that fails to build raises
+    on `get` and is retried on the next call.
+    """
+
+    def __init__(self):
+        # Re-entrant: a factory may get() the services it is built from
+        self._lock = threading.RLock()
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._warmers: Dict[str, Callable[[Any], Any]] = {}
+        self._closers: Dict[str, Callable[[Any], Any]] = {}
+        self._enabled: Dict[str, Callable[[], bool]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._errors: Dict[str, str] = {}
+        self._warmup_task: Optional[asyncio.Task] = None
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        warm: Optional[Callable[[Any], Any]] = None,
+        close: Optional[Callable[[Any], Any]] = None,
+        enabled: Optional[Callable[[], bool]] = None
+    ):
+        self._factories[name] = factory
+        # Checked at warmup, so a switched-off feature's service is not built ahead of use
+        if enabled:
+            self._enabled[name] = enabled
+        if warm:
+            self._warmers[name] = warm
+        if close:
+            self._closers[name] = close
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                try:
+                    instance = self._factories[name]()
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise
+                self._instances[name] = instance
+                self._errors.pop(name, None)
+                logger.info(f"Service {name} initialized")
+            return instance
+
+    def status(self) -> Dict[str, str]:
+        """ready / not_initialized / error: ... for every registered service"""
+        result = {}
+        for name in self._factories:
+            if name in self._instances:
+                result[name] = "ready"
+            elif name in self._errors:
+                result[name] = f"error: {self._errors[name]}"
+            else:
+                result[name] = "not_initialized"
+        return result
+
+    async def warmup(self, names: Optional[Iterable[str]] = None):
+        """Build services (all of them by default) and warm their connections off the event loop; failures are only logged"""
+        for name in list(self._factories) if names is None else names:
+            enabled = self._enabled.get(name)
+            if enabled and not enabled():
+                logger.info(f"Service {name} not warmed up, its feature is disabled")
+                continue
+            try:
+                instance = await asyncio.to_thread(self.get, name)
+                warm = self._warmers.get(name)
+                if warm:
+                    if inspect.iscoroutinefunction(warm):
+                        await warm(instance)
+                    else:
+                        await asyncio.to_thread(warm, instance)
+                logger.info(f"Service {name} warmed up")
+            except Exception as e:
+                logger.warning(f"Warmup of {name} failed, it will be retried on first use: {str(e)}")
+
+    def start_warmup(self, names: Optional[Iterable[str]] = None):
+        """Warm services in the background so startup does not wait on the network
+
+        Defaults to SERVICE_WARMUP_SERVICES; anything else stays lazy.
+        """
+        names = settings.SERVICE_WARMUP_SERVICES if names is None else names
+        self._warmup_task = asyncio.create_task(self.warmup([name for name in names if name in self._factories]))
+
+    async def shutdown(self):
+        """Stop a running warmup and close every service that was created"""
+        if self._warmup_task and not self._warmup_task.done():
+            self._warmup_task.cancel()
+            try:
+                await self._warmup_task
+            except asyncio.CancelledError:
+                pass
+        with self._lock:
+            instances = list(self._instances.items())
+            self._instances.clear()
+        # Close in reverse creation order so dependents go before what they share
+        for name, instance in reversed(instances):
+            close = self._closers.get(name)
+            if not close:
+                continue
+            try:
+                result = close(instance)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning(f"Closing {name} failed: {str(e)}")
+
+def _create_google_ai():
+    from .google_ai import GoogleAIServices
+    return GoogleAIServices()
+
+def _create_document_ai():
+    from .document_ai import DocumentAIService
+    google_ai = services.get("google_ai")
+    # Reuse the fusion pipeline's clients and channels
+    return DocumentAIService(client=google_ai.document_ai_client, storage_client=google_ai.storage_client)
+
+def _create_risk_lexicon():
+    from .risk_lexicon import RiskLexicon
+    return RiskLexicon(settings.RISK_LEXICON_PATH, check_interval=settings.RISK_LEXICON_CHECK_SECONDS)
+
+def _create_watchlist():
+    from .screening import Watchlist
+    if not settings.SCREENING_WATCHLIST_PATH:
+        raise ValueError("SCREENING_WATCHLIST_PATH is not set")
+    return Watchlist(
+        settings.SCREENING_WATCHLIST_PATH,
+        alias_path=settings.SCREENING_ALIAS_PATH,
+        check_interval=settings.SCREENING_CHECK_SECONDS,
+        candidate_threshold=settings.SCREENING_CANDIDATE_THRESHOLD
+    )
+
+def _create_duplicate_index():
+    from .duplicates import DuplicateIndex
+    index = DuplicateIndex(
+        num_perm=settings.DUPLICATE_MINHASH_PERMUTATIONS,
+        bands=settings.DUPLICATE_LSH_BANDS,
+        name_threshold=settings.DUPLICATE_NAME_THRESHOLD,
+        address_threshold=settings.DUPLICATE_ADDRESS_THRESHOLD,
+        max_bucket=settings.DUPLICATE_MAX_BUCKET
+    )
+    # Reading every stored application takes minutes on a large portfolio; nothing waits on it
+    threading.Thread(target=_load_duplicate_index, args=(index,), name="duplicate-index-load", daemon=True).start()
+    return index
+
+def _load_duplicate_index(index):
+    from .duplicates import database_records
+    try:
+        index.rebuild(database_records(services.get("sync_database"), settings.DUPLICATE_REBUILD_BATCH_SIZE))
+    except Exception as e:
+        logger.warning(f"Duplicate index starts without stored applications, loading them failed: {str(e)}")
+        index.mark_loaded()
+
+def _create_database():
+    from ..database import engine
+    return engine
+
+async def _warm_database(engine):
+    from sqlalchemy import text
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+async def _close_database(engine):
+    await engine.dispose()
+
+def _create_sync_database():
+    from sqlalchemy import create_engine
+    return create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+
+def _warm_sync_database(engine):
+    from sqlalchemy import text
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+# Create global instance
+services = ServiceRegistry()
+services.register(
+    "google_ai",
+    _create_google_ai,
+    warm=lambda google_ai: google_ai.warm_channels(settings.SERVICE_WARMUP_TIMEOUT_SECONDS),
+    close=lambda google_ai: google_ai.close()
+)
+services.register("document_ai", _create_document_ai)
+services.register("risk_lexicon", _create_risk_lexicon, warm=lambda lexicon: lexicon.reload())
+services.register(
+    "watchlist",
+    _create_watchlist,
+    warm=lambda watchlist: watchlist.index(),
+    enabled=lambda: settings.SCREENING_ENABLED
+)
+services.register("duplicate_index", _create_duplicate_index, enabled=lambda: settings.DUPLICATE_DETECTION_ENABLED)
+services.register("database", _create_database, warm=_warm_database, close=_close_database)
+services.register("sync_database", _create_sync_database, warm=_warm_sync_database, close=lambda engine: engine.dispose())
@@ -0,0 +1,112 @@
+# app/services/resilience.py
+import asyncio
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Optional, Tuple, Type
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class DeadlineExceededError(Exception):
+    """Raised when a call cannot finish within the remaining request budget"""
+
+class Deadline:
+    """Absolute point in time by which a request has to finish"""
+
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def cap(self, timeout: float) -> float:
+        """Shrink a timeout so it does not outlive the deadline"""
+        return min(timeout, self.remaining())
+
+# Deadline of the request being processed; asyncio tasks inherit it from their creator
+current_deadline: ContextVar[Optional[Deadline]] = ContextVar("current_deadline", default=None)
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Full-jitter exponential backoff for the given (1-based) attempt"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** (attempt - 1))))
+
+async def call_with_retries(
+    attempt: Callable[[float], Awaitable[Any]],
+    *,
+    attempt_timeout: float,
+    deadline: Optional[Deadline] = None,
+    max_attempts: int = 3,
+    base_delay: float = 0.2,
+    max_delay: float = 2.0,
+    retry_on: Tuple[Type[BaseException], ...] = (),
+    name: str = "rpc"
+) -> Any:
+    """Call `attempt(timeout)` with per-attempt timeouts and jittered retries
+
+    Every attempt timeout and backoff sleep is capped by the deadline, and no
+    retry is started once the remaining budget cannot cover it.
+    """
+    last_error: Optional[BaseException] = None
+    for number in range(1, max_attempts + 1):
+        timeout = deadline.cap(attempt_timeout) if deadline else attempt_timeout
+        if timeout <= 0:
+            break
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(attempt(timeout), timeout=timeout)
+            metrics.observe(f"ai_rpc_seconds.{name}", time.perf_counter() - started)
+            return result
+        except asyncio.TimeoutError as e:
+            metrics.increment(f"ai_rpc_timeouts.{name}")
+            last_error = e
+        except retry_on as e:
+            last_error = e
+
+        if number == max_attempts:
+            break
+        delay = backoff_delay(number, base_delay, max_delay)
+        if deadline and deadline.remaining() <= delay:
+            break
+        metrics.increment(f"ai_rpc_retries.{name}")
+        logger.warning(f"{name} attempt {number} failed ({type(last_error).__name__}), retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+    if (deadline and deadline.expired) or last_error is None or isinstance(last_error, asyncio.TimeoutError):
+        raise DeadlineExceededError(f"{name} did not complete within its time budget")
+    raise last_error
+
+async def hedged(call: Callable[[], Awaitable[Any]], hedge_after: float, name: str = "rpc") -> Any:
+    """Run `call`, starting one backup copy if the first has not finished after `hedge_after`
+
+    Only for idempotent calls. The first copy to succeed wins and the other is
+    cancelled; if both fail the first error is raised.
+    """
+    primary = asyncio.ensure_future(call())
+    done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+    if done:
+        return primary.result()
+
+    metrics.increment(f"ai_rpc_hedges.{name}")
+    backup = asyncio.ensure_future(call())
+    pending = {primary, backup}
+    first_error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is backup:
+                        metrics.increment(f"ai_rpc_hedge_wins.{name}")
+                    return task.result()
+                first_error = first_error or task.exception()
+        raise first_error
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,131 @@
+# app/services/result_cache.py
+import copy
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+from ..core.config import settings
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class LRUTTLCache:
+    """Bounded in-process LRU cache whose entries expire after a TTL"""
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+class LocalSharedCache:
+    """In-process stand-in for the Redis tier, used in tests and local runs"""
+
+    def __init__(self):
+        self._entries: Dict[str, tuple] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ttl_seconds: float):
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+
+class RedisSharedCache:
+    """Shared cache tier on the Redis service from docker-compose"""
+
+    def __init__(self, redis_url: str):
+        import redis.asyncio as redis_asyncio
+        self.client = redis_asyncio.from_url(redis_url)
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.client.get(key)
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    async def set(self, key: str, value: str, ttl_seconds: float):
+        await self.client.set(key, value, ex=int(ttl_seconds))
+
+def build_shared_cache(backend: str):
+    """Create the shared cache tier selected in settings, or None"""
+    if backend == "redis":
+        try:
+            return RedisSharedCache(settings.REDIS_URL)
+        except Exception as e:
+            logger.warning(f"Redis cache tier unavailable, using in-process cache only: {str(e)}")
+            return None
+    if backend == "local":
+        return LocalSharedCache()
+    return None
+
+class FusionResultCache:
+    """Two-tier cache for multi-modal fusion results keyed by file content"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, shared=None):
+        self.local = LRUTTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.shared = shared
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def make_key(digest: str, processor_name: str, features: Iterable[str]) -> str:
+        """Cache key from the file digest, the processor and the requested feature set"""
+        processor_id = processor_name.rsplit("/", 1)[-1]
+        return f"fusion:{digest}:{processor_id}:{','.join(sorted(features))}"
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.local.get(key)
+        if value is not None:
+            metrics.increment("fusion_cache.hits", 1)
+            metrics.increment("fusion_cache.local_hits", 1)
+            return copy.deepcopy(value)
+
+        if self.shared is not None:
+            try:
+                payload = await self.shared.get(key)
+            except Exception as e:
+                logger.warning(f"Shared fusion cache read failed: {str(e)}")
+                payload = None
+            if payload is not None:
+                value = json.loads(payload)
+                self.local.set(key, value)
+                metrics.increment("fusion_cache.hits", 1)
+                metrics.increment("fusion_cache.shared_hits", 1)
+                return copy.deepcopy(value)
+
+        metrics.increment("fusion_cache.misses", 1)
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        value = copy.deepcopy(value)
+        self.local.set(key, value)
+        metrics.set_gauge("fusion_cache.local_entries", len(self.local))
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, json.dumps(value, default=str), self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"Shared fusion cache write failed: {str(e)}")
@@ -0,0 +1,227 @@
+# app/services/risk_lexicon.py
+import bisect
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE_RUN = re.compile(r"\s+")
+
+def normalize_term(term: str) -> str:
+    return " ".join(term.lower().split())
+
+def load_lexicon(path: str) -> List[Tuple[str, str]]:
+    """(term, category) pairs from a lexicon file
+
+    One term or phrase per line, optionally followed by a tab and its
+    category; blank lines and lines starting with # are ignored.
+    """
+    terms: Dict[str, str] = {}
+    with open(path, "r", encoding="utf-8") as lexicon:
+        for line in lexicon:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            term, _, category = line.partition("\t")
+            term = normalize_term(term)
+            if term:
+                terms.setdefault(term, category.strip() or "uncategorized")
+    return list(terms.items())
+
+def decisive_matches(risk_keywords: Iterable[Any], categories: Iterable[str]) -> List[Any]:
+    """Risk keyword matches that should count against a document
+
+    Plain strings (results stored before the lexicon had categories) always count.
+    """
+    categories = set(categories)
+    return [match for match in risk_keywords if not isinstance(match, dict) or match.get("category") in categories]
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over a fixed set of terms
+
+    Built once; find_all reports every occurrence of every term in a single
+    pass over the text, whatever the number of terms. Matching ignores case,
+    treats any whitespace run as one space, and only accepts whole words.
+    """
+
+    def __init__(self, terms: Iterable[Tuple[str, str]]):
+        self.terms: List[Tuple[str, str]] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        for term, category in terms:
+            term = normalize_term(term)
+            if not term:
+                continue
+            state = 0
+            for char in term:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            if not self._output[state]:
+                self._output[state] = (len(self.terms),)
+                self.terms.append((term, category))
+        self._alphabet = frozenset(char for transitions in self._goto for char in transitions)
+        # Identifies the term set, so results computed against another lexicon can be told apart
+        self.version = hashlib.sha256(
+            "\n".join(f"{term}\t{category}" for term, category in sorted(self.terms)).encode("utf-8")
+        ).hexdigest()[:16]
+
+        # Failure links breadth first, folding each state's suffix matches into its output
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                fail = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = fail if fail != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def __len__(self):
+        return len(self.terms)
+
+    @staticmethod
+    def _normalize(text: str) -> Tuple[str, List[int], List[int]]:
+        """Lowercased text with whitespace runs collapsed, and breakpoints mapping its offsets back"""
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters lowercase to two; keep offsets aligned with the original
+            lowered = "".join(char if len(char.lower()) != 1 else char.lower() for char in text)
+        normalized_breaks, original_breaks = [0], [0]
+        parts, position, removed = [], 0, 0
+        for run in WHITESPACE_RUN.finditer(lowered):
+            start, end = run.span()
+            parts.append(lowered[position:start])
+            parts.append(" ")
+            position = end
+            if end - start > 1 or lowered[start] != " ":
+                removed += end - start - 1
+                normalized_breaks.append(end - removed)
+                original_breaks.append(end)
+        parts.append(lowered[position:])
+        return "".join(parts), normalized_breaks, original_breaks
+
+    def find_all(self, text: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Every whole-word occurrence of a term, with offsets into the original text"""
+        normalized, normalized_breaks, original_breaks = self._normalize(text)
+        goto, fail, output, alphabet, terms = self._goto, self._fail, self._output, self._alphabet, self.terms
+
+        def to_original(offset: int) -> int:
+            index = bisect.bisect_right(normalized_breaks, offset) - 1
+            return original_breaks[index] + offset - normalized_breaks[index]
+
+        matches = []
+        state = 0
+        length = len(normalized)
+        for position, char in enumerate(normalized):
+            if char not in alphabet:
+                state = 0
+                continue
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+            end = position + 1
+            if end < length and normalized[end].isalnum():
+                continue
+            for term_id in output[state]:
+                term, category = terms[term_id]
+                start = end - len(term)
+                if start > 0 and normalized[start - 1].isalnum():
+                    continue
+                original_start, original_end = to_original(start), to_original(end - 1) + 1
+                matches.append({
+                    "term": term,
+                    "category": category,
+                    "start": original_start,
+                    "end": original_end,
+                    "text": text[original_start:original_end]
+                })
+                if limit is not None and len(matches) >= limit:
+                    return matches
+        return matches
+
+class RiskLexicon:
+    """Risk-term automaton built from a lexicon file, rebuilt when the file changes
+
+    The file's modification time is checked at most every check_interval
+    seconds; a new automaton is built and swapped in, and a lexicon that
+    fails to load leaves the previous automaton in place.
+    """
+
+    def __init__(self, path: str, check_interval: float = 30.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._automaton: Optional[KeywordAutomaton] = None
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._loaded_at: Optional[float] = None
+        self._error: Optional[str] = None
+
+    def reload(self) -> KeywordAutomaton:
+        """Build the automaton from the lexicon file now"""
+        with self._lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+                started = time.perf_counter()
+                automaton = KeywordAutomaton(load_lexicon(self.path))
+                if not len(automaton) and self._automaton is not None:
+                    # Most likely a file caught mid-write; an empty lexicon would silently pass everything
+                    raise ValueError("lexicon file has no terms")
+            except Exception as e:
+                self._error = str(e)
+                if self._automaton is None:
+                    raise
+                logger.error(f"Keeping the previous risk lexicon; reloading {self.path} failed: {str(e)}")
+                return self._automaton
+            self._automaton, self._mtime, self._error = automaton, mtime, None
+            self._loaded_at = time.time()
+            self._checked_at = time.monotonic()
+            logger.info(f"Risk lexicon loaded: {len(automaton)} terms in {time.perf_counter() - started:.2f}s")
+            return automaton
+
+    def automaton(self) -> KeywordAutomaton:
+        """Current automaton, reloading it first if the lexicon file changed"""
+        if self._automaton is None:
+            return self.reload()
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            try:
+                changed = os.path.getmtime(self.path) != self._mtime
+            except OSError:
+                changed = False
+            if changed:
+                return self.reload()
+        return self._automaton
+
+    def find_all(self, text: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self.automaton().find_all(text, limit)
+
+    def version(self) -> str:
+        """Version of the current term set, reloading it first if the lexicon file changed"""
+        return self.automaton().version
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "terms": len(self._automaton) if self._automaton is not None else 0,
+            "version": self._automaton.version if self._automaton is not None else None,
+            "loaded_at": self._loaded_at,
+            "error": self._error
+        }
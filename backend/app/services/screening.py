@@ -0,0 +1,448 @@
+# app/services/screening.py
+import csv
+import logging
+import math
+import multiprocessing
+import os
+import re
+import threading
+import time
+import unicodedata
+import xml.etree.ElementTree as ElementTree
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+# Legal forms and honorifics say nothing about who a party is
+NAME_STOPWORDS = frozenset({
+    "llc", "inc", "incorporated", "ltd", "limited", "corp", "corporation", "co", "company", "plc",
+    "lp", "llp", "gmbh", "sa", "srl", "bv", "the", "and", "of", "mr", "mrs", "ms", "dr"
+})
+# Generic business words; dropped as long as a more distinctive word remains
+GENERIC_BUSINESS_WORDS = frozenset({
+    "trading", "traders", "trade", "holding", "holdings", "group", "international", "global",
+    "industries", "industry", "consulting", "consultants", "logistics", "services", "service",
+    "enterprises", "enterprise", "exchange", "import", "imports", "export", "exports", "shipping",
+    "solutions", "partners", "management", "investment", "investments", "ventures", "capital",
+    "associates", "systems", "technologies", "technology"
+})
+SDN_NULL = "-0-"
+PROBE_EXTRA = 2
+# Shorter single words match inside longer names too easily
+LONE_WORD_MIN_LENGTH = 6
+
+def normalize_name(name: str) -> str:
+    """Comparable form of a person or business name
+
+    Accents, punctuation, legal forms and single-letter initials are dropped,
+    as are generic business words unless nothing else is left, and the
+    remaining words sorted, so "SMITH, John A." and "John Smith" normalize
+    alike, and so do "Golden Crescent Exchange LLC" and "Golden Crescent".
+    """
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    ascii_name = "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+    tokens = [
+        token for token in NON_ALPHANUMERIC.sub(" ", ascii_name).split()
+        if len(token) > 1 and token not in NAME_STOPWORDS
+    ]
+    distinctive = [token for token in tokens if token not in GENERIC_BUSINESS_WORDS]
+    return " ".join(sorted(distinctive or tokens))
+
+def name_trigrams(normalized: str) -> set:
+    padded = f" {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def name_similarity(query: str, listed: str) -> float:
+    """Similarity of two normalized names, 0 to 1
+
+    Words are also paired up by closest spelling, so a misspelled first
+    letter that changes the sorted word order still scores high. Extra words
+    on the longer name (a middle name, a second surname, a misspelled
+    "Holdings") are ignored when the shorter name has at least two words or
+    one of LONE_WORD_MIN_LENGTH letters.
+    """
+    score = SequenceMatcher(None, query, listed).ratio()
+    shorter, longer = sorted((query.split(), listed.split()), key=len)
+    if len(shorter) < 2 and (not shorter or len(shorter[0]) < LONE_WORD_MIN_LENGTH):
+        return score
+    remaining, aligned = list(longer), []
+    for token in shorter:
+        closest = max(remaining, key=lambda other: SequenceMatcher(None, token, other).ratio())
+        remaining.remove(closest)
+        aligned.append(closest)
+    return max(score, SequenceMatcher(None, " ".join(shorter), " ".join(aligned)).ratio())
+
+def applicant_names(personal_data: Dict[str, Any], business_data: Dict[str, Any]) -> Dict[str, str]:
+    """Names screened for an application: the owner and the business"""
+    personal_data, business_data = personal_data or {}, business_data or {}
+    owner = personal_data.get("owner_name") or " ".join(
+        str(personal_data.get(key) or "").strip() for key in ("firstName", "lastName")
+    )
+    business = business_data.get("businessName") or business_data.get("business_name") or ""
+    return {field: name.strip() for field, name in (("owner_name", owner), ("businessName", str(business))) if name.strip()}
+
+def _sdn_programs(value: str) -> List[str]:
+    # SDN CSV lists several programs as "SDGT] [IRGC"
+    return [program.strip(" []") for program in value.split("] [") if program.strip(" []")]
+
+def _sdn_value(value: Optional[str]) -> str:
+    value = (value or "").strip()
+    return "" if value == SDN_NULL else value
+
+def _load_csv(path: str, alias_path: Optional[str]) -> List[Dict[str, Any]]:
+    entries: Dict[str, Dict[str, Any]] = {}
+    with open(path, "r", encoding="utf-8-sig", newline="") as watchlist:
+        rows = csv.reader(watchlist)
+        first = next(rows, None)
+        if first is None:
+            return []
+        if first[0].strip().isdigit():
+            # OFAC SDN layout, no header: ent_num, SDN_Name, SDN_Type, Program, ...
+            for row in [first, *rows]:
+                if len(row) < 2 or not row[0].strip().isdigit():
+                    continue
+                entries[row[0].strip()] = {
+                    "uid": row[0].strip(),
+                    "name": row[1].strip(),
+                    "type": _sdn_value(row[2]) if len(row) > 2 else "",
+                    "programs": _sdn_programs(_sdn_value(row[3])) if len(row) > 3 else [],
+                    "aliases": []
+                }
+        else:
+            # Own lists: a header with uid, name, and optionally type, programs and aliases (; separated)
+            header = [column.strip().lower() for column in first]
+            if "name" not in header:
+                raise ValueError(f"{path}: expected an SDN layout or a header with a name column")
+            for number, row in enumerate(rows, start=1):
+                record = dict(zip(header, (value.strip() for value in row)))
+                if not record.get("name"):
+                    continue
+                uid = record.get("uid") or record.get("id") or str(number)
+                entries[uid] = {
+                    "uid": uid,
+                    "name": record["name"],
+                    "type": record.get("type", ""),
+                    "programs": [p.strip() for p in re.split(r"[;|]", record.get("programs", "")) if p.strip()],
+                    "aliases": [a.strip() for a in record.get("aliases", "").split(";") if a.strip()]
+                }
+    if alias_path:
+        # OFAC alt.csv: ent_num, alt_num, alt_type, alt_name, alt_remarks
+        with open(alias_path, "r", encoding="utf-8-sig", newline="") as aliases:
+            for row in csv.reader(aliases):
+                if len(row) > 3 and row[0].strip() in entries and _sdn_value(row[3]):
+                    entries[row[0].strip()]["aliases"].append(row[3].strip())
+    return list(entries.values())
+
+def _load_xml(path: str) -> List[Dict[str, Any]]:
+    """sdnEntry records of an OFAC SDN XML file, whatever its namespace"""
+
+    def local(tag: str) -> str:
+        return tag.rsplit("}", 1)[-1]
+
+    def person_name(element) -> str:
+        parts = {local(child.tag): (child.text or "").strip() for child in element}
+        last, first = parts.get("lastName", ""), parts.get("firstName", "")
+        return f"{last}, {first}" if last and first else last or first
+
+    entries = []
+    for _, element in ElementTree.iterparse(path):
+        if local(element.tag) != "sdnEntry":
+            continue
+        fields = {local(child.tag): child for child in element}
+        entries.append({
+            "uid": (fields["uid"].text or "").strip() if "uid" in fields else str(len(entries) + 1),
+            "name": person_name(element),
+            "type": (fields["sdnType"].text or "").strip() if "sdnType" in fields else "",
+            "programs": [
+                (program.text or "").strip() for program in fields.get("programList", [])
+                if (program.text or "").strip()
+            ],
+            "aliases": [person_name(aka) for aka in fields.get("akaList", [])]
+        })
+        element.clear()
+    return entries
+
+def load_watchlist(path: str, alias_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Watchlist entries (uid, name, type, programs, aliases) from an SDN-style CSV or XML file"""
+    if path.lower().endswith(".xml"):
+        return _load_xml(path)
+    return _load_csv(path, alias_path)
+
+class NameIndex:
+    """Character-trigram index over every name and alias on a watchlist
+
+    Each trigram maps to a compact array of the names containing it. A query
+    only reads the postings of its rarest trigrams (prefix filtering: a name
+    found in too few of them cannot reach candidate_threshold trigram Dice
+    similarity), checks the trigram overlap of those candidates, and scores
+    the survivors with name_similarity.
+    """
+
+    def __init__(self, entries: Iterable[Dict[str, Any]], candidate_threshold: float = 0.5):
+        self.candidate_threshold = candidate_threshold
+        self.entries: List[Dict[str, Any]] = []
+        self._names: List[str] = []
+        self._name_entry = array("I")
+        self._name_grams: List[Tuple[int, ...]] = []
+        self._gram_ids: Dict[str, int] = {}
+        self._postings: List[array] = []
+
+        for entry in entries:
+            entry_id = len(self.entries)
+            seen = set()
+            for name in [entry["name"], *entry.get("aliases", ())]:
+                normalized = normalize_name(name)
+                if not normalized or normalized in seen:
+                    continue
+                seen.add(normalized)
+                name_id = len(self._names)
+                grams = []
+                for gram in name_trigrams(normalized):
+                    gram_id = self._gram_ids.get(gram)
+                    if gram_id is None:
+                        gram_id = self._gram_ids[gram] = len(self._postings)
+                        self._postings.append(array("I"))
+                    self._postings[gram_id].append(name_id)
+                    grams.append(gram_id)
+                self._names.append(normalized)
+                self._name_entry.append(entry_id)
+                self._name_grams.append(tuple(grams))
+            if seen:
+                self.entries.append(entry)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def names(self) -> int:
+        return len(self._names)
+
+    def search(self, name: str, threshold: float, limit: int = 5) -> List[Dict[str, Any]]:
+        """Watchlist entries whose name or an alias scores at least threshold, best first"""
+        normalized = normalize_name(name)
+        if not normalized:
+            return []
+        grams = name_trigrams(normalized)
+        size = len(grams)
+        t = self.candidate_threshold
+        min_overlap = max(1, math.ceil(t * size / (2 - t) - 1e-9))
+        min_size, max_size = t * size / (2 - t), size * (2 - t) / t
+
+        gram_ids, postings = self._gram_ids, self._postings
+        known = [gram_ids[gram] for gram in grams if gram in gram_ids]
+        query = set(known)
+        # Trigrams missing from the index are the rarest of all and contribute no candidates.
+        # Reading PROBE_EXTRA postings past the prefix lets candidates be required to appear
+        # in that many more of them, which discards most names sharing one common trigram.
+        prefix = len(known) - min_overlap + 1
+        if prefix <= 0:
+            return []
+        probed = min(len(known), prefix + PROBE_EXTRA)
+        required = probed - prefix + 1
+        known.sort(key=lambda gram_id: len(postings[gram_id]))
+        counts = Counter()
+        for gram_id in known[:probed]:
+            counts.update(postings[gram_id])
+        candidates = [name_id for name_id, count in counts.items() if count >= required]
+
+        best: Dict[int, Tuple[float, int]] = {}
+        for name_id in candidates:
+            name_grams = self._name_grams[name_id]
+            if not min_size <= len(name_grams) <= max_size:
+                continue
+            overlap = len(query.intersection(name_grams))
+            if 2 * overlap < t * (size + len(name_grams)):
+                continue
+            score = name_similarity(normalized, self._names[name_id])
+            if score < threshold:
+                continue
+            entry_id = self._name_entry[name_id]
+            if score > best.get(entry_id, (0.0, 0))[0]:
+                best[entry_id] = (score, name_id)
+
+        matches = []
+        for entry_id, (score, name_id) in sorted(best.items(), key=lambda item: item[1][0], reverse=True)[:limit]:
+            entry = self.entries[entry_id]
+            matches.append({
+                "uid": entry["uid"],
+                "name": entry["name"],
+                "type": entry.get("type", ""),
+                "programs": entry.get("programs", []),
+                "matched_name": self._names[name_id],
+                "score": round(score, 3)
+            })
+        return matches
+
+    def screen(self, names: Dict[str, str], threshold: float, limit: int = 5) -> Dict[str, Any]:
+        """Screen named fields (e.g. owner_name, businessName); any match means potential_match"""
+        matches = []
+        for field, name in names.items():
+            for match in self.search(name, threshold, limit):
+                match["field"] = field
+                matches.append(match)
+        matches.sort(key=lambda match: match["score"], reverse=True)
+        return {
+            "status": "potential_match" if matches else "clear",
+            "matches": matches,
+            "screened_fields": list(names)
+        }
+
+_worker_index: Optional[NameIndex] = None
+
+def _init_rescreen_worker(index: NameIndex):
+    global _worker_index
+    _worker_index = index
+
+def _rescreen_chunk(index: Optional[NameIndex], records: List[Tuple[str, Dict[str, str]]], threshold: float, limit: int):
+    """Screen a chunk of (record id, names); only records with matches are returned"""
+    index = index or _worker_index
+    seen: Dict[str, List[Dict[str, Any]]] = {}
+    hits, screened = [], 0
+    for record_id, names in records:
+        result_matches = []
+        for field, name in names.items():
+            screened += 1
+            # Portfolios repeat names; screen each distinct one once per chunk
+            if name not in seen:
+                seen[name] = index.search(name, threshold, limit)
+            result_matches.extend(dict(match, field=field) for match in seen[name])
+        if result_matches:
+            result_matches.sort(key=lambda match: match["score"], reverse=True)
+            hits.append((record_id, {"status": "potential_match", "matches": result_matches, "screened_fields": list(names)}))
+    return hits, screened
+
+def rescreen(
+    index: NameIndex,
+    records: List[Tuple[str, Dict[str, str]]],
+    threshold: float,
+    limit: int = 5,
+    workers: int = 1,
+    chunk_size: int = 5000
+) -> Dict[str, Any]:
+    """Screen every record against one index, in chunks spread over worker processes
+
+    Each worker receives the index once, when it starts. Returns the records
+    with matches and throughput figures.
+    """
+    started = time.perf_counter()
+    chunks = [records[i:i + chunk_size] for i in range(0, len(records), chunk_size)]
+    hits: List[Tuple[str, Dict[str, Any]]] = []
+    screened = 0
+    if workers <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            chunk_hits, chunk_screened = _rescreen_chunk(index, chunk, threshold, limit)
+            hits.extend(chunk_hits)
+            screened += chunk_screened
+    else:
+        # Spawned, not forked: the server process has threads that may hold locks
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_rescreen_worker,
+            initargs=(index,)
+        ) as pool:
+            futures = [pool.submit(_rescreen_chunk, None, chunk, threshold, limit) for chunk in chunks]
+            for future in futures:
+                chunk_hits, chunk_screened = future.result()
+                hits.extend(chunk_hits)
+                screened += chunk_screened
+    seconds = time.perf_counter() - started
+    return {
+        "records": len(records),
+        "names_screened": screened,
+        "potential_matches": len(hits),
+        "hits": hits,
+        "seconds": round(seconds, 3),
+        "names_per_second": round(screened / seconds) if seconds > 0 else None,
+        "workers": workers if len(chunks) > 1 else 1
+    }
+
+class Watchlist:
+    """Name index built from a watchlist file, rebuilt when the file changes
+
+    Works like the risk lexicon: the modification times are checked at most
+    every check_interval seconds and a list that fails to load leaves the
+    previous index in place. version increases with every successful load.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        alias_path: Optional[str] = None,
+        check_interval: float = 60.0,
+        candidate_threshold: float = 0.5
+    ):
+        self.path = path
+        self.alias_path = alias_path
+        self.check_interval = check_interval
+        self.candidate_threshold = candidate_threshold
+        self.version = 0
+        self._lock = threading.Lock()
+        self._index: Optional[NameIndex] = None
+        self._mtimes: Optional[Tuple[float, ...]] = None
+        self._checked_at = 0.0
+        self._loaded_at: Optional[float] = None
+        self._error: Optional[str] = None
+
+    def _current_mtimes(self) -> Tuple[float, ...]:
+        return tuple(os.path.getmtime(path) for path in (self.path, self.alias_path) if path)
+
+    def reload(self) -> NameIndex:
+        """Build the index from the watchlist file now"""
+        with self._lock:
+            try:
+                mtimes = self._current_mtimes()
+                started = time.perf_counter()
+                index = NameIndex(load_watchlist(self.path, self.alias_path), self.candidate_threshold)
+                if not len(index) and self._index is not None:
+                    # An empty list would clear every applicant
+                    raise ValueError("watchlist file has no entries")
+            except Exception as e:
+                self._error = str(e)
+                if self._index is None:
+                    raise
+                logger.error(f"Keeping the previous watchlist; reloading {self.path} failed: {str(e)}")
+                return self._index
+            self._index, self._mtimes, self._error = index, mtimes, None
+            self.version += 1
+            self._loaded_at = time.time()
+            self._checked_at = time.monotonic()
+            logger.info(
+                f"Watchlist loaded: {len(index)} entries, {index.names} names in {time.perf_counter() - started:.2f}s"
+            )
+            return index
+
+    def index(self) -> NameIndex:
+        """Current index, reloading it first if the watchlist changed"""
+        if self._index is None:
+            return self.reload()
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            try:
+                changed = self._current_mtimes() != self._mtimes
+            except OSError:
+                changed = False
+            if changed:
+                return self.reload()
+        return self._index
+
+    def screen(self, names: Dict[str, str], threshold: float, limit: int = 5) -> Dict[str, Any]:
+        result = self.index().screen(names, threshold, limit)
+        result["list_version"] = self.version
+        return result
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "entries": len(self._index) if self._index is not None else 0,
+            "names": self._index.names if self._index is not None else 0,
+            "version": self.version,
+            "loaded_at": self._loaded_at,
+            "error": self._error
+        }
@@ -0,0 +1,123 @@
+# app/services/uploads.py
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+import aiofiles
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class UploadTooLargeError(Exception):
+    """Raised as soon as a streamed upload crosses the size limit"""
+
+    def __init__(self, max_size: int):
+        super().__init__(f"File too large. Max: {max_size}")
+        self.max_size = max_size
+
+class RequestBodyTooLargeError(HTTPException):
+    """Raised from the receive channel once a request body crosses its limit"""
+
+    def __init__(self, max_size: int):
+        super().__init__(status_code=413, detail=f"Request too large. Max: {max_size}")
+        self.max_size = max_size
+
+class RequestBodyLimitMiddleware:
+    """Count request body bytes as they are received and reject oversized bodies with 413
+
+    Starlette spools multipart bodies to a temporary file before any handler
+    runs, so the limit has to be enforced here. `path_limits` overrides the
+    default for routes that take several files in one body. Chunked requests, which have no
+    Content-Length, are cut off at the first message that crosses the limit.
+    """
+
+    def __init__(self, app, max_body_size: int, path_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.path_limits.get(scope["path"].rstrip("/"), self.max_body_size)
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            await self._reject(scope, receive, send, limit)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise RequestBodyTooLargeError(limit)
+            return message
+
+        async def tracked_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except RequestBodyTooLargeError:
+            # Normally turned into a 413 by the exception middleware further in
+            if response_started:
+                raise
+            await self._reject(scope, receive, send, limit)
+
+    @staticmethod
+    async def _reject(scope, receive, send, limit: int):
+        response = JSONResponse(status_code=413, content={"detail": f"Request too large. Max: {limit}"})
+        await response(scope, receive, send)
+
+@dataclass
+class StoredUpload:
+    path: str
+    size: int
+    sha256: str
+
+async def stream_upload_to_disk(
+    file: UploadFile,
+    destination: str,
+    max_size: int = None,
+    chunk_size: int = None
+) -> StoredUpload:
+    """Stream an upload to disk in chunks, hashing and size-checking on the fly
+
+    Only one chunk is held in memory at a time. If the upload crosses `max_size`
+    the partial file is removed and UploadTooLargeError is raised. The request
+    body itself is bounded earlier, by RequestBodyLimitMiddleware.
+    """
+    max_size = max_size or settings.MAX_FILE_SIZE
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(destination, "wb") as buffer:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLargeError(max_size)
+                digest.update(chunk)
+                await buffer.write(chunk)
+    except BaseException:
+        if os.path.exists(destination):
+            os.remove(destination)
+        raise
+
+    return StoredUpload(path=destination, size=size, sha256=digest.hexdigest())
@@ -0,0 +1,103 @@
+# app/services/vision_batcher.py
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, List, Optional
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class _PendingImage:
+    __slots__ = ("request", "size", "future", "enqueued_at")
+
+    def __init__(self, request: Any, size: int, future: asyncio.Future):
+        self.request = request
+        self.size = size
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+class VisionBatcher:
+    """Collects Vision annotate requests from concurrent uploads into batch calls
+
+    Requests are held for at most `max_wait_ms`, and a batch is sent early once it
+    reaches `max_batch_size` images or `max_batch_bytes` of image content. Each
+    response is routed back to the coroutine that submitted the matching request.
+    """
+
+    def __init__(
+        self,
+        send_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 16,
+        max_batch_bytes: int = 10 * 1024 * 1024,
+        max_wait_ms: float = 20
+    ):
+        self.send_batch = send_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_batch_bytes = max_batch_bytes
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[_PendingImage] = []
+        self._pending_bytes = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight = set()
+
+    async def annotate(self, request: Any, size: int) -> Any:
+        """Queue one annotate request and wait for its response"""
+        loop = asyncio.get_running_loop()
+
+        # Flush first if this image would push the open batch over the byte cap
+        if self._pending and self._pending_bytes + size > self.max_batch_bytes:
+            self._flush()
+
+        item = _PendingImage(request, size, loop.create_future())
+        self._pending.append(item)
+        self._pending_bytes += size
+
+        if len(self._pending) >= self.max_batch_size or self._pending_bytes >= self.max_batch_bytes:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await item.future
+
+    def _flush(self):
+        """Dispatch the open batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch = self._pending
+        self._pending = []
+        self._pending_bytes = 0
+
+        task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch: List[_PendingImage]):
+        dispatched_at = time.perf_counter()
+        metrics.increment("vision_batch.batches")
+        metrics.increment("vision_batch.images", len(batch))
+        metrics.observe("vision_batch.size", len(batch))
+        metrics.observe("vision_batch.fill_rate", len(batch) / self.max_batch_size)
+        metrics.observe("vision_batch.bytes", sum(item.size for item in batch))
+        for item in batch:
+            metrics.observe("vision_batch.queue_wait_seconds", dispatched_at - item.enqueued_at)
+
+        try:
+            responses = await self.send_batch([item.request for item in batch])
+            if len(responses) != len(batch):
+                raise Exception(f"Vision batch returned {len(responses)} responses for {len(batch)} images")
+        except Exception as e:
+            logger.error(f"Vision batch of {len(batch)} images failed: {str(e)}")
+            metrics.increment("vision_batch.failures")
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+
+        metrics.observe("vision_batch.call_seconds", time.perf_counter() - dispatched_at)
+        for item, response in zip(batch, responses):
+            if not item.future.done():
+                item.future.set_result(response)
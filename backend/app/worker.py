@@ -0,0 +1,35 @@
+# app/worker.py
+"""
+Standalone document job worker.
+
+Runs the document processing worker pool without the HTTP API so processing can
+be scaled separately from API workers. Use with JOB_QUEUE_BACKEND=redis:
+    python -m app.worker
+"""
+import asyncio
+import logging
+from .core.config import settings
+from .services.jobs import job_manager
+from .services.registry import services
+
+logging.basicConfig(
+    level=getattr(logging, settings.LOG_LEVEL),
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+logger = logging.getLogger(__name__)
+
+async def run_workers():
+    if settings.JOB_QUEUE_BACKEND == "memory":
+        logger.warning("JOB_QUEUE_BACKEND=memory: this worker only sees jobs queued in its own process")
+    job_manager.start()
+    if settings.SERVICE_WARMUP_ENABLED:
+        services.start_warmup()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await job_manager.stop()
+        await services.shutdown()
+
+if __name__ == "__main__":
+    asyncio.run(run_workers())
@@ -0,0 +1,144 @@
+# benchmarks/docai_extraction.py
+"""
+Microbenchmark for Document AI response extraction on a large response.
+
+Builds a synthetic 50-page Document AI response (text, form fields and
+entities) and compares:
+  - legacy: the per-field proto-plus walk that process_document_with_document_ai
+    used, re-reading document.text for every form field
+  - single-pass: app.services.docai_extraction.extract_document
+
+Uses real google-cloud-documentai messages when the library is installed;
+otherwise falls back to plain objects, which only shows the algorithmic part.
+
+Run from the backend directory:
+    python -m benchmarks.docai_extraction [--pages 50] [--fields 40] [--repeat 5]
+"""
+import argparse
+import time
+from types import SimpleNamespace
+
+from app.services.docai_extraction import extract_document
+
+
+def build_document(pages: int, fields_per_page: int, entities: int):
+    lines, spans = [], []
+    offset = 0
+    for page in range(pages):
+        page_spans = []
+        for field in range(fields_per_page):
+            name, value = f"Field {page}-{field}:", f"value {page * fields_per_page + field} " + "x" * 30
+            line = f"{name} {value}\n"
+            page_spans.append(((offset, offset + len(name)), (offset + len(name) + 1, offset + len(line) - 1)))
+            lines.append(line)
+            offset += len(line)
+        lines.append("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20 + "\n")
+        offset += len(lines[-1])
+        spans.append(page_spans)
+    text = "".join(lines)
+
+    try:
+        from google.cloud import documentai
+    except ImportError:
+        documentai = None
+
+    if documentai is None:
+        anchor = lambda start, end: SimpleNamespace(text_segments=[SimpleNamespace(start_index=start, end_index=end)], content="")
+        layout = lambda start, end: SimpleNamespace(text_anchor=anchor(start, end), confidence=0.9)
+        return "plain objects", SimpleNamespace(
+            text=text,
+            pages=[
+                SimpleNamespace(form_fields=[
+                    SimpleNamespace(field_name=layout(*name), field_value=layout(*value)) for name, value in page_spans
+                ])
+                for page_spans in spans
+            ],
+            entities=[
+                SimpleNamespace(type_="field", mention_text=f"entity {i}", confidence=0.8, normalized_value=None)
+                for i in range(entities)
+            ]
+        )
+
+    anchor = lambda start, end: documentai.Document.TextAnchor(
+        text_segments=[documentai.Document.TextAnchor.TextSegment(start_index=start, end_index=end)]
+    )
+    layout = lambda start, end: documentai.Document.Page.Layout(text_anchor=anchor(start, end), confidence=0.9)
+    return "google-cloud-documentai", documentai.Document(
+        text=text,
+        pages=[
+            documentai.Document.Page(form_fields=[
+                documentai.Document.Page.FormField(field_name=layout(*name), field_value=layout(*value))
+                for name, value in page_spans
+            ])
+            for page_spans in spans
+        ],
+        entities=[
+            documentai.Document.Entity(type_="field", mention_text=f"entity {i}", confidence=0.8)
+            for i in range(entities)
+        ]
+    )
+
+
+def legacy_extract(document):
+    """The extraction loop as it was before the single-pass layer"""
+    extracted = {"text": document.text[:2000], "entities": [], "form_fields": [], "pages": len(document.pages)}
+    for entity in document.entities:
+        extracted["entities"].append({
+            "type": entity.type_,
+            "mention_text": entity.mention_text,
+            "confidence": entity.confidence,
+            "normalized_value": entity.normalized_value.text if entity.normalized_value else None
+        })
+    for page in document.pages:
+        for form_field in page.form_fields:
+            field_name = ""
+            field_value = ""
+            if form_field.field_name and form_field.field_name.text_anchor:
+                field_name = document.text[
+                    form_field.field_name.text_anchor.text_segments[0].start_index:
+                    form_field.field_name.text_anchor.text_segments[0].end_index
+                ].strip()
+            if form_field.field_value and form_field.field_value.text_anchor:
+                field_value = document.text[
+                    form_field.field_value.text_anchor.text_segments[0].start_index:
+                    form_field.field_value.text_anchor.text_segments[0].end_index
+                ].strip()
+            if field_name and field_value:
+                extracted["form_fields"].append({
+                    "name": field_name,
+                    "value": field_value,
+                    "confidence": form_field.field_value.confidence if form_field.field_value else 0.0
+                })
+    return extracted
+
+
+def best_of(repeat: int, func, *args):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--fields", type=int, default=40, help="form fields per page")
+    parser.add_argument("--entities", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    kind, document = build_document(args.pages, args.fields, args.entities)
+    legacy_seconds, legacy = best_of(args.repeat, legacy_extract, document)
+    single_seconds, extracted = best_of(args.repeat, extract_document, document)
+
+    assert [(f["name"], f["value"]) for f in extracted.form_fields] == [(f["name"], f["value"]) for f in legacy["form_fields"]]
+    print(f"Document AI extraction, {args.pages} pages x {args.fields} form fields, {args.entities} entities ({kind})")
+    print(f"  text length:  {len(extracted.text):,} chars")
+    print(f"  legacy:       {legacy_seconds * 1000:9.2f}ms")
+    print(f"  single-pass:  {single_seconds * 1000:9.2f}ms  ({legacy_seconds / single_seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
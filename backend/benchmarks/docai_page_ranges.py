@@ -0,0 +1,101 @@
+# benchmarks/docai_page_ranges.py
+"""
+Latency of Document AI on a long PDF, sent whole versus split into page ranges.
+
+Runs against the mock provider (no network or credentials). The mock Document
+AI client is wrapped so each call takes a fixed overhead plus a per-page cost,
+which is how synchronous processing scales on long bank statements. Compares:
+  - whole: one process_document call for the full PDF
+  - ranges: DOCUMENT_AI_PAGES_PER_RANGE-page ranges processed concurrently
+and prints the split cost and how the ranged latency compares with the
+slowest single range.
+
+Needs pypdf. Run from the backend directory:
+    python -m benchmarks.docai_page_ranges [--pages 60] [--per-range 10] [--seconds-per-page 0.1]
+"""
+import argparse
+import asyncio
+import io
+import time
+
+from app.core.config import settings
+
+
+def build_pdf(pages: int) -> bytes:
+    from pypdf import PdfWriter
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+class PagedLatencyClient:
+    """Mock Document AI client whose latency grows with the pages in the request"""
+
+    def __init__(self, client, overhead: float, seconds_per_page: float):
+        self.client = client
+        self.overhead = overhead
+        self.seconds_per_page = seconds_per_page
+
+    def process_document(self, request=None, timeout=None, **kwargs):
+        from pypdf import PdfReader
+        pages = len(PdfReader(io.BytesIO(request.raw_document.content)).pages)
+        time.sleep(self.overhead + pages * self.seconds_per_page)
+        return self.client.process_document(request=request, timeout=timeout, **kwargs)
+
+
+async def timed(services, content: bytes, repeat: int):
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await services.process_document_with_document_ai(content, "application/pdf")
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--per-range", type=int, default=settings.DOCUMENT_AI_PAGES_PER_RANGE)
+    parser.add_argument("--overhead", type=float, default=0.3, help="fixed seconds per call")
+    parser.add_argument("--seconds-per-page", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    settings.AI_PROVIDER = "mock"
+    settings.AI_CASSETTE_MODE = "off"
+    settings.MOCK_AI_LATENCY_SECONDS = {"document_ai": [0.0, 0.0]}
+    settings.QUOTA_GOVERNOR_ENABLED = False
+    settings.DOCUMENT_AI_PAGES_PER_RANGE = args.per_range
+    settings.AI_RPC_TIMEOUT_SECONDS = {"document_ai": 600.0}
+
+    from app.services.google_ai import GoogleAIServices
+    from app.services.pdf_pages import split_pdf_pages
+
+    services = GoogleAIServices()
+    services.document_ai_client = PagedLatencyClient(services.document_ai_client, args.overhead, args.seconds_per_page)
+    content = build_pdf(args.pages)
+
+    started = time.perf_counter()
+    ranges = split_pdf_pages(content, 0, args.per_range)
+    split_seconds = time.perf_counter() - started
+
+    settings.DOCUMENT_AI_SPLIT_PAGE_THRESHOLD = args.pages
+    whole_seconds, _ = await timed(services, content, args.repeat)
+    settings.DOCUMENT_AI_SPLIT_PAGE_THRESHOLD = args.per_range
+    ranged_seconds, result = await timed(services, content, args.repeat)
+    slowest_range = args.overhead + min(args.per_range, args.pages) * args.seconds_per_page
+
+    print(f"Document AI, {args.pages}-page PDF ({len(content):,} bytes), {len(ranges)} ranges of {args.per_range} pages")
+    print(f"  split:          {split_seconds * 1000:9.1f}ms")
+    print(f"  whole:          {whole_seconds * 1000:9.1f}ms")
+    print(f"  page ranges:    {ranged_seconds * 1000:9.1f}ms  ({whole_seconds / ranged_seconds:.1f}x)")
+    print(f"  slowest range:  {slowest_range * 1000:9.1f}ms  (modelled)")
+    print(f"  merged: {result['pages']} pages, {len(result.get('page_ranges', []))} ranges, {len(result['form_fields'])} form fields")
+    await services.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
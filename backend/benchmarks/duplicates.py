@@ -0,0 +1,109 @@
+# benchmarks/duplicates.py
+"""
+Repeat-applicant detection against a large portfolio.
+
+Bulk-builds the duplicate index (app.services.duplicates) from synthetic
+stored applications, then times submit-time checks (p50 / p99) for:
+  - repeats: a stored applicant reapplying with a reworded business name
+    but the same EIN
+  - lookalikes: a slightly different business name at the same address,
+    with new EIN, bank account, phone and email
+  - new applicants, who should come back clear
+and reports how many of each were flagged, plus the cost of adding one
+application incrementally.
+
+Run from the backend directory:
+    python -m benchmarks.duplicates [--applications 1000000] [--probes 1000]
+"""
+import argparse
+import random
+import resource
+import statistics
+import time
+
+from app.services.duplicates import DuplicateIndex, application_keys
+
+WORDS = [
+    "sunny", "side", "blue", "bottle", "golden", "gate", "maple", "river", "stone", "harbor", "cedar", "lucky",
+    "north", "star", "urban", "green", "leaf", "iron", "silver", "oak", "pine", "red", "rock", "bright",
+    "coastal", "prairie", "summit", "velvet", "copper", "willow", "fox", "owl", "bay", "hill", "meadow", "crown"
+]
+KINDS = ["Bakery", "Cafe", "Auto Repair", "Salon", "Hardware", "Florist", "Pizzeria", "Boutique", "Dental", "Fitness"]
+STREETS = ["Main", "Oak", "Pine", "Maple", "Cedar", "Elm", "Washington", "Lake", "Hill", "Park", "Sunset", "Ridge"]
+STREET_TYPES = ["Street", "Avenue", "Road", "Boulevard", "Drive", "Lane"]
+CITIES = [("Austin", "TX"), ("Denver", "CO"), ("Portland", "OR"), ("Columbus", "OH"), ("Raleigh", "NC"), ("Tampa", "FL")]
+
+
+def application(number: int):
+    rng = random.Random(number)
+    city, state = rng.choice(CITIES)
+    name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {rng.choice(KINDS)} LLC"
+    address = f"{rng.randint(1, 9999)} {rng.choice(STREETS)} {rng.choice(STREET_TYPES)}, {city} {state} {rng.randint(10000, 99999)}"
+    personal_data = {
+        "firstName": "Owner",
+        "lastName": str(number),
+        "email": f"owner{number}@example.com",
+        "phone": f"{rng.randint(200, 999)}-{rng.randint(200, 999)}-{number % 10000:04d}"
+    }
+    business_data = {
+        "businessName": name,
+        "ein": f"{number // 10000000 % 100:02d}-{number % 10000000:07d}",
+        "routingNumber": "021000021",
+        "accountNumber": f"{number:012d}",
+        "businessAddress": address
+    }
+    return f"APP-{number:08d}", "DENIED" if number % 5 == 0 else "APPROVED", personal_data, business_data
+
+
+def reworded(name: str) -> str:
+    return name.replace(" LLC", " & Co").replace("Bakery", "Bake Shop").replace("Auto Repair", "Auto Service")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, default=1000000)
+    parser.add_argument("--probes", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    index = DuplicateIndex()
+    started = time.perf_counter()
+    report = index.rebuild(application(number) for number in range(args.applications))
+    build_seconds = time.perf_counter() - started
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    rng = random.Random(args.seed)
+    probes = {"repeat": [], "lookalike": [], "new": []}
+    for _ in range(args.probes):
+        _, _, personal_data, business_data = application(rng.randrange(args.applications))
+        probes["repeat"].append(({"email": "someone@else.com"}, dict(business_data, businessName=reworded(business_data["businessName"]), accountNumber="")))
+        probes["lookalike"].append(({}, {"businessName": reworded(business_data["businessName"]), "businessAddress": business_data["businessAddress"]}))
+        _, _, personal_data, business_data = application(args.applications + rng.randrange(10 ** 9))
+        probes["new"].append((personal_data, business_data))
+
+    print(f"{report['applications']:,} stored applications")
+    print(f"  bulk rebuild:   {build_seconds:8.1f}s  ({report['applications'] / build_seconds:,.0f} applications/s, peak RSS {peak_mb:,.0f} MB)")
+    for label, cases in probes.items():
+        latencies, flagged = [], 0
+        for personal_data, business_data in cases:
+            started = time.perf_counter()
+            result = index.check(application_keys(personal_data, business_data))
+            latencies.append((time.perf_counter() - started) * 1000)
+            flagged += result["status"] == "likely_duplicate"
+        latencies.sort()
+        print(
+            f"  {label:<10}      p50 {statistics.median(latencies):.3f}ms  p99 {latencies[int(len(latencies) * 0.99)]:.3f}ms"
+            f"  flagged {flagged}/{len(cases)}"
+        )
+
+    latencies = []
+    for number in range(args.probes):
+        application_id, status, personal_data, business_data = application(args.applications + number)
+        started = time.perf_counter()
+        index.add(application_id, status, application_keys(personal_data, business_data))
+        latencies.append((time.perf_counter() - started) * 1000)
+    print(f"  incremental add p50 {statistics.median(latencies):.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
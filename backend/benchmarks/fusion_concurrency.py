@@ -0,0 +1,138 @@
+# benchmarks/fusion_concurrency.py
+"""
+Benchmark for the multi-modal fusion fan-out.
+
+Replaces the Google clients with fakes that block for a fixed time (like a real
+gRPC call does) and measures:
+  - wall time of one multi_modal_fusion_analysis call vs. the sum of its stages
+  - how long the event loop stalls while fusion requests are in flight
+
+Run from the backend directory:
+    python -m benchmarks.fusion_concurrency
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+from app.core.config import settings
+from app.mock_ai.clients import MockStorageClient
+from app.services.ai_providers import AIClients
+from app.services.google_ai import GoogleAIServices
+
+DOCUMENT_AI_LATENCY = 0.30
+VISION_LATENCY = 0.20
+NLP_LATENCY = 0.10
+CONCURRENT_REQUESTS = 8
+
+
+class _SlowDocumentAIClient:
+    def process_document(self, request=None, timeout=None, retry=None):
+        time.sleep(DOCUMENT_AI_LATENCY)
+        document = SimpleNamespace(
+            text="ACME HOLDINGS LLC business license issued by the state department of commerce",
+            pages=[SimpleNamespace(form_fields=[])],
+            entities=[]
+        )
+        return SimpleNamespace(document=document)
+
+
+class _SlowVisionClient:
+    def batch_annotate_images(self, requests=None, timeout=None, retry=None):
+        time.sleep(VISION_LATENCY)
+        return SimpleNamespace(responses=[
+            SimpleNamespace(
+                error=SimpleNamespace(message=""),
+                text_annotations=[SimpleNamespace(description="ACME HOLDINGS LLC", confidence=0.9)],
+                localized_object_annotations=[],
+                logo_annotations=[],
+                face_annotations=[]
+            )
+            for _ in requests
+        ])
+
+
+class _SlowLanguageClient:
+    def analyze_entities(self, request=None, timeout=None, retry=None):
+        time.sleep(NLP_LATENCY)
+        return SimpleNamespace(entities=[])
+
+
+class _SlowProvider:
+    name = "benchmark"
+
+    def create_clients(self) -> AIClients:
+        return AIClients(
+            document_ai=_SlowDocumentAIClient(),
+            vision=_SlowVisionClient(),
+            language=_SlowLanguageClient(),
+            storage=MockStorageClient()
+        )
+
+
+def build_services() -> GoogleAIServices:
+    """Build a GoogleAIServices instance wired to the slow fake clients"""
+    # Every request has to reach the fake clients: no cached results, batching or quota waits
+    settings.FUSION_CACHE_ENABLED = False
+    settings.NLP_CHUNK_CACHE_MAX_ENTRIES = 0
+    settings.VISION_BATCHING_ENABLED = False
+    settings.QUOTA_GOVERNOR_ENABLED = False
+    settings.CIRCUIT_BREAKER_ENABLED = False
+    return GoogleAIServices(provider=_SlowProvider())
+
+
+async def _measure_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Return the largest delay seen between scheduled heartbeats"""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def main():
+    services = build_services()
+    file_content = b"benchmark scan"
+
+    # Warm the executor threads so the first measurement is not skewed
+    await services.multi_modal_fusion_analysis(file_content, "image/png")
+
+    started = time.perf_counter()
+    await services.multi_modal_fusion_analysis(file_content, "image/png")
+    single_wall = time.perf_counter() - started
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(_measure_loop_lag(stop))
+    started = time.perf_counter()
+    results = await asyncio.gather(*[
+        services.multi_modal_fusion_analysis(file_content, "image/png")
+        for _ in range(CONCURRENT_REQUESTS)
+    ])
+    burst_wall = time.perf_counter() - started
+    stop.set()
+    worst_lag = await lag_task
+
+    sum_of_stages = DOCUMENT_AI_LATENCY + VISION_LATENCY + NLP_LATENCY
+    critical_path = max(DOCUMENT_AI_LATENCY, VISION_LATENCY) + NLP_LATENCY
+
+    print("Multi-modal fusion concurrency benchmark")
+    print(f"  sum of stages (sequential):   {sum_of_stages:.3f}s")
+    print(f"  critical path (max of stages): {critical_path:.3f}s")
+    print(f"  measured single request:       {single_wall:.3f}s")
+    print(f"  {CONCURRENT_REQUESTS} concurrent requests:        {burst_wall:.3f}s")
+    print(f"  worst event loop stall:        {worst_lag * 1000:.1f}ms")
+    # A stage that failed returns at once, which would make the timings above meaningless
+    errors = sorted({
+        f"{stage}: {result[stage]['error']}"
+        for result in results for stage in ("document_ai", "vision_ai", "nlp")
+        if result.get(stage, {}).get("error")
+    })
+    print(f"  stage errors:                  {len(errors)}")
+    for error in errors:
+        print(f"    {error}")
+
+    await services.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+# benchmarks/fusion_replay.py
+"""
+Deterministic offline benchmark of the fusion path from recorded AI responses.
+
+Record once against the live APIs (needs credentials), then replay anywhere:
+    python -m benchmarks.fusion_replay --record docs/*.pdf
+    python -m benchmarks.fusion_replay docs/*.pdf [--latency none] [--endpoint]
+
+Replay measures, per document:
+  - multi_modal_fusion_analysis end to end (cache disabled)
+  - _perform_fusion_analysis alone on the replayed stage results
+  - with --endpoint, POST /api/v1/upload-and-process through the ASGI app
+and checks that every iteration reaches the same decision.
+
+Run from the backend directory.
+"""
+import argparse
+import asyncio
+import mimetypes
+import os
+import statistics
+import time
+
+from app.core.config import settings
+
+
+def summarize(label: str, seconds):
+    ordered = sorted(seconds)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    print(f"  {label:<28} p50 {statistics.median(ordered) * 1000:9.3f}ms   p95 {p95 * 1000:9.3f}ms")
+
+
+async def replay_fusion(services, path: str, document_type: str, iterations: int):
+    with open(path, "rb") as document:
+        content = document.read()
+    mime_type = mimetypes.guess_type(path)[0] or "application/pdf"
+
+    wall, decisions, result = [], set(), None
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = await services.multi_modal_fusion_analysis(content, mime_type, document_type)
+        wall.append(time.perf_counter() - started)
+        fusion = result.get("fusion", {})
+        decisions.add((fusion.get("recommended_action"), fusion.get("fusion_confidence")))
+
+    fusion_only = []
+    for _ in range(iterations * 100):
+        started = time.perf_counter()
+        services._perform_fusion_analysis(result["document_ai"], result["vision_ai"], result["nlp"])
+        fusion_only.append(time.perf_counter() - started)
+    return wall, fusion_only, decisions
+
+
+async def replay_endpoint(path: str, document_type: str, iterations: int):
+    import httpx
+    from app.main import app
+
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://replay") as client:
+        for _ in range(iterations):
+            with open(path, "rb") as document:
+                files = {"file": (os.path.basename(path), document, mimetypes.guess_type(path)[0] or "application/pdf")}
+                started = time.perf_counter()
+                response = await client.post(f"{settings.API_V1_STR}/upload-and-process", files=files, data={"document_type": document_type})
+                latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+    return latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("documents", nargs="+")
+    parser.add_argument("--cassettes", default=settings.AI_CASSETTE_DIR)
+    parser.add_argument("--record", action="store_true", help="call the live provider and save its responses")
+    parser.add_argument("--latency", choices=["recorded", "none"], default="recorded")
+    parser.add_argument("--document-type", default="business_license")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--endpoint", action="store_true", help="also benchmark the upload endpoint")
+    args = parser.parse_args()
+
+    settings.AI_CASSETTE_MODE = "record" if args.record else "replay"
+    settings.AI_CASSETTE_DIR = args.cassettes
+    settings.AI_CASSETTE_REPLAY_LATENCY = args.latency == "recorded"
+    settings.FUSION_CACHE_ENABLED = False
+    settings.VISION_BATCHING_ENABLED = False
+
+    from app.services.registry import services as registry
+    services = registry.get("google_ai")
+    iterations = 1 if args.record else args.iterations
+
+    for path in args.documents:
+        wall, fusion_only, decisions = await replay_fusion(services, path, args.document_type, iterations)
+        print(f"{path} ({'recorded' if args.record else f'replayed x{iterations}, latency {args.latency}'})")
+        summarize("multi_modal_fusion_analysis", wall)
+        summarize("_perform_fusion_analysis", fusion_only)
+        if args.endpoint and not args.record:
+            summarize("POST upload-and-process", await replay_endpoint(path, args.document_type, iterations))
+        status = "deterministic" if len(decisions) == 1 else f"NON-DETERMINISTIC {sorted(decisions)}"
+        print(f"  decision: {next(iter(decisions))} ({status})")
+
+    await registry.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
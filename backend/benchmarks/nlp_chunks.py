@@ -0,0 +1,69 @@
+# benchmarks/nlp_chunks.py
+"""
+Chunked NLP over a long bank statement on the mock provider.
+
+Builds a multi-page statement text (bank boilerplate, transactions, and a
+risk keyword near the end) and runs analyze_content_with_nlp:
+  - cold: every chunk is a Natural Language call, run concurrently
+  - other statement: a second statement sharing the boilerplate, so those
+    chunks come from the chunk cache
+and reports whether the late risk keyword was found.
+
+Run from the backend directory:
+    python -m benchmarks.nlp_chunks [--pages 6] [--nlp-latency 0.3]
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.config import settings
+
+BOILERPLATE = (
+    "FIRST NATIONAL BANK. Member FDIC. Deposits are insured up to the maximum allowed by law.\n"
+    "Please examine this statement promptly and report any discrepancy within 30 days.\n"
+) * 6
+
+
+def statement(pages: int, holder: str) -> str:
+    lines = []
+    for page in range(pages):
+        lines.append(BOILERPLATE)
+        lines.append(f"Account Holder: {holder}\n")
+        for day in range(1, 29):
+            lines.append(f"03/{day:02d}  Deposit - Sales Revenue     +${1000 + page * 31 + day:,}.00\n")
+    lines.append("03/30  Wire transfer flagged by the Fraud Prevention Service\n")
+    return "".join(lines)
+
+
+async def run(services, text: str):
+    started = time.perf_counter()
+    result = await services.analyze_content_with_nlp(text)
+    return time.perf_counter() - started, result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=6)
+    parser.add_argument("--nlp-latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    settings.AI_PROVIDER = "mock"
+    settings.MOCK_AI_LATENCY_SECONDS = {"nlp": [args.nlp_latency, 0.0]}
+    settings.QUOTA_GOVERNOR_ENABLED = False
+
+    from app.services.google_ai import GoogleAIServices
+    services = GoogleAIServices()
+
+    text = statement(args.pages, "Sunny Side Bakery LLC")
+    print(f"Statement: {args.pages} pages, {len(text):,} chars, NLP latency {args.nlp_latency * 1000:.0f}ms per call")
+    for label, document in (("cold", text), ("other statement", statement(args.pages, "Blue Bottle Cafe LLC"))):
+        seconds, result = await run(services, document)
+        print(
+            f"  {label:<16} {seconds * 1000:8.1f}ms  {result['chunks']} chunks, {result['chunks_from_cache']} cached,"
+            f" {result['characters_analyzed']:,} chars, risk keywords {result['risk_keywords']}"
+        )
+    await services.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+# benchmarks/screening.py
+"""
+Watchlist screening: a 20k-entry list against 1M applicant names.
+
+Writes a synthetic OFAC SDN-style CSV (individuals and entities, some with
+aliases), builds the trigram name index from it (app.services.screening),
+and times:
+  - loading the file and building the index
+  - single-name screens, as done at submit time (p50 / p99)
+  - a portfolio rescreen of every name, in parallel worker processes
+Some applicant names are misspelled copies of listed names; the rescreen
+reports how many of those it caught.
+
+Run from the backend directory:
+    python -m benchmarks.screening [--entries 20000] [--names 1000000] [--workers 4]
+"""
+import argparse
+import csv
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app.services.screening import NameIndex, load_watchlist, rescreen
+
+# Onset, vowel and coda combinations: a few thousand syllables, so trigrams spread like real names
+SYLLABLES = [
+    onset + vowel + coda
+    for onset in ["", "b", "ch", "d", "f", "g", "h", "j", "k", "l", "m", "n", "p", "r", "s", "sh", "t", "v", "w", "z", "br", "kr", "st", "tr"]
+    for vowel in ["a", "e", "i", "o", "u", "ai", "ei", "ou", "ia"]
+    for coda in ["", "", "n", "r", "l", "s", "k", "m", "v", "sh", "rd"]
+]
+ENTITY_WORDS = ["Trading", "Holdings", "Shipping", "Exchange", "Industries", "Logistics", "Group", "Bakery", "Consulting", "Imports"]
+ENTITY_FORMS = ["LLC", "Ltd", "Co", "Inc", "SA", ""]
+
+
+def word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+
+
+def person(rng: random.Random) -> str:
+    return f"{word(rng)} {word(rng)}"
+
+
+def entity(rng: random.Random) -> str:
+    return f"{word(rng)} {rng.choice(ENTITY_WORDS)} {rng.choice(ENTITY_FORMS)}".strip()
+
+
+def misspell(name: str, rng: random.Random) -> str:
+    position = rng.randrange(1, len(name) - 1)
+    return name[:position] + rng.choice("aeiou") + name[position + 1:]
+
+
+def write_watchlist(path: str, alias_path: str, entries: int, rng: random.Random):
+    listed = []
+    with open(path, "w", newline="") as sdn, open(alias_path, "w", newline="") as alt:
+        sdn_rows, alt_rows = csv.writer(sdn), csv.writer(alt)
+        for uid in range(1, entries + 1):
+            if rng.random() < 0.6:
+                first, last = word(rng), word(rng)
+                name, kind = f"{last.upper()}, {first}", "individual"
+                listed.append(f"{first} {last}")
+            else:
+                name, kind = entity(rng).upper(), "-0-"
+                listed.append(name.title())
+            sdn_rows.writerow([uid, name, kind, "SDGT] [SAMPLE", "-0-", "-0-", "-0-", "-0-", "-0-", "-0-", "-0-", "-0-"])
+            if rng.random() < 0.3:
+                alt_rows.writerow([uid, uid * 10, "aka", word(rng).upper(), "-0-"])
+    return listed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--names", type=int, default=1000000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--threshold", type=float, default=0.85)
+    parser.add_argument("--planted-rate", type=float, default=0.001, help="share of names that are misspelled list names")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        path, alias_path = os.path.join(directory, "sdn.csv"), os.path.join(directory, "alt.csv")
+        listed = write_watchlist(path, alias_path, args.entries, rng)
+
+        started = time.perf_counter()
+        index = NameIndex(load_watchlist(path, alias_path))
+        build_seconds = time.perf_counter() - started
+
+    records, planted = [], set()
+    for number in range(args.names // 2):
+        record_id = f"APP-{number:07d}"
+        owner, business = person(rng), entity(rng)
+        if rng.random() < args.planted_rate * 2:
+            owner = misspell(rng.choice(listed), rng)
+            planted.add(record_id)
+        records.append((record_id, {"owner_name": owner, "businessName": business}))
+
+    latencies = []
+    for _, names in records[:2000]:
+        started = time.perf_counter()
+        index.screen(names, args.threshold)
+        latencies.append((time.perf_counter() - started) * 1000 / len(names))
+    latencies.sort()
+
+    report = rescreen(index, records, args.threshold, workers=args.workers, chunk_size=args.chunk_size)
+    caught = planted & {record_id for record_id, _ in report["hits"]}
+
+    print(f"{len(index):,} entries ({index.names:,} names with aliases), {report['names_screened']:,} applicant names")
+    print(f"  load + build index: {build_seconds * 1000:9.1f}ms")
+    print(f"  single name:        p50 {statistics.median(latencies):.3f}ms  p99 {latencies[int(len(latencies) * 0.99)]:.3f}ms")
+    print(
+        f"  rescreen:           {report['seconds']:9.1f}s  {report['names_per_second']:,} names/s"
+        f" on {report['workers']} worker(s) ({os.cpu_count()} CPUs)"
+    )
+    print(f"  potential matches:  {report['potential_matches']:,} records; planted misspellings caught {len(caught)}/{len(planted)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# benchmarks/startup.py
+"""
+Cold-start benchmark and import-time budget for app.main.
+
+Measures, each in a fresh interpreter:
+  - cold import time of app.main from `python -X importtime`, with the
+    slowest modules by cumulative time
+  - time to first response: launch uvicorn with app.main:app and poll /health
+    until it answers
+
+Exits non-zero when the median import time is over the budget, or when a
+heavy dependency that should only load on first use (Google Cloud clients,
+reportlab) is imported by app.main, so it can gate CI.
+
+Run from the backend directory:
+    python -m benchmarks.startup [--runs 5] [--budget-ms 1500] [--skip-server]
+"""
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+# Only imported when the endpoints that need them are first used
+DEFERRED_MODULES = [
+    "google.cloud.documentai",
+    "google.cloud.vision",
+    "google.cloud.language_v1",
+    "google.cloud.storage",
+    "reportlab"
+]
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_import(module: str):
+    """Import `module` in a new interpreter; returns {module: (self_us, cumulative_us)}"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+
+    timings = {}
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            timings[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return timings
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_response(timeout: float = 60.0) -> float:
+    """Seconds from launching uvicorn to the first successful /health response"""
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"no response from /health within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="fail when the median cold import is slower")
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    parser.add_argument("--skip-server", action="store_true", help="only measure import time")
+    args = parser.parse_args()
+
+    runs = [profile_import(args.module) for _ in range(args.runs)]
+    import_ms = [run[args.module][1] / 1000 for run in runs]
+    median_ms = statistics.median(import_ms)
+
+    print(f"Cold import of {args.module} over {args.runs} runs")
+    print(f"  median: {median_ms:.1f}ms  min: {min(import_ms):.1f}ms  max: {max(import_ms):.1f}ms  budget: {args.budget_ms:.0f}ms")
+    print("  slowest modules (cumulative, last run):")
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1][1], reverse=True)
+    for name, (self_us, cumulative_us) in slowest[1:args.top + 1]:
+        print(f"    {cumulative_us / 1000:8.1f}ms  {self_us / 1000:7.1f}ms self  {name}")
+
+    if not args.skip_server:
+        ttfr = [time_to_first_response() for _ in range(args.runs)]
+        print(f"Time to first response: median {statistics.median(ttfr) * 1000:.0f}ms  max {max(ttfr) * 1000:.0f}ms")
+
+    failures = []
+    if median_ms > args.budget_ms:
+        failures.append(f"median cold import {median_ms:.1f}ms is over the {args.budget_ms:.0f}ms budget")
+    for deferred in DEFERRED_MODULES:
+        if any(name == deferred or name.startswith(deferred + ".") for name in runs[-1]):
+            failures.append(f"{deferred} is imported by {args.module}; it should load on first use")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/text_layer.py
+"""
+Latency of the local PDF text-layer fast path versus Document AI OCR.
+
+For each PDF (default: the files in sample-text-documents/), prints the text
+layer's coverage and quality, the cost of the local pre-pass, and the
+Document AI stage and full fusion wall time with TEXT_LAYER_FAST_PATH "off",
+"native" and "skip".
+
+Uses the mock provider unless --provider says otherwise; the mock's Document
+AI latency comes from MOCK_AI_LATENCY_SECONDS. Replayed cassettes give the
+latency recorded against the live API:
+    python -m benchmarks.text_layer --provider google   (with AI_CASSETTE_MODE=replay)
+
+Needs pypdf. Run from the backend directory:
+    python -m benchmarks.text_layer [docs/*.pdf] [--repeat 5]
+"""
+import argparse
+import asyncio
+import glob
+import os
+import statistics
+import time
+
+from app.core.config import settings
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "sample-text-documents")
+
+
+async def median_seconds(repeat: int, run):
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await run()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("documents", nargs="*")
+    parser.add_argument("--provider", default="mock")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    settings.AI_PROVIDER = args.provider
+    settings.FUSION_CACHE_ENABLED = False
+    settings.VISION_BATCHING_ENABLED = False
+    settings.QUOTA_GOVERNOR_ENABLED = False
+
+    from app.services.google_ai import GoogleAIServices
+    from app.services.text_layer import extract_text_layer
+
+    services = GoogleAIServices()
+    documents = args.documents or sorted(glob.glob(os.path.join(SAMPLE_DIR, "*.pdf")))
+    for path in documents:
+        with open(path, "rb") as document:
+            content = document.read()
+
+        started = time.perf_counter()
+        text_layer = extract_text_layer(content, settings.TEXT_LAYER_MAX_PAGES, settings.TEXT_LAYER_MIN_CHARS_PER_PAGE)
+        prepass_seconds = time.perf_counter() - started
+
+        print(f"{os.path.basename(path)} ({args.provider} provider, median of {args.repeat})")
+        if text_layer is None:
+            print("  no readable text layer")
+        else:
+            summary = text_layer.summary()
+            usable = text_layer.is_usable(settings.TEXT_LAYER_MIN_COVERAGE, settings.TEXT_LAYER_MIN_QUALITY)
+            print(f"  text layer: {summary['characters']} chars, coverage {summary['coverage']:.2f}, quality {summary['quality']:.3f}, usable {usable}")
+        print(f"  {'local pre-pass':<24} {prepass_seconds * 1000:9.1f}ms")
+
+        for mode in ("off", "native", "skip"):
+            settings.TEXT_LAYER_FAST_PATH = mode
+            stage_seconds, stage = await median_seconds(
+                args.repeat, lambda: services.extract_document_content(content, "application/pdf")
+            )
+            fusion_seconds, fusion = await median_seconds(
+                args.repeat, lambda: services.multi_modal_fusion_analysis(content, "application/pdf", "business_license")
+            )
+            print(
+                f"  {mode:<6} document stage {stage_seconds * 1000:9.1f}ms   fusion {fusion_seconds * 1000:9.1f}ms"
+                f"   source {stage.get('source')}, {len(stage.get('form_fields', []))} form fields,"
+                f" {fusion['fusion'].get('recommended_action')} ({fusion['fusion'].get('fusion_confidence')})"
+            )
+
+    await services.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+# benchmarks/vision_ocr_dedup.py
+"""
+Checks that taking Vision's text features from Document AI leaves fusion unchanged.
+
+For each document the pipeline runs once with VISION_OCR_FROM_DOCUMENT_AI off,
+so Vision OCRs the page as before. Its recorded stage results are then fused
+twice:
+  - as recorded, with Vision's own text features
+  - with Vision's text features removed (what Vision returns without text
+    detection), completed from the Document AI text at fusion time
+The two fusions must reach the same decision and validation results. The
+script also counts the Vision text-detection features each mode sends.
+
+Works on replayed cassettes (recorded with VISION_OCR_FROM_DOCUMENT_AI off) or
+on the mock provider:
+    python -m benchmarks.vision_ocr_dedup docs/*.pdf --replay [--cassettes DIR]
+    python -m benchmarks.vision_ocr_dedup ../sample-text-documents/*.pdf
+The mock's Vision OCR returns the Document AI text verbatim, so on the mock
+the fusion check cannot fail; tests/test_vision_ocr_replay.py replays
+responses whose two texts differ.
+
+Run from the backend directory. Exits nonzero if any document's fusion differs.
+"""
+import argparse
+import asyncio
+import mimetypes
+import sys
+
+from app.core.config import settings
+
+TEXT_FIELDS = ("text_detected", "text_content", "text_confidence", "text_source")
+
+
+class FeatureCounter:
+    """Wraps the Vision client and counts the features in every annotate request"""
+
+    def __init__(self, client):
+        self.client = client
+        self.transport = getattr(client, "transport", None)
+        self.counts = {}
+
+    def batch_annotate_images(self, requests=None, **kwargs):
+        for request in requests:
+            for feature in request.features:
+                name = getattr(feature.type_, "name", str(feature.type_))
+                self.counts[name] = self.counts.get(name, 0) + 1
+        return self.client.batch_annotate_images(requests=requests, **kwargs)
+
+
+def without_text_features(vision_ai):
+    """The Vision result as it would be without text detection"""
+    from app.services.google_ai import vision_text_result
+    stripped = {key: value for key, value in vision_ai.items() if key not in TEXT_FIELDS}
+    stripped["document_features"] = {
+        key: value for key, value in vision_ai.get("document_features", {}).items()
+        if key not in ("has_structured_text", "text_density")
+    }
+    return vision_text_result(stripped, "", 0.0, "deferred")
+
+
+def compare(services, result):
+    document_ai, vision_ai, nlp = result["document_ai"], result["vision_ai"], result["nlp"]
+    recorded = services._perform_fusion_analysis(document_ai, vision_ai, nlp)
+    deduplicated = services._perform_fusion_analysis(document_ai, without_text_features(vision_ai), nlp)
+    differences = [
+        key for key in ("recommended_action", "validation_results", "cross_validation_passed", "processing_quality")
+        if recorded[key] != deduplicated[key]
+    ]
+    if abs(recorded["fusion_confidence"] - deduplicated["fusion_confidence"]) > 0.01:
+        differences.append("fusion_confidence")
+    return recorded, deduplicated, differences
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("documents", nargs="+")
+    parser.add_argument("--replay", action="store_true", help="replay recorded responses instead of the mock provider")
+    parser.add_argument("--cassettes", default=settings.AI_CASSETTE_DIR)
+    parser.add_argument("--document-type", default="business_license")
+    args = parser.parse_args()
+
+    if args.replay:
+        settings.AI_CASSETTE_MODE = "replay"
+        settings.AI_CASSETTE_DIR = args.cassettes
+        settings.AI_CASSETTE_REPLAY_LATENCY = False
+    else:
+        settings.AI_PROVIDER = "mock"
+        settings.MOCK_AI_LATENCY_SECONDS = {}
+        settings.MOCK_AI_SEED = settings.MOCK_AI_SEED if settings.MOCK_AI_SEED is not None else 0
+    settings.FUSION_CACHE_ENABLED = False
+    settings.VISION_BATCHING_ENABLED = False
+    settings.TEXT_LAYER_FAST_PATH = "off"
+
+    from app.services.google_ai import GoogleAIServices
+    services = GoogleAIServices()
+    counter = services.vision_client = FeatureCounter(services.vision_client)
+
+    failed = False
+    for path in args.documents:
+        with open(path, "rb") as document:
+            content = document.read()
+        mime_type = mimetypes.guess_type(path)[0] or "application/pdf"
+
+        settings.VISION_OCR_FROM_DOCUMENT_AI = False
+        counter.counts = {}
+        result = await services.multi_modal_fusion_analysis(content, mime_type, args.document_type)
+        ocr_before = counter.counts.get("TEXT_DETECTION", 0)
+
+        recorded, deduplicated, differences = compare(services, result)
+        failed = failed or bool(differences)
+        print(path)
+        print(f"  recorded:     {recorded['recommended_action']:<13} confidence {recorded['fusion_confidence']:.3f}")
+        print(f"  deduplicated: {deduplicated['recommended_action']:<13} confidence {deduplicated['fusion_confidence']:.3f}")
+        print(f"  fusion: {'equivalent' if not differences else 'DIFFERS in ' + ', '.join(differences)}")
+
+        if not args.replay:
+            # Requests without text detection were not recorded, so only the mock runs this mode
+            settings.VISION_OCR_FROM_DOCUMENT_AI = True
+            counter.counts = {}
+            live = await services.multi_modal_fusion_analysis(content, mime_type, args.document_type)
+            print(f"  Vision text detections: {ocr_before} -> {counter.counts.get('TEXT_DETECTION', 0)}"
+                  f" (text from {live['vision_ai'].get('text_source')})")
+
+    await services.close()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# Settings are read once, when app.core.config is first imported: keep test
+# uploads out of /app and never start the Google clients.
+os.environ.setdefault("UPLOAD_DIR", tempfile.mkdtemp(prefix="merchant-uploads-"))
+os.environ.setdefault("AI_PROVIDER", "mock")
@@ -0,0 +1,60 @@
+import pytest
+from google.api_core import exceptions as google_exceptions
+from google.cloud import documentai, vision
+
+from app.core.config import settings
+from app.mock_ai import MockAIProvider
+from app.services.cassettes import CassetteMissError, CassetteStore, ReplayProvider, document_ai_key, vision_key, with_cassettes
+
+
+def process_request(options=None):
+    request = documentai.ProcessRequest(
+        name="projects/p/locations/us/processors/x",
+        raw_document=documentai.RawDocument(content=b"%PDF-1.7 statement", mime_type="application/pdf")
+    )
+    if options is not None:
+        request.process_options = options
+    return request
+
+
+def test_document_ai_key_depends_on_process_options():
+    native = documentai.ProcessOptions(ocr_config=documentai.OcrConfig(enable_native_pdf_parsing=True))
+    pages = documentai.ProcessOptions(individual_page_selector=documentai.ProcessOptions.IndividualPageSelector(pages=[1, 2]))
+
+    keys = {document_ai_key(process_request()), document_ai_key(process_request(native)), document_ai_key(process_request(pages))}
+
+    assert len(keys) == 3
+    assert document_ai_key(process_request(native)) == document_ai_key(process_request(native))
+
+
+def test_store_round_trip(tmp_path):
+    store = CassetteStore(str(tmp_path))
+    store.save("document_ai/abc", b"payload", 0.25)
+
+    assert store.load("document_ai/abc") == (b"payload", 0.25)
+    with pytest.raises(CassetteMissError):
+        store.load("document_ai/missing")
+
+
+def test_recording_the_mock_provider_is_rejected(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "AI_CASSETTE_MODE", "record")
+    monkeypatch.setattr(settings, "AI_CASSETTE_DIR", str(tmp_path))
+
+    with pytest.raises(ValueError, match="mock"):
+        with_cassettes(MockAIProvider())
+
+
+def test_vision_replay_times_out_like_the_live_call(tmp_path):
+    store = CassetteStore(str(tmp_path))
+    request = vision.AnnotateImageRequest(
+        image=vision.Image(content=b"scanned license"),
+        features=[vision.Feature(type_=vision.Feature.Type.LOGO_DETECTION)]
+    )
+    response = vision.AnnotateImageResponse(logo_annotations=[vision.EntityAnnotation(description="State of California")])
+    store.save(vision_key(request), type(response).serialize(response), 0.2)
+    client = ReplayProvider(store).create_clients().vision
+
+    with pytest.raises(google_exceptions.DeadlineExceeded):
+        client.batch_annotate_images(requests=[request], timeout=0.05)
+    replayed = client.batch_annotate_images(requests=[request], timeout=1.0)
+    assert replayed.responses[0].logo_annotations[0].description == "State of California"
@@ -0,0 +1,91 @@
+import pytest
+
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+def half_open_breaker(half_open_calls=1):
+    breaker = CircuitBreaker("test", window_size=4, min_calls=2, open_seconds=0.0, half_open_calls=half_open_calls)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record(0.1, failed=True)
+    assert breaker._state == OPEN
+    assert breaker.state == HALF_OPEN
+    return breaker
+
+
+def test_successful_trial_closes_the_breaker():
+    breaker = half_open_breaker()
+    breaker.before_call()
+    breaker.record(0.1, failed=False)
+    assert breaker.state == CLOSED
+
+
+def test_failed_trial_reopens_the_breaker():
+    breaker = half_open_breaker()
+    breaker.open_seconds = 60.0
+    breaker.before_call()
+    breaker.record(0.1, failed=True)
+    assert breaker.state == OPEN
+
+
+def test_cancelled_trial_frees_its_slot_without_closing():
+    breaker = half_open_breaker()
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.release()
+
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    breaker.record(0.1, failed=False)
+    assert breaker.state == CLOSED
+
+
+def test_cancelled_rpc_is_not_recorded_as_a_success():
+    import asyncio
+    import time
+
+    from app.services.ai_providers import get_ai_provider
+    from app.services.google_ai import GoogleAIServices
+
+    services = GoogleAIServices(provider=get_ai_provider("mock"))
+    services.quota = None
+    breaker = services.breakers["nlp"] = half_open_breaker()
+
+    async def cancel_mid_call():
+        call = asyncio.create_task(services._call_rpc("nlp", lambda **kwargs: time.sleep(0.2), use_request_deadline=False))
+        await asyncio.sleep(0.05)
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+
+    asyncio.run(cancel_mid_call())
+    services.executor.shutdown(wait=True)
+
+    assert breaker.state == HALF_OPEN
+    assert breaker._trial_successes == 0
+
+
+def test_open_breaker_rejects_before_taking_quota():
+    import asyncio
+
+    from app.services.ai_providers import get_ai_provider
+    from app.services.google_ai import GoogleAIServices
+
+    acquired = []
+
+    class Quota:
+        async def acquire(self, name, units=1, features=None):
+            acquired.append(name)
+
+    services = GoogleAIServices(provider=get_ai_provider("mock"))
+    services.quota = Quota()
+    breaker = services.breakers["vision"] = half_open_breaker()
+    breaker.open_seconds = 60.0
+    breaker._trip()
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(services._call_rpc("vision", lambda **kwargs: None, use_request_deadline=False))
+    services.executor.shutdown(wait=True)
+
+    assert acquired == []
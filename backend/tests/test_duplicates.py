@@ -0,0 +1,179 @@
+import asyncio
+import threading
+import time
+from array import array
+
+import pytest
+
+from app.api import duplicates as duplicates_api
+from app.api import merchants_new, screening as screening_api
+from app.core.config import settings
+from app.services import registry as registry_module
+from app.services.duplicates import DuplicateIndex, MinHasher, PackedPostings, application_keys
+from app.services.registry import services
+from app.services.screening import name_trigrams
+
+
+def application(number, **business_data):
+    personal_data = {"firstName": "Owner", "lastName": str(number), "email": f"owner{number}@example.com"}
+    business_data = dict({
+        "businessName": f"Company {number} LLC",
+        "ein": f"12-{number:07d}",
+        "businessAddress": f"{number} Industrial Parkway, Dayton OH 45402"
+    }, **business_data)
+    return f"APP-{number}", "APPROVED", personal_data, business_data
+
+
+def jaccard(first, second):
+    first, second = name_trigrams(first), name_trigrams(second)
+    return len(first & second) / len(first | second)
+
+
+def test_minhash_signatures_estimate_trigram_jaccard():
+    minhash = MinHasher(num_perm=256)
+    signature = minhash.signature("sunny side bakery")
+    assert len(signature) == 256
+    assert minhash.signature("sunny side bakery") == signature
+    assert MinHasher.similarity(signature, signature) == 1.0
+
+    for other in ["sunny side bake shop", "sunnyside bakery", "golden gate florist"]:
+        estimate = MinHasher.similarity(signature, minhash.signature(other))
+        assert abs(estimate - jaccard("sunny side bakery", other)) < 0.1, other
+
+
+def test_names_collide_in_a_band_only_when_those_rows_agree():
+    index = DuplicateIndex(num_perm=32, bands=8)
+    signature = index.minhash.signature("blue bottle cafe")
+    changed = array("I", signature)
+    changed[0] += 1
+    keys, changed_keys = index._band_keys(signature), index._band_keys(changed)
+    assert len(keys) == 8
+    assert changed_keys[0] != keys[0]
+    assert changed_keys[1:] == keys[1:]
+
+
+def test_similar_name_and_address_needs_a_band_collision_in_both():
+    index = DuplicateIndex()
+    index.rebuild([application(1, businessName="Blue Bottle Coffee LLC", businessAddress="500 North Main Street, Austin TX 78701")])
+
+    lookalike = application_keys({}, {"businessName": "Blue Bottle Coffee Co", "businessAddress": "500 N Main St, Austin TX 78701"})
+    [match] = index.find(lookalike)
+    assert match["reasons"] == ["similar_name_and_address"]
+
+    elsewhere = application_keys({}, {"businessName": "Blue Bottle Coffee Co", "businessAddress": "12 Harbor Road, Tampa FL 33601"})
+    assert index.find(elsewhere) == []
+
+
+def test_packed_postings_return_the_newest_ids_up_to_the_limit():
+    postings = PackedPostings()
+    for item_id in range(6):
+        postings.add(42, item_id)
+    postings.compact()
+    for item_id in range(6, 9):
+        postings.add(42, item_id)
+    postings.add(7, 100)
+
+    assert postings.get(42, 2) == [8, 7]
+    assert postings.get(42, 5) == [8, 7, 6, 5, 4]
+    assert postings.get(42, 100) == [8, 7, 6, 5, 4, 3, 2, 1, 0]
+    assert postings.get(99, 10) == []
+
+
+def test_max_bucket_caps_the_applications_read_per_identifier():
+    index = DuplicateIndex(max_bucket=3)
+    # Five stored applications sharing one bank account, e.g. a payment processor's
+    index.rebuild(application(number, routingNumber="021000021", accountNumber="987654321") for number in range(5))
+    keys = application_keys({}, {"routingNumber": "021000021", "accountNumber": "987654321"})
+    matches = index.find(keys, limit=10)
+    assert [match["application_id"] for match in matches] == ["APP-4", "APP-3", "APP-2"]
+    assert all(match["reasons"] == ["bank_account"] for match in matches)
+
+
+def test_index_loads_in_the_background_and_checks_wait_for_it(monkeypatch):
+    release = threading.Event()
+
+    def slow_load(index):
+        release.wait(5)
+        index.rebuild([application(1)])
+
+    monkeypatch.setattr(registry_module, "_load_duplicate_index", slow_load)
+    _, _, personal_data, business_data = application(1, businessName="Other Name Inc")
+    try:
+        index = services.get("duplicate_index")
+        assert not index.loaded
+        result = asyncio.run(duplicates_api.check_duplicates(personal_data, business_data))
+        assert result["status"] == "unavailable"
+
+        release.set()
+        for _ in range(100):
+            if index.loaded:
+                break
+            time.sleep(0.05)
+        result = asyncio.run(duplicates_api.check_duplicates(personal_data, business_data))
+        assert result["status"] == "likely_duplicate"
+        assert result["matches"][0]["reasons"] == ["ein", "email"]
+    finally:
+        release.set()
+        asyncio.run(services.shutdown())
+
+
+def test_disabled_detection_never_builds_the_index(monkeypatch):
+    monkeypatch.setattr(settings, "DUPLICATE_DETECTION_ENABLED", False)
+    asyncio.run(services.warmup(["duplicate_index"]))
+    assert asyncio.run(duplicates_api.duplicate_index_status()) == {"enabled": False, "index": None}
+    assert services.status()["duplicate_index"] == "not_initialized"
+
+
+def test_rescreen_moves_new_matches_to_review(monkeypatch):
+    monkeypatch.setattr(settings, "SCREENING_ENABLED", True)
+    monkeypatch.setattr(settings, "SCREENING_WATCHLIST_PATH", "app/data/watchlist_sample.csv")
+    monkeypatch.setattr(settings, "SCREENING_RESCREEN_WORKERS", 1)
+    monkeypatch.setattr(merchants_new, "get_sync_db", lambda: None)
+    store = {
+        "APP-LISTED": {"status": "APPROVED", "personal_data": {"firstName": "Marcus", "lastName": "Orlando"}, "business_data": {}},
+        "APP-CLEAR": {"status": "APPROVED", "personal_data": {"firstName": "Jane", "lastName": "Doe"}, "business_data": {}},
+        "APP-DENIED": {"status": "DENIED", "personal_data": {"firstName": "Marcus", "lastName": "Orlando"}, "business_data": {}}
+    }
+    monkeypatch.setattr(merchants_new, "applications_store", store)
+    try:
+        report = asyncio.run(screening_api.run_portfolio_rescreen())
+    finally:
+        asyncio.run(services.shutdown())
+
+    assert report["potential_match_applications"] == ["APP-DENIED", "APP-LISTED"]
+    assert report["moved_to_review"] == 1
+    assert store["APP-DENIED"]["status"] == "DENIED"
+    assert store["APP-DENIED"]["aml_status"] == "review"
+    assert store["APP-LISTED"]["status"] == "REVIEW"
+    assert store["APP-LISTED"]["aml_status"] == "review"
+    assert store["APP-CLEAR"]["status"] == "APPROVED"
+
+
+@pytest.mark.parametrize("submit", [
+    merchants_new.submit_merchant_application_test,
+    merchants_new.submit_merchant_application_production
+], ids=["test", "production"])
+@pytest.mark.parametrize("risk_score, expected", [(85, "REVIEW"), (40, "DENIED")])
+def test_a_repeat_of_a_denied_application_holds_approvals_and_keeps_denials(monkeypatch, submit, risk_score, expected):
+    async def clear(personal_data, business_data):
+        return {"status": "clear", "matches": []}
+
+    async def repeat_of_denied(personal_data, business_data):
+        return {"status": "likely_duplicate", "repeat_of_denied": True,
+                "matches": [{"application_id": "APP-7", "status": "DENIED", "reasons": ["ein"]}]}
+
+    async def no_index(*args):
+        return None
+
+    monkeypatch.setattr(merchants_new, "calculate_risk_score", lambda business_data, documents: risk_score)
+    monkeypatch.setattr(merchants_new, "screen_applicant", clear)
+    monkeypatch.setattr(merchants_new, "check_duplicates", repeat_of_denied)
+    monkeypatch.setattr(merchants_new, "index_application", no_index)
+    monkeypatch.setattr(merchants_new, "applications_store", {})
+
+    request = merchants_new.ApplicationSubmissionRequest(
+        personal_data={"firstName": "Owner", "lastName": "7"}, business_data={"ein": "12-0000007"}, processed_documents={}
+    )
+    response = asyncio.run(submit(request))
+    assert response["approval_status"] == expected
+    assert response["status_reasons"] == ["repeats_denied_application"]
@@ -0,0 +1,28 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.mock_ai import MockAIProvider
+from app.services.google_ai import DEADLINE_SKIPPED_STAGE_RESULT, THROTTLED_SKIPPED_STAGE_RESULT, GoogleAIServices
+
+CLEAN_DOCUMENT_AI = {"confidence": 0.95, "entities": [{"type": "business_name"}]}
+CLEAN_VISION = {"authenticity_score": 0.9, "text_detected": True}
+CLEAN_NLP = {"has_business_entities": True, "risk_keywords": []}
+
+
+@pytest.fixture
+def services(monkeypatch):
+    monkeypatch.setattr(settings, "QUOTA_GOVERNOR_ENABLED", False)
+    services = GoogleAIServices(provider=MockAIProvider())
+    yield services
+    asyncio.run(services.close())
+
+
+@pytest.mark.parametrize("skipped", [DEADLINE_SKIPPED_STAGE_RESULT, THROTTLED_SKIPPED_STAGE_RESULT], ids=["deadline", "throttled"])
+def test_a_result_missing_a_stage_is_never_auto_approved(services, skipped):
+    complete = services._perform_fusion_analysis(CLEAN_DOCUMENT_AI, CLEAN_VISION, CLEAN_NLP)
+    without_vision = services._perform_fusion_analysis(CLEAN_DOCUMENT_AI, skipped, CLEAN_NLP)
+    assert complete["recommended_action"] == "auto_approve"
+    assert without_vision["fusion_confidence"] >= 0.85
+    assert without_vision["recommended_action"] == "human_review"
@@ -0,0 +1,61 @@
+import asyncio
+
+from app.services.jobs import DocumentJobManager, InMemoryJobBackend
+
+
+class TrackingBackend(InMemoryJobBackend):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.acked = []
+        self.requeued = []
+
+    async def ack(self, job_id):
+        self.acked.append(job_id)
+
+    async def requeue(self, job_id):
+        self.requeued.append(job_id)
+        await super().requeue(job_id)
+
+
+def test_a_stopped_worker_hands_its_job_back(monkeypatch):
+    started = None
+
+    async def slow_job(self, job_id):
+        started.set()
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(DocumentJobManager, "_run_job", slow_job)
+
+    async def run():
+        nonlocal started
+        started = asyncio.Event()
+        backend = TrackingBackend()
+        manager = DocumentJobManager(backend, concurrency=1)
+        await backend.enqueue("job-1")
+        manager.start()
+        await started.wait()
+        await manager.stop()
+        return backend, await backend.dequeue(timeout=0.1)
+
+    backend, redelivered = asyncio.run(run())
+    assert backend.requeued == ["job-1"] and backend.acked == []
+    assert redelivered == "job-1"
+
+
+def test_a_redelivered_finished_job_is_acked_without_running(monkeypatch):
+    async def analyze(**kwargs):
+        raise AssertionError("finished job ran again")
+
+    monkeypatch.setattr("app.services.document_processing.analyze_stored_document", analyze)
+
+    async def run():
+        backend = TrackingBackend()
+        manager = DocumentJobManager(backend, concurrency=1)
+        await backend.save({"job_id": "job-1", "status": "completed", "input": {}})
+        await manager._run_leased_job("job-1")
+        return backend, await backend.get("job-1")
+
+    backend, job = asyncio.run(run())
+    assert backend.acked == ["job-1"]
+    assert job["status"] == "completed"
+
@@ -0,0 +1,87 @@
+import asyncio
+
+from app.core.config import settings
+from app.mock_ai import MockAIProvider
+from app.services.google_ai import GoogleAIServices
+from app.services.payloads import PayloadMemoryBudget
+
+DOCUMENT_BYTES = 64 * 1024
+
+
+class TrackedBudget(PayloadMemoryBudget):
+    """Records the most budget ever in use"""
+
+    peak = 0
+
+    def _publish(self):
+        super()._publish()
+        self.peak = max(self.peak, self.bytes_in_use)
+
+
+def stored_upload(tmp_path):
+    path = tmp_path / "license.png"
+    path.write_bytes(b"\x89PNG" + bytes(DOCUMENT_BYTES - 4))
+    return str(path)
+
+
+def test_stages_share_one_budgeted_copy_of_a_spilled_payload(tmp_path):
+    path = stored_upload(tmp_path)
+    budget = TrackedBudget(max_bytes=2 * DOCUMENT_BYTES, max_wait_seconds=0.01)
+
+    async def run():
+        release = asyncio.Event()
+
+        async def other_request():
+            async with budget.reserve(2 * DOCUMENT_BYTES):
+                await release.wait()
+
+        holder = asyncio.create_task(other_request())
+        await asyncio.sleep(0)
+        async with budget.open_payload(path, DOCUMENT_BYTES) as payload:
+            assert payload.spilled
+            reads = asyncio.gather(*(payload.read() for _ in range(4)))
+            await asyncio.sleep(0.05)
+            # The budget is all taken, so the stages wait rather than copy
+            assert not reads.done()
+            release.set()
+            await holder
+            copies = await reads
+            in_use_while_reading = budget.bytes_in_use
+        return copies, in_use_while_reading
+
+    copies, in_use_while_reading = asyncio.run(run())
+    assert all(copy is copies[0] for copy in copies)
+    assert len(copies[0]) == DOCUMENT_BYTES
+    assert in_use_while_reading == DOCUMENT_BYTES
+    assert budget.bytes_in_use == 0
+    assert budget.peak <= budget.max_bytes
+
+
+def test_concurrent_fusions_with_a_spilled_payload_stay_within_budget(monkeypatch, tmp_path):
+    for name, value in {
+        "MOCK_AI_LATENCY_SECONDS": {"document_ai": [0.05, 0.0], "vision": [0.05, 0.0], "nlp": [0.01, 0.0]},
+        "FUSION_CACHE_ENABLED": False,
+        "VISION_BATCHING_ENABLED": False,
+        "QUOTA_GOVERNOR_ENABLED": False
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+    path = stored_upload(tmp_path)
+    budget = TrackedBudget(max_bytes=2 * DOCUMENT_BYTES, max_wait_seconds=0.01)
+    services = GoogleAIServices(provider=MockAIProvider())
+
+    async def fuse():
+        async with budget.open_payload(path, DOCUMENT_BYTES) as payload:
+            result = await services.multi_modal_fusion_analysis(payload, "image/png", "business_license")
+            return payload.spilled, result
+
+    async def run():
+        try:
+            return await asyncio.gather(*(fuse() for _ in range(3)))
+        finally:
+            await services.close()
+
+    results = asyncio.run(run())
+    assert sorted(spilled for spilled, _ in results) == [False, False, True]
+    assert all(result["status"] == "success" and "error" not in result["document_ai"] for _, result in results)
+    assert budget.peak <= budget.max_bytes
+    assert budget.bytes_in_use == 0
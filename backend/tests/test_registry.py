@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from app.services.registry import ServiceRegistry
+
+
+def test_services_are_built_on_first_get_only():
+    built = []
+    registry = ServiceRegistry()
+    registry.register("client", lambda: built.append("client") or object())
+
+    assert built == []
+    assert registry.status() == {"client": "not_initialized"}
+    first = registry.get("client")
+    assert registry.get("client") is first
+    assert built == ["client"]
+    assert registry.status() == {"client": "ready"}
+
+
+def test_failed_build_is_retried_on_the_next_get():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("unreachable")
+        return "connected"
+
+    registry = ServiceRegistry()
+    registry.register("client", flaky)
+
+    with pytest.raises(ConnectionError):
+        registry.get("client")
+    assert registry.status()["client"] == "error: unreachable"
+    assert registry.get("client") == "connected"
+    assert registry.status()["client"] == "ready"
+
+
+def test_shutdown_closes_in_reverse_creation_order():
+    closed = []
+
+    async def close_async(instance):
+        closed.append(instance)
+
+    registry = ServiceRegistry()
+    registry.register("channel", lambda: "channel", close=closed.append)
+    registry.register("client", lambda: registry.get("channel") and "client", close=close_async)
+    registry.register("unused", lambda: "unused", close=closed.append)
+
+    registry.get("client")
+    asyncio.run(registry.shutdown())
+
+    assert closed == ["client", "channel"]
+    assert registry.status() == {"channel": "not_initialized", "client": "not_initialized", "unused": "not_initialized"}
+
+
+def test_start_warmup_builds_only_the_named_services():
+    built = []
+    registry = ServiceRegistry()
+    for name in ("core", "optional"):
+        registry.register(name, lambda name=name: built.append(name) or name)
+
+    async def boot():
+        registry.start_warmup(names=["core", "not_registered"])
+        await registry._warmup_task
+
+    asyncio.run(boot())
+    assert built == ["core"]
+
+
+def test_warmup_skips_services_of_disabled_features():
+    built, enabled = [], {"screening": False}
+    registry = ServiceRegistry()
+    registry.register("watchlist", lambda: built.append("watchlist") or "watchlist", enabled=lambda: enabled["screening"])
+    registry.register("lexicon", lambda: built.append("lexicon") or "lexicon")
+
+    asyncio.run(registry.warmup())
+    assert built == ["lexicon"]
+    assert registry.status()["watchlist"] == "not_initialized"
+
+    enabled["screening"] = True
+    asyncio.run(registry.warmup(["watchlist"]))
+    assert built == ["lexicon", "watchlist"]
@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.mock_ai import MockAIProvider
+from app.services.google_ai import GoogleAIServices
+from app.services.registry import services as registry
+from app.services.risk_lexicon import KeywordAutomaton, RiskLexicon, load_lexicon
+
+
+def found(automaton, text):
+    return [(match["term"], match["text"]) for match in automaton.find_all(text)]
+
+
+def test_only_whole_words_match():
+    automaton = KeywordAutomaton([("fraud", "adverse_status"), ("nsf fee", "account_activity")])
+    assert found(automaton, "defrauded by a fraudster") == []
+    assert found(automaton, "nsf fees waived") == []
+    assert found(automaton, "Alleged FRAUD, (fraud) and fraud.") == [("fraud", "FRAUD"), ("fraud", "fraud"), ("fraud", "fraud")]
+
+
+def test_whitespace_runs_match_a_single_space():
+    automaton = KeywordAutomaton([("money  laundering", "financial_crime")])
+    assert found(automaton, "suspected money\n\t  laundering scheme") == [("money laundering", "money\n\t  laundering")]
+    assert found(automaton, "moneylaundering") == []
+
+
+def test_offsets_point_into_the_original_text():
+    automaton = KeywordAutomaton([("license revoked", "adverse_status"), ("overdraft", "account_activity")])
+    text = "Page 1\n\n   Overdraft   fee\r\nLicense\n   Revoked on 03/04"
+    matches = automaton.find_all(text)
+    assert [match["term"] for match in matches] == ["overdraft", "license revoked"]
+    for match in matches:
+        assert text[match["start"]:match["end"]] == match["text"]
+    assert matches[1]["text"] == "License\n   Revoked"
+
+
+def test_overlapping_terms_are_all_reported():
+    automaton = KeywordAutomaton([
+        ("revoked", "adverse_status"),
+        ("license revoked", "adverse_status"),
+        ("business license", "restricted_services")
+    ])
+    matches = automaton.find_all("business license revoked")
+    assert sorted((match["term"], match["start"], match["end"]) for match in matches) == [
+        ("business license", 0, 16),
+        ("license revoked", 9, 24),
+        ("revoked", 17, 24)
+    ]
+    assert len(automaton.find_all("business license revoked", limit=2)) == 2
+
+
+def test_shipped_lexicon_keeps_statement_words_out_of_decisions():
+    categories = dict(load_lexicon(settings.RISK_LEXICON_PATH))
+    for term in ["fraud", "fraudulent", "license revoked", "license suspended", "counterfeit goods"]:
+        assert categories[term] in settings.RISK_DECISION_CATEGORIES
+    for term in ["illegal", "violation", "suspended", "revoked", "structuring", "counterfeit"]:
+        assert categories[term] not in settings.RISK_DECISION_CATEGORIES
+    for term in ["money laundering", "terrorist financing", "sanctions evasion", "explosives", "narcotics", "escort services"]:
+        assert categories[term] in settings.RISK_DECISION_CATEGORIES
+    for term in ["overdraft", "chargeback", "returned item", "nsf fee", "account closed", "bankruptcy"]:
+        assert categories[term] not in settings.RISK_DECISION_CATEGORIES
+    for term in ["cease and desist", "firearms", "tobacco", "online gambling", "payday loans"]:
+        assert categories[term] not in settings.RISK_DECISION_CATEGORIES
+
+
+@pytest.fixture
+def services(monkeypatch):
+    monkeypatch.setattr(settings, "QUOTA_GOVERNOR_ENABLED", False)
+    services = GoogleAIServices(provider=MockAIProvider())
+    yield services
+    asyncio.run(services.close())
+
+
+def test_only_decision_categories_fail_no_risk_keywords(services):
+    automaton = KeywordAutomaton(load_lexicon(settings.RISK_LEXICON_PATH))
+    document_ai = {"confidence": 0.95, "entities": [{"type": "business_name"}]}
+    vision = {"authenticity_score": 0.9, "text_detected": True}
+
+    def fusion(text):
+        nlp = {"has_business_entities": True, "risk_keywords": automaton.find_all(text)}
+        return services._perform_fusion_analysis(document_ai, vision, nlp)
+
+    statement = fusion("03/02 Overdraft fee -$35.00\n03/09 Returned item\n03/12 NSF fee -$35.00")
+    assert statement["validation_results"]["no_risk_keywords"]
+    assert statement["recommended_action"] == "auto_approve"
+
+    revoked = fusion("Notice: business license revoked for violation of county code")
+    assert not revoked["validation_results"]["no_risk_keywords"]
+
+    # The conditions printed on every license name the same words without the phrase
+    conditions = "This license may be suspended or revoked for any violation of county code or illegal use"
+    assert {match["category"] for match in automaton.find_all(conditions)} == {"adverse_terms"}
+    boilerplate = fusion(conditions)
+    assert boilerplate["validation_results"]["no_risk_keywords"]
+    assert boilerplate["recommended_action"] == "auto_approve"
+
+    # Results stored before the lexicon had categories list plain strings
+    legacy = services._perform_fusion_analysis(document_ai, vision, {"has_business_entities": True, "risk_keywords": ["suspended"]})
+    assert not legacy["validation_results"]["no_risk_keywords"]
+
+
+def test_prohibited_goods_block_auto_approve(services):
+    automaton = KeywordAutomaton(load_lexicon(settings.RISK_LEXICON_PATH))
+    document_ai = {"confidence": 0.95, "entities": [{"type": "business_name"}]}
+    vision = {"authenticity_score": 0.9, "text_detected": True}
+
+    def fusion(text):
+        nlp = {"has_business_entities": True, "risk_keywords": automaton.find_all(text)}
+        return services._perform_fusion_analysis(document_ai, vision, nlp)
+
+    retail = fusion("Acme Supply LLC, retail sale of hardware and garden tools")
+    assert retail["recommended_action"] == "auto_approve"
+
+    prohibited = fusion("Acme Supply LLC, retail sale of hardware, garden tools and explosives")
+    assert not prohibited["validation_results"]["no_risk_keywords"]
+    assert prohibited["recommended_action"] != "auto_approve"
+
+    # Restricted goods are reported but left to the reviewer
+    restricted = fusion("Acme Supply LLC, retail sale of hardware, garden tools and tobacco")
+    assert [match["category"] for match in automaton.find_all("tobacco")] == ["restricted_goods"]
+    assert restricted["validation_results"]["no_risk_keywords"]
+
+
+def test_fusion_cache_follows_the_lexicon_and_decision_categories(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "MOCK_AI_LATENCY_SECONDS", {"document_ai": [0.0, 0.0], "vision": [0.0, 0.0], "nlp": [0.0, 0.0]})
+    monkeypatch.setattr(settings, "QUOTA_GOVERNOR_ENABLED", False)
+    path = tmp_path / "risk_lexicon.tsv"
+    path.write_text("fraud\tadverse_status\n")
+    lexicon = RiskLexicon(str(path), check_interval=3600)
+    monkeypatch.setitem(registry._instances, "risk_lexicon", lexicon)
+    services = GoogleAIServices(provider=MockAIProvider())
+
+    async def run():
+        try:
+            fuse = lambda: services.multi_modal_fusion_analysis(b"business license", "image/png", "business_license")
+            results = [await fuse(), await fuse()]
+            path.write_text("fraud\tadverse_status\nbakery\tprohibited_goods\n")
+            lexicon.reload()
+            results.append(await fuse())
+            monkeypatch.setattr(settings, "RISK_DECISION_CATEGORIES", ["adverse_status"])
+            results.append(await fuse())
+            return results
+        finally:
+            await services.close()
+
+    first, repeat, reloaded, recategorized = asyncio.run(run())
+    assert not first["cached"] and repeat["cached"]
+    assert not reloaded["cached"]
+    assert [match["term"] for match in reloaded["nlp"]["risk_keywords"]] == ["bakery"]
+    assert not reloaded["fusion"]["validation_results"]["no_risk_keywords"]
+    assert not recategorized["cached"]
+    assert recategorized["fusion"]["validation_results"]["no_risk_keywords"]
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import random
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import merchants_new
+from app.api import screening as screening_api
+from app.api.screening import screen_applicant
+from app.core.config import settings
+from app.services.screening import NameIndex, name_similarity, name_trigrams, normalize_name
+
+ENTRIES = [
+    {"uid": "1", "name": "VOLKOV, Dmitri Sergeyevich", "type": "individual", "aliases": ["Dmitry Volkoff"]},
+    {"uid": "2", "name": "Northwind Maritime Holdings Ltd", "type": "entity", "aliases": ["NWMH Shipping Co"]},
+    {"uid": "3", "name": "Golden Crescent Exchange LLC", "type": "entity"},
+    {"uid": "4", "name": "ORLANDO, Marcus", "type": "individual"}
+]
+SYLLABLES = ["ka", "lo", "mi", "ven", "tor", "dra", "sel", "quin", "bar", "mon", "zu", "pet", "rix", "an", "ol", "ster"]
+
+
+def synthetic_name(rng: random.Random) -> str:
+    return " ".join("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))) for _ in range(rng.randint(1, 3)))
+
+
+def dice(first: str, second: str) -> float:
+    first, second = name_trigrams(first), name_trigrams(second)
+    return 2 * len(first & second) / (len(first) + len(second))
+
+
+def test_reordered_and_misspelled_names_match():
+    index = NameIndex(ENTRIES)
+    assert [match["uid"] for match in index.search("Dmitri Volkov", 0.85)] == ["1"]
+    assert [match["uid"] for match in index.search("Dmitry Volkof", 0.85)] == ["1"]
+    assert [match["uid"] for match in index.search("Golden Crescent Exchange", 0.85)] == ["3"]
+    assert index.search("Bluebird Bakery LLC", 0.85) == []
+
+
+def test_candidate_search_finds_what_a_full_scan_finds():
+    rng = random.Random(3)
+    entries = [{"uid": str(uid), "name": synthetic_name(rng)} for uid in range(2000)]
+    index = NameIndex(entries, candidate_threshold=0.5)
+    names = [normalize_name(entry["name"]) for entry in entries]
+
+    queries = [synthetic_name(rng) for _ in range(100)]
+    # Misspelled listed names, which the prefix filter must not drop
+    for entry in rng.sample(entries, 100):
+        name = entry["name"]
+        position = rng.randrange(1, len(name) - 1)
+        queries.append(name[:position] + rng.choice("aeiou") + name[position + 1:])
+
+    for query in queries:
+        normalized = normalize_name(query)
+        expected = {
+            entry["uid"] for entry, name in zip(entries, names)
+            if dice(normalized, name) >= 0.5 and name_similarity(normalized, name) >= 0.8
+        }
+        found = {match["uid"] for match in index.search(query, 0.8, limit=len(entries))}
+        assert found == expected, query
+
+
+def test_match_threshold_is_inclusive_and_limits_apply():
+    index = NameIndex(ENTRIES)
+    score = name_similarity(normalize_name("Marcus Orlandi"), normalize_name("ORLANDO, Marcus"))
+    assert [match["uid"] for match in index.search("Marcus Orlandi", score)] == ["4"]
+    assert index.search("Marcus Orlandi", score + 1e-9) == []
+
+    screened = index.screen({"owner_name": "Marcus Orlando", "businessName": "Northwind Marine Holdings"}, 0.85)
+    assert screened["status"] == "potential_match"
+    assert {match["field"]: match["uid"] for match in screened["matches"]} == {"owner_name": "4", "businessName": "2"}
+    assert len(index.search("Marcus Orlando", 0.0, limit=1)) == 1
+
+
+def test_candidate_threshold_keeps_dissimilar_names_from_being_scored():
+    # A perfect word-aligned score, but the middle name leaves trigram Dice at 0.63
+    query, listed = normalize_name("Dmitri Volkov"), normalize_name("VOLKOV, Dmitri Sergeyevich")
+    assert name_similarity(query, listed) == 1.0 and 0.6 < dice(query, listed) < 0.7
+    entries = [dict(ENTRIES[0], aliases=[])]
+    assert [match["uid"] for match in NameIndex(entries, candidate_threshold=0.6).search("Dmitri Volkov", 0.85)] == ["1"]
+    assert NameIndex(entries, candidate_threshold=0.7).search("Dmitri Volkov", 0.85) == []
+
+
+def test_screening_is_off_without_a_real_list(monkeypatch):
+    assert settings.SCREENING_ENABLED is False
+    assert settings.SCREENING_WATCHLIST_PATH is None
+    personal_data = {"firstName": "Marcus", "lastName": "Orlando"}
+
+    result = asyncio.run(screen_applicant(personal_data, {}))
+    assert result["status"] == "unavailable"
+
+    monkeypatch.setattr(settings, "SCREENING_ENABLED", True)
+    result = asyncio.run(screen_applicant(personal_data, {}))
+    assert result["status"] == "unavailable"
+    assert "SCREENING_WATCHLIST_PATH" in result["error"]
+
+
+def test_only_one_rescreen_runs_and_its_failure_is_logged(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SCREENING_ENABLED", True)
+    release = None
+
+    async def failing_rescreen():
+        await release.wait()
+        raise RuntimeError("watchlist unreadable")
+
+    monkeypatch.setattr(screening_api, "run_portfolio_rescreen", failing_rescreen)
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        started = await asyncio.gather(
+            screening_api.start_rescreen(), screening_api.start_rescreen(), return_exceptions=True
+        )
+        task = screening_api._rescreen_task
+        release.set()
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0)
+        restarted = await screening_api.start_rescreen()
+        await screening_api.stop_rescreen_watcher()
+        return started, restarted
+
+    with caplog.at_level(logging.ERROR, logger="app.api.screening"):
+        started, restarted = asyncio.run(run())
+
+    assert sum(result == {"status": "started"} for result in started) == 1
+    conflicts = [result for result in started if isinstance(result, HTTPException)]
+    assert [conflict.status_code for conflict in conflicts] == [409]
+    assert "watchlist unreadable" in caplog.text
+    assert restarted == {"status": "started"}
+
+
+@pytest.mark.parametrize("submit", [
+    merchants_new.submit_merchant_application_test,
+    merchants_new.submit_merchant_application_production
+], ids=["test", "production"])
+@pytest.mark.parametrize("risk_score, expected", [(85, "REVIEW"), (40, "DENIED")])
+def test_a_potential_match_holds_approvals_and_keeps_denials(monkeypatch, submit, risk_score, expected):
+    async def potential_match(personal_data, business_data):
+        return {"status": "potential_match", "matches": [{"uid": "4"}], "screened_fields": ["owner_name"]}
+
+    async def clear(personal_data, business_data):
+        return {"status": "clear", "matches": []}
+
+    async def no_index(*args):
+        return None
+
+    monkeypatch.setattr(merchants_new, "calculate_risk_score", lambda business_data, documents: risk_score)
+    monkeypatch.setattr(merchants_new, "screen_applicant", potential_match)
+    monkeypatch.setattr(merchants_new, "check_duplicates", clear)
+    monkeypatch.setattr(merchants_new, "index_application", no_index)
+    monkeypatch.setattr(merchants_new, "applications_store", {})
+
+    request = merchants_new.ApplicationSubmissionRequest(
+        personal_data={"firstName": "Marcus", "lastName": "Orlando"}, business_data={}, processed_documents={}
+    )
+    assert asyncio.run(submit(request))["approval_status"] == expected
@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.startup import DEFERRED_MODULES
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Same budget as `python -m benchmarks.startup`
+IMPORT_BUDGET_SECONDS = 1.5
+
+IMPORT_APP = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+seconds = time.perf_counter() - started
+from app.services.registry import services
+print(json.dumps({"seconds": seconds, "services": services.status(), "modules": sorted(sys.modules)}))
+"""
+
+
+def import_app_in_fresh_interpreter():
+    completed = subprocess.run(
+        [sys.executable, "-c", IMPORT_APP],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+        timeout=60
+    )
+    assert completed.returncode == 0, completed.stderr[-2000:]
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_importing_the_app_builds_no_services():
+    report = import_app_in_fresh_interpreter()
+    assert set(report["services"].values()) == {"not_initialized"}
+
+
+def test_importing_the_app_defers_heavy_clients():
+    modules = import_app_in_fresh_interpreter()["modules"]
+    imported = [
+        deferred for deferred in DEFERRED_MODULES
+        if any(name == deferred or name.startswith(deferred + ".") for name in modules)
+    ]
+    assert imported == []
+
+
+def test_importing_the_app_stays_within_budget():
+    # Best of three, so a busy machine does not fail the build
+    seconds = min(import_app_in_fresh_interpreter()["seconds"] for _ in range(3))
+    assert seconds < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,78 @@
+import asyncio
+import glob
+import os
+
+import pytest
+
+from app.core.config import Settings, settings
+from app.mock_ai import MockAIProvider
+from app.services.google_ai import GoogleAIServices
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "sample-text-documents")
+SAMPLE_PDFS = sorted(glob.glob(os.path.join(SAMPLE_DIR, "*.pdf")))
+
+
+# Document AI OCR confidence, including values below the "skip" cap
+CLOUD_CONFIDENCES = [0.55, 0.72, 0.88, 0.95]
+
+
+def build_services(monkeypatch, confidence):
+    monkeypatch.setattr(settings, "MOCK_AI_LATENCY_SECONDS", {"document_ai": [0.0, 0.0]})
+    monkeypatch.setattr(settings, "MOCK_AI_CONFIDENCE", {"document_ai": [confidence, 0.0]})
+    monkeypatch.setattr(settings, "QUOTA_GOVERNOR_ENABLED", False)
+    return GoogleAIServices(provider=MockAIProvider())
+
+
+def extract(services, monkeypatch, content, modes):
+    results = {}
+    for mode in modes:
+        monkeypatch.setattr(settings, "TEXT_LAYER_FAST_PATH", mode)
+        results[mode] = asyncio.run(services.extract_document_content(content, "application/pdf"))
+    return results
+
+
+def decisions(services, document_ai, authenticity):
+    nlp = {"has_business_entities": True, "risk_keywords": []}
+    vision = {"authenticity_score": authenticity, "text_detected": True}
+    return {
+        mode: services._perform_fusion_analysis(result, vision, nlp)["recommended_action"]
+        for mode, result in document_ai.items()
+    }
+
+
+def test_native_parsing_is_the_default():
+    assert Settings().TEXT_LAYER_FAST_PATH == "native"
+
+
+@pytest.mark.parametrize("confidence", CLOUD_CONFIDENCES)
+@pytest.mark.parametrize("path", SAMPLE_PDFS, ids=os.path.basename)
+def test_native_fast_path_keeps_the_fusion_decision(monkeypatch, path, confidence):
+    with open(path, "rb") as document:
+        content = document.read()
+    services = build_services(monkeypatch, confidence)
+    try:
+        document_ai = extract(services, monkeypatch, content, ("off", "native"))
+    finally:
+        asyncio.run(services.close())
+
+    assert document_ai["native"]["source"] == "document_ai_native"
+    # Confidence still comes from Document AI, not from the text layer
+    assert document_ai["native"]["confidence"] == pytest.approx(confidence)
+    for authenticity in [step / 100 for step in range(101)]:
+        outcome = decisions(services, document_ai, authenticity)
+        assert outcome["native"] == outcome["off"], f"authenticity {authenticity}"
+
+
+@pytest.mark.parametrize("path", SAMPLE_PDFS, ids=os.path.basename)
+def test_skip_never_reports_more_than_the_confidence_cap(monkeypatch, path):
+    with open(path, "rb") as document:
+        content = document.read()
+    services = build_services(monkeypatch, CLOUD_CONFIDENCES[0])
+    try:
+        document_ai = extract(services, monkeypatch, content, ("skip",))
+    finally:
+        asyncio.run(services.close())
+
+    assert document_ai["skip"]["source"] == "text_layer"
+    assert document_ai["skip"]["confidence"] <= settings.TEXT_LAYER_MAX_CONFIDENCE
+    assert all(field["confidence"] <= settings.TEXT_LAYER_MAX_CONFIDENCE for field in document_ai["skip"]["form_fields"])
@@ -0,0 +1,112 @@
+import asyncio
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services.uploads import RequestBodyLimitMiddleware
+
+CHUNK = 1024 * 1024
+
+
+@pytest.fixture
+def client():
+    # No context manager: startup (warmup, job workers) is not needed here
+    return TestClient(app)
+
+
+def stored_files():
+    return sum(len(files) for _, _, files in os.walk(settings.UPLOAD_DIR))
+
+
+def test_declared_oversized_body_is_rejected_before_parsing(client):
+    limit = settings.MAX_FILE_SIZE + settings.MULTIPART_OVERHEAD
+    response = client.post(
+        f"{settings.API_V1_STR}/upload-and-process",
+        content=b"x" * (limit + 1),
+        headers={"content-type": "multipart/form-data; boundary=limit"}
+    )
+    assert response.status_code == 413
+
+
+def test_chunked_body_is_cut_off_at_the_limit(client):
+    limit = settings.MAX_FILE_SIZE + settings.MULTIPART_OVERHEAD
+
+    def body():
+        yield b"--limit\r\nContent-Disposition: form-data; name=\"file\"; filename=\"big.pdf\"\r\n"
+        yield b"Content-Type: application/pdf\r\n\r\n"
+        for _ in range(limit // CHUNK + 4):
+            yield b"x" * CHUNK
+        yield b"\r\n--limit--\r\n"
+
+    before = stored_files()
+    response = client.post(
+        f"{settings.API_V1_STR}/upload-and-process",
+        content=body(),
+        headers={"content-type": "multipart/form-data; boundary=limit"}
+    )
+    assert response.status_code == 413
+    assert stored_files() == before
+
+
+def test_middleware_stops_receiving_once_the_limit_is_crossed():
+    received = []
+    sent = []
+
+    async def read_body(scope, receive, send):
+        while True:
+            message = await receive()
+            if not message.get("more_body"):
+                break
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def receive():
+        received.append(1)
+        return {"type": "http.request", "body": b"x" * 100, "more_body": True}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/upload", "headers": [(b"transfer-encoding", b"chunked")]}
+    asyncio.run(RequestBodyLimitMiddleware(read_body, max_body_size=250)(scope, receive, send))
+
+    assert len(received) == 3
+    assert sent[0]["status"] == 413
+
+
+def test_batch_of_files_each_under_the_limit_is_processed(client, monkeypatch):
+    from app.api import merchants
+
+    async def analyze(**document):
+        return {"document_type": document["document_type"], "file_size": document["file_size"]}
+
+    monkeypatch.setattr(merchants, "analyze_stored_document", analyze)
+    monkeypatch.setattr(merchants, "build_ai_processing_response", lambda results: results)
+
+    size = 6 * 1024 * 1024
+    response = client.post(
+        f"{settings.API_V1_STR}/upload-and-process-batch",
+        files=[
+            ("files", ("statement.pdf", b"%PDF" + b"a" * size, "application/pdf")),
+            ("files", ("license.pdf", b"%PDF" + b"b" * size, "application/pdf"))
+        ],
+        data={"document_types": ["bank_statement", "business_license"]}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["summary"] == {"total": 2, "processed": 2, "failed": 0}
+    assert [document["ai_processing"]["file_size"] for document in body["documents"]] == [size + 4, size + 4]
+
+
+def test_batch_body_over_the_batch_limit_is_rejected(client):
+    limit = settings.BATCH_MAX_FILES * (settings.MAX_FILE_SIZE + settings.MULTIPART_OVERHEAD)
+    response = client.post(
+        f"{settings.API_V1_STR}/upload-and-process-batch",
+        content=b"x" * (limit + 1),
+        headers={"content-type": "multipart/form-data; boundary=limit"}
+    )
+    assert response.status_code == 413
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+from google.cloud import documentai, language_v1, vision
+
+from app.core.config import settings
+from app.mock_ai.clients import MockStorageClient
+from app.services.ai_providers import AIClients
+from app.services.cassettes import CassetteStore, RecordingProvider, ReplayProvider
+from app.services.google_ai import GoogleAIServices
+
+DOCUMENT_AI_TEXT = (
+    "BUSINESS LICENSE\n"
+    "State of California\n"
+    "License Number: BL-2024-789456\n"
+    "Business Name: Sunny Side Bakery LLC\n"
+    "Owner: John Smith\n"
+    "Address: 123 Main Street, San Francisco, CA 94102\n"
+)
+# What Vision's own OCR made of the same page: different line breaks, misread characters, a stamp
+VISION_OCR_TEXT = (
+    "BUSlNESS LICENSE State of Ca1ifornia License Number: BL-2024-789456 "
+    "Business Name: Sunny Side Bakery LLC Owner: John Smith "
+    "Address: 123 Main St, San Francisco CA 94102 APPROVED"
+)
+
+
+class RecordedAPI:
+    """Stands in for the live API while recording: real protobuf responses"""
+
+    name = "recorded-api"
+
+    def create_clients(self) -> AIClients:
+        return AIClients(document_ai=self, vision=self, language=self, storage=MockStorageClient())
+
+    def process_document(self, request=None, **kwargs):
+        entity = lambda type_, text, confidence: documentai.Document.Entity(type_=type_, mention_text=text, confidence=confidence)
+        return documentai.ProcessResponse(document=documentai.Document(
+            text=DOCUMENT_AI_TEXT,
+            entities=[entity("license_number", "BL-2024-789456", 0.94), entity("business_name", "Sunny Side Bakery LLC", 0.91)]
+        ))
+
+    def batch_annotate_images(self, requests=None, **kwargs):
+        responses = []
+        for request in requests:
+            features = {feature.type_.name for feature in request.features}
+            response = vision.AnnotateImageResponse(
+                logo_annotations=[vision.EntityAnnotation(description="State of California", score=0.88)],
+                localized_object_annotations=[vision.LocalizedObjectAnnotation(name="Document", score=0.8)]
+            )
+            if "TEXT_DETECTION" in features:
+                response.text_annotations = [vision.EntityAnnotation(description=VISION_OCR_TEXT, confidence=0.82)]
+            responses.append(response)
+        return vision.BatchAnnotateImagesResponse(responses=responses)
+
+    def analyze_entities(self, request=None, **kwargs):
+        return language_v1.AnalyzeEntitiesResponse(entities=[language_v1.Entity(
+            name="Sunny Side Bakery LLC",
+            type_=language_v1.Entity.Type.ORGANIZATION,
+            salience=0.6,
+            mentions=[language_v1.EntityMention(text=language_v1.TextSpan(content="Sunny Side Bakery LLC"))]
+        )])
+
+
+@pytest.fixture
+def pipeline_settings(monkeypatch):
+    for name, value in {
+        "FUSION_CACHE_ENABLED": False,
+        "VISION_BATCHING_ENABLED": False,
+        "QUOTA_GOVERNOR_ENABLED": False,
+        "NLP_CHUNK_CACHE_MAX_ENTRIES": 0
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+
+
+def fuse(provider, monkeypatch, ocr_from_document_ai: bool):
+    monkeypatch.setattr(settings, "VISION_OCR_FROM_DOCUMENT_AI", ocr_from_document_ai)
+    services = GoogleAIServices(provider=provider)
+
+    async def run():
+        try:
+            return await services.multi_modal_fusion_analysis(b"scanned business license", "image/png", "business_license")
+        finally:
+            await services.close()
+
+    return asyncio.run(run())
+
+
+def test_text_features_from_document_ai_keep_the_fusion_outcome(pipeline_settings, monkeypatch, tmp_path):
+    store = CassetteStore(str(tmp_path))
+    for ocr_from_document_ai in (False, True):
+        fuse(RecordingProvider(RecordedAPI(), store), monkeypatch, ocr_from_document_ai)
+
+    replay = ReplayProvider(store, replay_latency=False)
+    vision_ocr = fuse(replay, monkeypatch, ocr_from_document_ai=False)
+    from_document_ai = fuse(replay, monkeypatch, ocr_from_document_ai=True)
+
+    assert vision_ocr["vision_ai"]["text_source"] == "vision"
+    assert from_document_ai["vision_ai"]["text_source"] == "document_ai"
+    assert vision_ocr["vision_ai"]["text_content"] != from_document_ai["vision_ai"]["text_content"]
+    assert "TEXT_DETECTION" not in [feature.upper() for feature in from_document_ai["vision_ai"]["features_requested"]]
+
+    for key in ("recommended_action", "validation_results", "cross_validation_passed", "processing_quality"):
+        assert from_document_ai["fusion"][key] == vision_ocr["fusion"][key], key
+    assert from_document_ai["fusion"]["fusion_confidence"] == pytest.approx(vision_ocr["fusion"]["fusion_confidence"], abs=0.01)